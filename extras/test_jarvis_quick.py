@@ -38,12 +38,13 @@ def test_jarvis():
     print("=" * 60)
     print()
     
-    for i, cmd in enumerate(test_commands, 1):
+    # AI understanding (one batched call for everything not resolved locally)
+    results = brain.understand_commands(test_commands)
+    
+    for i, (cmd, result) in enumerate(zip(test_commands, results), 1):
         print(f"\n[{i}/{len(test_commands)}] Command: '{cmd}'")
         print("-" * 60)
         
-        # AI understanding
-        result = brain.understand_command(cmd)
         print(f"AI Understanding:")
         print(f"  Action: {result['action']}")
         print(f"  Parameter: {result['param']}")
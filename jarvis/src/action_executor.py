@@ -7,12 +7,51 @@ import subprocess
 import webbrowser
 import os
 import platform
-from config import APP_PATHS, DEBUG_MODE
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from action_schema import ACTIONS
+from action_plan import dependencies
+from tracing import tracer
+from config import (
+    APP_PATHS, WEBSITE_SHORTCUTS, PLAN_MAX_PARALLEL, PLAN_FOCUS_TIMEOUT, PLAN_FOCUS_SETTLE, PLAN_FOCUS_FALLBACK,
+    DEBUG_MODE,
+)
+
+
+def foreground_window():
+    """
+    Identify the window that has the keyboard focus
+    
+    Returns:
+        Window handle or id, or None where it cannot be queried
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            import ctypes
+            return ctypes.windll.user32.GetForegroundWindow() or None
+        if system == "Linux" and shutil.which("xdotool"):
+            result = subprocess.run(["xdotool", "getactivewindow"], capture_output=True, text=True, timeout=1)
+            return result.stdout.strip() or None
+    except Exception:
+        pass
+    return None
+
 
 class ActionExecutor:
-    def __init__(self):
+    def __init__(self, dry_run=False):
+        """
+        Initialize the executor
+        
+        Args:
+            dry_run: Only report what would be done (used by replays)
+        """
         self.system = platform.system()
-        print(f"✓ Action Executor initialized (OS: {self.system})")
+        self.dry_run = dry_run
+        self.pool = None  # runs plan steps, created with the first plan
+        mode = ", dry run" if dry_run else ""
+        print(f"✓ Action Executor initialized (OS: {self.system}{mode})")
     
     def execute(self, action_dict):
         """
@@ -35,6 +74,14 @@ class ActionExecutor:
         if confidence < 0.7:
             print(f"⚠️  Low confidence ({confidence:.2f}), attempting anyway...")
         
+        if action == "plan":
+            return self.execute_plan(action_dict["steps"], confidence)
+        
+        if self.dry_run:
+            if DEBUG_MODE:
+                print(f"🧪 Dry run: would run {action}({param!r})")
+            return action in ACTIONS
+        
         try:
             if action == "launch_app":
                 return self.launch_app(param)
@@ -56,6 +103,82 @@ class ActionExecutor:
             print(f"❌ Execution error: {e}")
             return False
     
+    def execute_plan(self, steps, confidence=1.0):
+        """
+        Run the steps of a plan, independent ones at the same time
+        
+        Args:
+            steps: Plan steps ({"action", "param", "after"})
+            confidence: Confidence in the whole plan
+            
+        Returns:
+            bool: True if every step succeeded
+        """
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=PLAN_MAX_PARALLEL, thread_name_prefix="plan-step")
+        
+        # Steps are queued in order and only wait for earlier ones, so the
+        # pool always has a runnable step
+        trace = tracer.current()
+        waits_for = dependencies(steps)
+        futures = []
+        for index, (step, after) in enumerate(zip(steps, waits_for)):
+            waits = [futures[i] for i in after]
+            # Keystrokes after a step that opens a window must wait for that window
+            settle = ACTIONS[step["action"]].get("focus", False) and any(
+                index in waits_for[later] and not ACTIONS[steps[later]["action"]].get("concurrent")
+                for later in range(index + 1, len(steps))
+            )
+            futures.append(self.pool.submit(self._run_step, index, step, waits, confidence, trace, settle))
+        
+        return all([future.result() for future in futures])
+    
+    def _run_step(self, index, step, waits, confidence, trace, settle=False):
+        """
+        Run one plan step once the steps it depends on succeeded
+        
+        With settle, the step only counts as done once the window it opened
+        has the focus, so dependent keystrokes do not go to the old window.
+        """
+        if not all([future.result() for future in waits]):
+            print(f"⏭️  Skipping step {index + 1} ({step['action']}): an earlier step failed")
+            return False
+        
+        with tracer.activate(trace):
+            with tracer.span("plan_step", action=step["action"], step=index + 1) as span:
+                before = foreground_window() if settle and not self.dry_run else None
+                success = self.execute({"action": step["action"], "param": step["param"], "confidence": confidence})
+                if success and settle and not self.dry_run:
+                    span.set(focused=self._wait_for_focus(before))
+                return success
+    
+    def _wait_for_focus(self, before, timeout=PLAN_FOCUS_TIMEOUT):
+        """
+        Wait for another window to take the focus
+        
+        Args:
+            before: foreground_window() before the window was opened
+            timeout: Seconds to wait at most
+            
+        Returns:
+            bool: True if the focus moved, None if it cannot be observed here
+                (a fixed PLAN_FOCUS_FALLBACK delay is waited instead)
+        """
+        if before is None:
+            time.sleep(PLAN_FOCUS_FALLBACK)
+            return None
+        
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            current = foreground_window()
+            if current is not None and current != before:
+                time.sleep(PLAN_FOCUS_SETTLE)  # the window may take input slightly later
+                return True
+            time.sleep(0.05)
+        
+        print(f"⚠️  No new window took the focus within {timeout:.0f}s, continuing anyway")
+        return False
+    
     def launch_app(self, app_name):
         """Launch an application"""
         if DEBUG_MODE:
@@ -130,14 +253,7 @@ class ActionExecutor:
             # Add https:// if not present
             if not site.startswith(('http://', 'https://')):
                 # Handle common sites
-                site_map = {
-                    'youtube': 'youtube.com',
-                    'gmail': 'mail.google.com',
-                    'github': 'github.com',
-                    'twitter': 'twitter.com',
-                    'facebook': 'facebook.com',
-                }
-                site = site_map.get(site.lower(), site)
+                site = WEBSITE_SHORTCUTS.get(site.lower(), site)
                 site = f"https://{site}"
             
             webbrowser.open(site)
@@ -0,0 +1,107 @@
+"""
+Action Plan Module
+Several actions understood from one utterance, and the order they must
+run in
+"""
+
+import re
+from action_schema import ACTIONS
+from config import PLAN_MAX_STEPS
+
+# Where one spoken command ends and the next begins
+SEPARATOR = re.compile(r"\s*,\s*(?:and then |and |then )?|\s+(?:and then|and|then)\s+", re.IGNORECASE)
+
+
+def split_utterance(text):
+    """
+    Split an utterance into the commands it chains together
+
+    Args:
+        text: Voice command text
+
+    Returns:
+        list: Two or more command texts, or None for a single command
+    """
+    parts = [part for part in SEPARATOR.split(text.strip()) if part]
+    if len(parts) < 2 or len(parts) > PLAN_MAX_STEPS:
+        return None
+    return parts
+
+
+def make_plan(steps, confidence):
+    """
+    Build the action dict of a plan
+
+    Args:
+        steps: Dicts with "action", "param" and "after" (indices of
+            earlier steps that must finish first)
+        confidence: Confidence in the whole plan
+
+    Returns:
+        dict: {"action": "plan", "param": summary, "confidence", "steps"}
+    """
+    return {
+        "action": "plan",
+        "param": "; ".join(f"{step['action']}: {step['param']}" for step in steps),
+        "confidence": confidence,
+        "steps": steps,
+    }
+
+
+def parse_plan(answer):
+    """
+    Validate a plan returned by the model
+
+    Args:
+        answer: {"steps": [{"action", "param", "after": [step numbers]}], "confidence"}
+
+    Returns:
+        dict: A plan, or a single action dict when there is only one step
+
+    Raises:
+        ValueError: If the plan is malformed
+    """
+    steps = answer.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("Plan has no steps")
+    if len(steps) > PLAN_MAX_STEPS:
+        raise ValueError(f"Plan has {len(steps)} steps, more than {PLAN_MAX_STEPS}")
+
+    cleaned = []
+    for number, step in enumerate(steps, 1):
+        if not isinstance(step, dict) or step.get("action") not in ACTIONS or not isinstance(step.get("param"), str):
+            raise ValueError(f"Invalid plan step {number}")
+
+        # Step numbers are 1-based in the reply; only earlier steps count
+        after = [n - 1 for n in step.get("after") or [] if isinstance(n, int) and 1 <= n < number]
+        cleaned.append({"action": step["action"], "param": step["param"], "after": after})
+
+    confidence = answer.get("confidence", 0.8)
+    if len(cleaned) == 1:
+        return {"action": cleaned[0]["action"], "param": cleaned[0]["param"], "confidence": confidence}
+    return make_plan(cleaned, confidence)
+
+
+def dependencies(steps):
+    """
+    Work out which earlier steps each step must wait for
+
+    Besides the plan's own hints, a step whose action is not concurrent
+    (such as type_text) waits for every earlier step and every later step
+    waits for it, so keystrokes land in the window the earlier steps opened.
+
+    Args:
+        steps: Plan steps
+
+    Returns:
+        list: Sorted indices of the steps each step waits for
+    """
+    waits = []
+    for i, step in enumerate(steps):
+        after = set(step.get("after", []))
+        if ACTIONS[step["action"]].get("concurrent"):
+            after.update(j for j in range(i) if not ACTIONS[steps[j]["action"]].get("concurrent"))
+        else:
+            after.update(range(i))
+        waits.append(sorted(after))
+    return waits
@@ -0,0 +1,105 @@
+"""
+Action Schema Module
+Single description of every action JARVIS can execute
+"""
+
+from config import APP_PATHS, WEBSITE_SHORTCUTS
+
+# Action types and the phrases that trigger them.
+# "verbs" introduce a free-form parameter, "params" map a fixed parameter
+# to the phrases (regex fragments) that select it. "concurrent" actions may
+# run alongside other steps of a plan; the others need the focus to stay put.
+# "focus" actions open a window that takes the focus once it is ready.
+ACTIONS = {
+    "launch_app": {
+        "description": "Open an application",
+        "param": "app name",
+        "verbs": ["open", "launch", "start", "run"],
+        "concurrent": True,
+        "focus": True,
+    },
+    "type_text": {
+        "description": "Type text on screen",
+        "param": "the exact text to type",
+        "verbs": ["type", "write", "dictate"],
+        "concurrent": False,
+    },
+    "web_search": {
+        "description": "Search on Google",
+        "param": "search query",
+        "verbs": ["search for", "search", "google", "look up"],
+        "concurrent": True,
+        "focus": True,
+    },
+    "open_website": {
+        "description": "Open specific website",
+        "param": "URL or site name",
+        "verbs": ["go to", "navigate to", "browse to", "visit", "open"],
+        "concurrent": True,
+        "focus": True,
+    },
+    "system_control": {
+        "description": "System action",
+        "concurrent": False,
+        "params": {
+            "close_window": [r"close (?:this |the |current )?window"],
+            "minimize_all": [r"minimi[sz]e (?:all|everything)(?: windows)?", r"show (?:the )?desktop"],
+            "lock": [r"lock(?: (?:the |my )?(?:computer|pc|screen|laptop))?"],
+            "volume_up": [r"(?:turn )?(?:the )?volume up", r"(?:turn it |turn )?up the volume", r"louder"],
+            "volume_down": [r"(?:turn )?(?:the )?volume down", r"(?:turn it |turn )?down the volume", r"quieter"],
+            "mute": [r"mute(?: (?:the )?(?:volume|sound|audio))?"],
+            "screenshot": [r"(?:take )?(?:a )?screenshot", r"(?:take )?(?:a )?screen shot"],
+        },
+    },
+    "file_operation": {
+        "description": "File/folder operation",
+        "concurrent": True,
+        "focus": True,
+        "params": {
+            "open_downloads": [r"open (?:my |the )?downloads?(?: folder)?"],
+            "open_documents": [r"open (?:my |the )?documents?(?: folder)?"],
+            "open_desktop": [r"open (?:my |the )?desktop(?: folder)?"],
+        },
+    },
+}
+
+# Reference decisions, used as few-shot examples for the model
+EXAMPLES = [
+    ("open edge browser", "launch_app", "edge"),
+    ("search for pizza near me", "web_search", "pizza near me"),
+    ("type hello world", "type_text", "hello world"),
+    ("close this window", "system_control", "close_window"),
+    ("go to youtube", "open_website", "youtube.com"),
+    ("open downloads folder", "file_operation", "open_downloads"),
+]
+
+# Reference plan for an utterance chaining several commands:
+# (text, [(action, param, 1-based numbers of steps it waits for)])
+PLAN_EXAMPLES = [
+    ("open notepad and type hello", [("launch_app", "notepad", []), ("type_text", "hello", [1])]),
+]
+
+# Spoken names for apps in APP_PATHS
+APP_ALIASES = {
+    "microsoft edge": "edge",
+    "google chrome": "chrome",
+    "mozilla firefox": "firefox",
+    "vs code": "vscode",
+    "visual studio code": "vscode",
+    "calc": "calculator",
+    "file explorer": "explorer",
+    "command prompt": "cmd",
+    "terminal": "cmd",
+}
+
+
+def app_names():
+    """Return every spoken app name mapped to its APP_PATHS key"""
+    names = {app: app for app in APP_PATHS}
+    names.update(APP_ALIASES)
+    return names
+
+
+def site_names():
+    """Return every spoken website name mapped to its address"""
+    return dict(WEBSITE_SHORTCUTS)
@@ -0,0 +1,240 @@
+"""
+Audio Capture Module
+Keeps the microphone open in a background thread that writes into a
+fixed-size ring buffer, so a command can start from audio recorded just
+before the hotkey was pressed instead of waiting for the device to open
+"""
+
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+from config import AUDIO_BUFFER_SECONDS, AUDIO_PREROLL, DEBUG_MODE
+
+
+class RingBuffer:
+    def __init__(self, seconds, sample_rate):
+        """
+        Preallocated buffer of the most recent 16-bit mono samples
+
+        Args:
+            seconds: Audio kept before the oldest samples are overwritten
+            sample_rate: Samples per second
+        """
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self.samples = np.zeros(self.capacity, dtype=np.int16)
+        self.written = 0  # samples written since capture started
+        self.written_at = None  # time.perf_counter() of the latest sample
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def write(self, data):
+        """
+        Append raw audio, overwriting the oldest samples once full
+
+        Args:
+            data: Little-endian 16-bit PCM bytes
+        """
+        chunk = np.frombuffer(data, dtype=np.int16)  # a view, not a copy
+        count = len(chunk)
+        if count > self.capacity:
+            chunk = chunk[-self.capacity:]
+            count = self.capacity
+
+        with self.cond:
+            start = self.written % self.capacity
+            first = min(count, self.capacity - start)
+            self.samples[start:start + first] = chunk[:first]
+            self.samples[:count - first] = chunk[first:]
+            self.written += len(chunk)
+            self.written_at = time.perf_counter()
+            self.cond.notify_all()
+
+    def oldest(self):
+        """Position of the oldest sample still in the buffer"""
+        return max(0, self.written - self.capacity)
+
+    def position_at(self, timestamp):
+        """
+        Find the sample recorded at a moment in time
+
+        Args:
+            timestamp: time.perf_counter() value
+
+        Returns:
+            int: Sample position, clamped to what the buffer holds
+        """
+        with self.cond:
+            if self.written_at is None:
+                return self.written
+            position = self.written - int((self.written_at - timestamp) * self.sample_rate)
+            return min(self.written, max(self.oldest(), position))
+
+    def time_at(self, position):
+        """
+        Find when a sample was recorded
+
+        Args:
+            position: Sample position
+
+        Returns:
+            float: time.perf_counter() value (approximate, to one chunk)
+        """
+        with self.cond:
+            if self.written_at is None:
+                return time.perf_counter()
+            return self.written_at - (self.written - position) / self.sample_rate
+
+    def read(self, position, count, timeout=None):
+        """
+        Read samples, waiting for them to be recorded
+
+        Args:
+            position: Sample position to read from (skips ahead if those
+                samples were already overwritten)
+            count: Number of samples
+            timeout: Seconds to wait for the audio to arrive
+
+        Returns:
+            tuple: (PCM bytes, position after the samples read)
+
+        Raises:
+            OSError: If the capture stopped or the audio did not arrive in time
+        """
+        with self.cond:
+            position = max(position, self.oldest())
+            if not self.cond.wait_for(lambda: self.closed or self.written >= position + count, timeout):
+                raise OSError("Timed out waiting for microphone audio")
+            if self.written < position + count:
+                raise OSError("Audio capture stopped")
+
+            start = position % self.capacity
+            first = min(count, self.capacity - start)
+            data = self.samples[start:start + first].tobytes()
+            if first < count:
+                data += self.samples[:count - first].tobytes()
+        return data, position + count
+
+    def close(self):
+        """Wake up readers once no more audio will arrive"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class BufferStream:
+    def __init__(self, buffer, position):
+        """Stream interface over the ring buffer, as speech_recognition expects"""
+        self.buffer = buffer
+        self.position = position
+
+    def read(self, size):
+        """Read the next `size` samples, waiting for them if needed"""
+        data, self.position = self.buffer.read(self.position, size, timeout=1.0)
+        return data
+
+
+class BufferedSource(sr.AudioSource):
+    def __init__(self, buffer, position, chunk):
+        """
+        Audio source reading from the ring buffer instead of the device
+
+        Args:
+            buffer: RingBuffer being filled by the capture thread
+            position: Sample position to start reading from
+            chunk: Samples per read
+        """
+        self.SAMPLE_RATE = buffer.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.stream = BufferStream(buffer, position)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class AudioCapture:
+    def __init__(self, microphone=None, buffer_seconds=AUDIO_BUFFER_SECONDS):
+        """
+        Initialize the capture (the microphone opens on start())
+
+        Args:
+            microphone: sr.Microphone to record from (default device if None)
+            buffer_seconds: Audio kept in the ring buffer
+        """
+        self.microphone = microphone or sr.Microphone()
+        if self.microphone.SAMPLE_WIDTH != 2:
+            raise ValueError("Audio capture needs 16-bit samples")
+
+        self.chunk = self.microphone.CHUNK
+        self.buffer = RingBuffer(buffer_seconds, self.microphone.SAMPLE_RATE)
+        self.running = threading.Event()
+        self.ready = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def start(self, timeout=5.0):
+        """
+        Open the microphone and start recording in the background
+
+        Args:
+            timeout: Seconds to wait for the device to open
+
+        Raises:
+            OSError: If the microphone could not be opened
+        """
+        if self.thread:
+            return
+
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self.thread.start()
+
+        if not self.ready.wait(timeout):
+            raise OSError("Microphone did not open in time")
+        if self.error:
+            raise OSError(f"Could not open microphone: {self.error}")
+
+    def _run(self):
+        """Capture thread: read from the device until stopped"""
+        try:
+            with self.microphone as source:
+                self.ready.set()
+                if DEBUG_MODE:
+                    print(f"🎙️  Microphone open ({source.SAMPLE_RATE} Hz, {self.buffer.capacity // source.SAMPLE_RATE}s buffer)")
+                while self.running.is_set():
+                    self.buffer.write(source.stream.read(self.chunk))
+        except Exception as e:
+            self.error = e
+            print(f"❌ Audio capture stopped: {e}")
+        finally:
+            self.ready.set()
+            self.buffer.close()
+
+    def source(self, since=None, preroll=AUDIO_PREROLL):
+        """
+        Get an audio source starting shortly before a moment in time
+
+        Args:
+            since: time.perf_counter() the audio should start at (now if None),
+                e.g. when the hotkey was pressed
+            preroll: Seconds of audio before `since` to include
+
+        Returns:
+            BufferedSource: Source for speech_recognition's listen()
+        """
+        if since is None:
+            since = time.perf_counter()
+        position = self.buffer.position_at(since - preroll)
+        return BufferedSource(self.buffer, position, self.chunk)
+
+    def stop(self):
+        """Stop recording and close the microphone"""
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
@@ -0,0 +1,426 @@
+"""
+JARVIS Latency Benchmark
+Drives Jarvis.process_command with in-process stand-ins for the
+microphone, speech recognition, Gemini and the action executor, and
+reports p50/p95/p99 per stage. Needs no mic, GUI or network.
+
+Usage:
+    python benchmark.py [--iterations 100] [--seed 1] [--scale 1.0]
+                        [--llm-latency lognormal:0.6,0.5] [--manifest utterances.jsonl]
+                        [--pipelined] [--json results.json] [--verbose]
+    python benchmark.py --vad recording.wav [...] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import random
+import re
+import time
+import wave
+
+from metrics import LatencyWindow
+from replay import NullOverlay
+
+# A mix of commands resolved locally and commands that need the model
+DEFAULT_UTTERANCES = [
+    {"text": "open edge browser"},
+    {"text": "search for python tutorials"},
+    {"text": "type hello world"},
+    {"text": "close this window"},
+    {"text": "go to youtube"},
+    {"text": "volume up"},
+    {"text": "what's the weather in paris"},
+    {"text": "play some relaxing music"},
+    {"text": "remind me to call mom"},
+    {"text": "how far away is the moon"},
+]
+
+STAGES = ["listen", "recognize", "understand", "execute", "wait", "total"]
+
+
+def parse_distribution(spec):
+    """
+    Parse a latency distribution
+
+    Args:
+        spec: "fixed:S", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA" (seconds)
+
+    Returns:
+        function: Takes a random.Random and returns one latency in seconds
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def wav_duration(path):
+    """Length of a WAV recording in seconds"""
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+class FakeVoiceRecognizer:
+    def __init__(self, utterances, rng, capture, stt, endpoint_pause=0.8, scale=1.0):
+        """
+        Stand-in for VoiceRecognizer that replays utterances
+
+        Args:
+            utterances: Dicts with "text" and optionally "wav" (recording path)
+            rng: random.Random for repeatable latencies
+            capture: Latency distribution of speaking a command without a recording
+            stt: Latency distribution of speech-to-text
+            endpoint_pause: Trailing silence before a phrase ends (seconds)
+            scale: Multiplier applied to every simulated delay
+        """
+        self.utterances = utterances
+        self.rng = rng
+        self.capture = capture
+        self.stt = stt
+        self.endpoint_pause = endpoint_pause
+        self.scale = scale
+        self.position = 0
+
+    def listen(self, callback=None, on_partial=None, since=None):
+        """Replay the next utterance with simulated capture and STT delays"""
+        utterance = self.utterances[self.position % len(self.utterances)]
+        self.position += 1
+
+        if callback:
+            callback("listening")
+
+        if "wav" in utterance:
+            capture = wav_duration(utterance["wav"]) + self.endpoint_pause
+        else:
+            capture = self.capture(self.rng)
+        time.sleep(capture * self.scale)
+
+        if callback:
+            callback("recognizing")
+
+        time.sleep(self.stt(self.rng) * self.scale)
+        return utterance["text"].lower()
+
+    def close(self):
+        pass
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeStream:
+    def __init__(self, chunks, delays):
+        self.chunks = chunks
+        self.delays = delays
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk, delay in zip(self.chunks, self.delays):
+            await asyncio.sleep(delay)
+            yield _FakeChunk(chunk)
+
+
+class FakeGeminiModel:
+    def __init__(self, rng, latency, scale=1.0, chunk_size=8):
+        """
+        Stand-in for the Gemini model with configurable latency
+
+        Args:
+            rng: random.Random for repeatable latencies
+            latency: Latency distribution of a full response
+            scale: Multiplier applied to every simulated delay
+            chunk_size: Characters per streamed chunk
+        """
+        self.rng = rng
+        self.latency = latency
+        self.scale = scale
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def _answer(self, request):
+        """Answer every command as a web search for what was said"""
+        match = re.search(r'User: "(.*)"', request)
+        query = match.group(1) if match else request
+        return json.dumps({"action": "web_search", "param": query, "confidence": 0.9})
+
+    async def generate_content_async(self, request, stream=False, **kwargs):
+        self.calls += 1
+        text = self._answer(request)
+        total = self.latency(self.rng) * self.scale
+
+        if not stream:
+            await asyncio.sleep(total)
+            return _FakeChunk(text)
+
+        # Most of the latency is spent before the first token
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        rest = total * 0.2 / max(1, len(chunks) - 1)
+        return _FakeStream(chunks, [total * 0.8] + [rest] * (len(chunks) - 1))
+
+
+class NoOpExecutor:
+    def __init__(self):
+        self.executed = 0
+
+    def execute(self, action_dict):
+        self.executed += 1
+        return True
+
+
+def run_benchmark(iterations=100, seed=1, scale=1.0, capture="uniform:1.0,2.0",
+                  stt="lognormal:0.5,0.3", llm_latency="lognormal:0.6,0.5",
+                  utterances=None, pipelined=False, verbose=False):
+    """
+    Run the pipeline repeatedly against stand-ins
+
+    Args:
+        iterations: Number of commands to process
+        seed: Seed for every simulated latency
+        scale: Multiplier applied to every simulated delay
+        capture, stt, llm_latency: Latency distributions (see parse_distribution)
+        utterances: Dicts with "text" and optionally "wav"
+        pipelined: Issue commands back to back through the stage threads
+            instead of one at a time
+        verbose: Show the pipeline's own output
+
+    Returns:
+        dict: Startup time, throughput and p50/p95/p99 per stage (seconds)
+    """
+    # One generator per stage thread, so draws do not depend on scheduling
+    voice_rng = random.Random(f"{seed}:voice")
+    model_rng = random.Random(f"{seed}:model")
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    # Keep benchmark spans out of the production trace and metrics files
+    from tracing import tracer
+    sinks = tracer.trace_file, tracer.metrics_file
+    tracer.trace_file = tracer.metrics_file = None
+
+    try:
+        with output:
+            start = time.perf_counter()
+            from main import Jarvis
+            from gemini_brain import GeminiBrain
+            from response_cache import ResponseCache
+            imported = time.perf_counter()
+
+            model = FakeGeminiModel(model_rng, parse_distribution(llm_latency), scale)
+            jarvis = Jarvis(
+                voice=FakeVoiceRecognizer(utterances or DEFAULT_UTTERANCES, voice_rng,
+                                          parse_distribution(capture), parse_distribution(stt), scale=scale),
+                # No trained classifier: results must not depend on the working directory
+                brain=GeminiBrain(model=model, response_cache=ResponseCache(path=":memory:"), classifier=None),
+                executor=NoOpExecutor(),
+                overlay=NullOverlay(),
+            )
+            jarvis.brain.response_cache.loaded.wait()
+            ready = time.perf_counter()
+
+            started = time.perf_counter()
+            if pipelined:
+                jobs = [jarvis.pipeline.submit(block=True) for _ in range(iterations)]
+                jarvis.pipeline.join()
+            else:
+                jobs = [jarvis.process_command() for _ in range(iterations)]
+            elapsed = time.perf_counter() - started
+
+            windows = {stage: LatencyWindow(size=iterations) for stage in STAGES}
+            for job in jobs:
+                for stage, seconds in job.timings.items():
+                    windows[stage].add(seconds)
+
+            # Repeated utterances come back from the learned cache after the
+            # first round, so understanding is also split by what answered it
+            sources = {}
+            for job in jobs:
+                if "understand" in job.timings:
+                    source = (job.trace.attributes.get("source") if job.trace else None) or "none"
+                    sources.setdefault(source, LatencyWindow(size=iterations)).add(job.timings["understand"])
+    finally:
+        tracer.flush()  # drop the benchmark's spans before the sinks come back
+        tracer.trace_file, tracer.metrics_file = sinks
+
+    return {
+        "iterations": iterations,
+        "seed": seed,
+        "pipelined": pipelined,
+        "startup": {"import": imported - start, "init": ready - imported, "total": ready - start},
+        "throughput": iterations / elapsed,
+        "stages": {stage: window.summary() for stage, window in windows.items()},
+        "understand_by_source": {source: window.summary() for source, window in sorted(sources.items())},
+        "model_calls": model.calls,
+        "brain": jarvis.brain.stats(),
+    }
+
+
+def print_report(results):
+    """Print a benchmark result table"""
+    print("=" * 60)
+    mode = "pipelined" if results["pipelined"] else "sequential"
+    print(f"JARVIS Benchmark ({results['iterations']} commands, {mode}, seed {results['seed']})")
+    print("=" * 60)
+
+    startup = results["startup"]
+    print(f"Startup: {startup['total'] * 1000:.0f}ms "
+          f"(imports {startup['import'] * 1000:.0f}ms, init {startup['init'] * 1000:.0f}ms)")
+    print(f"Throughput: {results['throughput']:.2f} commands/s")
+    print()
+    print(f"{'Stage':<12}{'p50':>10}{'p95':>10}{'p99':>10}")
+    print("-" * 42)
+    for stage, summary in results["stages"].items():
+        if not summary["count"]:
+            continue
+        cells = "".join(f"{summary[p] * 1000:>8.0f}ms" for p in ("p50", "p95", "p99"))
+        print(f"{stage:<12}{cells}")
+    print()
+
+    print(f"{'Understood by':<16}{'count':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    print("-" * 52)
+    for source, summary in results["understand_by_source"].items():
+        cells = "".join(f"{summary[p] * 1000:>8.0f}ms" for p in ("p50", "p95", "p99"))
+        print(f"{source:<16}{summary['count']:>6}{cells}")
+    print()
+
+    cache = results["brain"]["response_cache"]
+    print(f"Model calls: {results['model_calls']}, hedges: {results['brain']['hedges']}, "
+          f"learned cache hit rate: {cache['hit_rate']:.0%}")
+
+
+def run_vad_benchmark(paths, chunk=1024, calibration=0.5):
+    """
+    Compare VAD endpointing with the fixed 0.8s pause threshold it
+    replaced, on recordings of single commands (starting with at least
+    `calibration` seconds of silence). One detector hears every
+    recording in order, as in a session, so its hangover adapts.
+
+    Args:
+        paths: WAV files
+        chunk: Samples per microphone read, for both endpointers
+        calibration: Seconds of leading audio used to measure the noise
+
+    Returns:
+        dict: Per-file speech end and endpoints (seconds into the
+            recording), and the mean time saved
+    """
+    import speech_recognition as sr
+    from config import VOICE_TIMEOUT, VOICE_PHRASE_LIMIT
+    from vad import VoiceActivityDetector, read_wav
+
+    files = []
+    vad = None
+    for path in paths:
+        # The recognizer settings VoiceRecognizer used before the VAD
+        recognizer = sr.Recognizer()
+        recognizer.energy_threshold = 4000
+        recognizer.dynamic_energy_threshold = True
+        recognizer.pause_threshold = 0.8
+        with sr.AudioFile(path) as source:
+            source.CHUNK = chunk
+            recognizer.adjust_for_ambient_noise(source, duration=calibration)
+            try:
+                recognizer.listen(source, timeout=VOICE_TIMEOUT, phrase_time_limit=VOICE_PHRASE_LIMIT)
+                pause_endpoint = source.audio_reader.tell() / source.SAMPLE_RATE
+            except sr.WaitTimeoutError:
+                pause_endpoint = None
+
+        data, rate = read_wav(path)
+        if vad is None or vad.sample_rate != rate:
+            vad = VoiceActivityDetector(rate)
+        vad.reset()
+        start = int(calibration * rate) * 2
+        vad.calibrate(data[:start])
+        vad_endpoint = None
+        for offset in range(start, len(data), chunk * 2):
+            if vad.feed(data[offset:offset + chunk * 2]):
+                vad_endpoint = (offset + chunk * 2) / 2 / rate
+                break
+
+        speech_end = None if vad.speech_end is None else vad.speech_end / rate + calibration
+        decisions = vad.decisions()
+        files.append({
+            "path": path,
+            "speech_end": speech_end,
+            "pause_endpoint": pause_endpoint,
+            "vad_endpoint": vad_endpoint,
+            "saved": pause_endpoint - vad_endpoint if pause_endpoint and vad_endpoint else None,
+            "vad": vad.summary(),
+            "decisions": {name: values.tolist() for name, values in decisions.items()},
+        })
+
+    saved = [f["saved"] for f in files if f["saved"] is not None]
+    return {"files": files, "mean_saved": sum(saved) / len(saved) if saved else None}
+
+
+def print_vad_report(results):
+    """Print an endpointing comparison table"""
+    print("=" * 60)
+    print(f"Endpointing: VAD vs 0.8s pause threshold ({len(results['files'])} recordings)")
+    print("=" * 60)
+    print(f"{'Recording':<28}{'speech':>8}{'pause':>8}{'vad':>8}{'saved':>8}")
+    print("-" * 60)
+
+    def cell(seconds):
+        return f"{seconds * 1000:>6.0f}ms" if seconds is not None else f"{'-':>8}"
+
+    for f in results["files"]:
+        name = f["path"][-27:]
+        print(f"{name:<28}{cell(f['speech_end'])}{cell(f['pause_endpoint'])}{cell(f['vad_endpoint'])}{cell(f['saved'])}")
+    print()
+    if results["mean_saved"] is not None:
+        print(f"Mean time saved per command: {results['mean_saved'] * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JARVIS end-to-end latency benchmark")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for every simulated delay")
+    parser.add_argument("--capture", default="uniform:1.0,2.0", help="speaking time without a recording")
+    parser.add_argument("--stt", default="lognormal:0.5,0.3", help="speech-to-text latency")
+    parser.add_argument("--llm-latency", default="lognormal:0.6,0.5", help="Gemini response latency")
+    parser.add_argument("--manifest", help="JSONL of {\"text\": ..., \"wav\": optional recording}")
+    parser.add_argument("--pipelined", action="store_true", help="overlap capture with understanding and execution")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline output")
+    parser.add_argument("--vad", nargs="+", metavar="WAV", help="compare VAD endpointing with the pause threshold instead")
+    args = parser.parse_args()
+
+    if args.vad:
+        results = run_vad_benchmark(args.vad)
+        print_vad_report(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    utterances = None
+    if args.manifest:
+        with open(args.manifest, encoding="utf-8") as f:
+            utterances = [json.loads(line) for line in f if line.strip()]
+
+    results = run_benchmark(args.iterations, args.seed, args.scale, args.capture,
+                            args.stt, args.llm_latency, utterances, args.pipelined, args.verbose)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Command Index Module
+Normalized, fuzzy lookup of known commands for instant responses
+"""
+
+from difflib import SequenceMatcher
+import re
+from config import COMMAND_CACHE, APP_PATHS, COMMAND_MATCH_THRESHOLD, DEBUG_MODE
+
+# Words that carry no meaning for command matching
+FILLER_WORDS = {
+    "please", "hey", "jarvis", "can", "could", "would", "will", "you",
+    "the", "a", "an", "my", "me", "for", "now", "just", "kindly",
+    "browser", "app", "application", "program",
+}
+
+# Verbs that mean the same thing as the first word of an indexed command
+VERB_SYNONYMS = {
+    "launch": "open",
+    "start": "open",
+    "run": "open",
+    "shut": "close",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_utterance(text):
+    """
+    Normalize case, punctuation and spacing while keeping every word
+
+    Args:
+        text: Raw command text
+
+    Returns:
+        str: Lowercase text without punctuation
+    """
+    if not text:
+        return ""
+
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def normalize_command(text):
+    """
+    Normalize a command for matching
+
+    Args:
+        text: Raw command text
+
+    Returns:
+        str: Lowercase text without punctuation, filler words or verb synonyms
+    """
+    words = normalize_utterance(text).split()
+    words = [w for w in words if w not in FILLER_WORDS]
+    if words:
+        words[0] = VERB_SYNONYMS.get(words[0], words[0])
+    return " ".join(words)
+
+
+class CommandIndex:
+    def __init__(self, commands=None, app_paths=None, threshold=COMMAND_MATCH_THRESHOLD):
+        """
+        Build the index once from the known commands
+
+        Args:
+            commands: Mapping of command text to action dict (defaults to COMMAND_CACHE)
+            app_paths: Mapping of app names to executables (defaults to APP_PATHS)
+            threshold: Minimum fuzzy score (0-1) to accept a match
+        """
+        self.threshold = threshold
+        self.exact = {}
+        self.by_length = {}
+
+        commands = COMMAND_CACHE if commands is None else commands
+        app_paths = APP_PATHS if app_paths is None else app_paths
+
+        # Every configured app can be opened by name
+        for app in app_paths:
+            self._add(f"open {app}", {"action": "launch_app", "param": app})
+
+        # Explicit commands win over generated ones
+        for text, action in commands.items():
+            self._add(text, action)
+
+        for key, action in self.exact.items():
+            words = key.split()
+            self.by_length.setdefault(len(words), []).append((key, words, action))
+
+        if DEBUG_MODE:
+            print(f"✓ Command index built ({len(self.exact)} commands)")
+
+    def _add(self, text, action):
+        """Add a command under its normalized key"""
+        key = normalize_command(text)
+        if key:
+            self.exact[key] = {"action": action["action"], "param": action["param"]}
+
+    def lookup(self, text):
+        """
+        Find the best matching known command
+
+        Args:
+            text: Voice command text
+
+        Returns:
+            dict: Copy of the action with a confidence score, or None if no match
+        """
+        key = normalize_command(text)
+        if not key:
+            return None
+
+        action = self.exact.get(key)
+        if action:
+            return {**action, "confidence": 1.0}
+
+        # Fuzzy match against commands with the same verb and word count,
+        # so "type open chrome" never matches "open chrome"
+        words = key.split()
+        best_score = 0.0
+        best_action = None
+        for candidate, candidate_words, action in self.by_length.get(len(words), ()):
+            if candidate_words[0] != words[0]:
+                continue
+
+            matcher = SequenceMatcher(None, key, candidate)
+            if matcher.real_quick_ratio() < self.threshold or matcher.quick_ratio() < self.threshold:
+                continue
+
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best_action = action
+
+        if best_action and best_score >= self.threshold:
+            return {**best_action, "confidence": round(best_score, 2)}
+
+        return None
+
+    def __len__(self):
+        return len(self.exact)
+
+# Test function
+def test():
+    """Test the command index"""
+    print("=" * 60)
+    print("Command Index Test")
+    print("=" * 60)
+
+    index = CommandIndex()
+
+    test_commands = [
+        "open edge browser",
+        "Open Edge.",
+        "please open edge",
+        "launch crome",
+        "close the window",
+        "type open chrome",
+        "search for pizza",
+    ]
+
+    for cmd in test_commands:
+        result = index.lookup(cmd)
+        print(f"'{cmd}' → {result}")
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,140 @@
+"""
+Components Module
+Lazy construction of the heavy components (speech recognition, Gemini,
+Tk, pynput) so the hotkey listener comes up first, plus a startup
+profile of what each component costs
+"""
+
+import time
+
+# Measured from the moment the application starts importing its parts
+STARTED = time.perf_counter()
+
+from contextlib import contextmanager
+import importlib
+import threading
+from runtime import runtime
+
+
+class StartupProfile:
+    def __init__(self, origin=STARTED):
+        """
+        Record the import and init cost of each component
+
+        Args:
+            origin: time.perf_counter() that milestones are measured from
+        """
+        self.origin = origin
+        self.costs = {}  # component -> {"import": seconds, "init": seconds}
+        self.milestones = {}  # name -> seconds since origin
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, component, phase):
+        """
+        Time one phase ("import" or "init") of a component
+
+        Args:
+            component: Component name
+            phase: Phase name (not recorded if it fails)
+        """
+        start = time.perf_counter()
+        yield
+        with self.lock:
+            self.costs.setdefault(component, {})[phase] = time.perf_counter() - start
+
+    def milestone(self, name):
+        """Record that a startup milestone was reached"""
+        with self.lock:
+            self.milestones.setdefault(name, time.perf_counter() - self.origin)
+
+    def report(self):
+        """
+        Format the profile
+
+        Returns:
+            str: Table of import/init cost per component and the milestones
+        """
+        lines = [f"{'Component':<12}{'import':>10}{'init':>10}", "-" * 32]
+        with self.lock:
+            for component, costs in self.costs.items():
+                cells = "".join(
+                    f"{costs[phase] * 1000:>8.0f}ms" if phase in costs else f"{'-':>10}"
+                    for phase in ("import", "init")
+                )
+                lines.append(f"{component:<12}{cells}")
+            lines.append("")
+            for name, seconds in sorted(self.milestones.items(), key=lambda item: item[1]):
+                lines.append(f"{name}: {seconds * 1000:.0f}ms")
+        return "\n".join(lines)
+
+# Shared profile filled in during startup
+startup_profile = StartupProfile()
+
+
+class Component:
+    def __init__(self, label, module_name, class_name, instance=None):
+        """
+        A component built on first use (or warmed in the background);
+        attribute access is forwarded to the built instance
+
+        Args:
+            label: Name used in the startup profile
+            module_name: Module defining the component class
+            class_name: Class to instantiate
+            instance: Already-built instance to use instead (e.g. a stand-in)
+        """
+        self.label = label
+        self.module_name = module_name
+        self.class_name = class_name
+        self.instance = instance
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        Get the instance, importing and building it on first use
+
+        Returns:
+            object: The component
+        """
+        instance = self.instance
+        if instance is not None:
+            return instance
+
+        with self.lock:
+            if self.instance is None:
+                with startup_profile.measure(self.label, "import"):
+                    cls = getattr(importlib.import_module(self.module_name), self.class_name)
+                with startup_profile.measure(self.label, "init"):
+                    self.instance = cls()
+            return self.instance
+
+    @property
+    def loaded(self):
+        """Whether the instance exists yet"""
+        return self.instance is not None
+
+    def warm(self):
+        """
+        Build the component on the runtime's worker pool
+
+        Returns:
+            concurrent.futures.Future: Resolves to True once built, or False
+                if building failed (the error is printed)
+        """
+        return runtime.offload(self._warm)
+
+    def _warm(self):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"⚠️  Could not start {self.label}: {e}")
+            return False
+        startup_profile.milestone(f"{self.label}_ready")
+        return True
+
+    def __getattr__(self, name):
+        # Only reached for attributes the wrapper itself does not have
+        if name.startswith("__") or name in ("instance", "lock"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
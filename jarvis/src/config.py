@@ -9,44 +9,115 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# API Keys - Load from environment variables
+# API Keys - Load from environment variables (checked when the brain starts)
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set. Create .env file from .env.example")
 
 # Voice Recognition Settings
 VOICE_LANGUAGE = "en-US"
 VOICE_TIMEOUT = 5  # seconds to wait for speech
 VOICE_PHRASE_LIMIT = 10  # max seconds for a single phrase
+AUDIO_BUFFER_SECONDS = 30  # microphone audio kept in memory while always listening
+AUDIO_PREROLL = 0.3  # seconds of audio from before the hotkey press included in a command
+
+# Voice activity detection: ends a command as soon as speech stops
+VAD_FRAME_MS = 20  # analysis frame length
+VAD_ENERGY_RATIO = 3.0  # frame loudness over the noise floor that counts as speech
+VAD_MIN_ENERGY = 100  # RMS below which nothing counts as speech
+VAD_UNVOICED_ZCR = 0.3  # zero-crossing rate of quieter unvoiced sounds (s, f, th)
+VAD_MIN_SPEECH = 3  # speech frames in a row that start an utterance
+VAD_NOISE_ADAPT = 0.05  # how fast the noise floor follows non-speech frames
+VAD_HANGOVER = 0.5  # seconds of silence that end an utterance until pauses are observed
+VAD_MIN_HANGOVER = 0.25  # bounds for the hangover adapted to the speaker's pauses
+VAD_MAX_HANGOVER = 0.8
+VAD_PAUSE_HISTORY = 50  # pauses between words remembered for adapting the hangover
+VAD_PADDING = 0.2  # seconds of audio kept around the detected speech
+
+# Background noise tracking (keeps speech detection tuned as the room changes)
+NOISE_WINDOW = 3.0  # seconds of recent audio the noise level is estimated over
+NOISE_PERCENTILE = 20  # loudness percentile of that audio taken as background
+NOISE_SMOOTHING = 0.1  # weight of each new estimate (about 15 estimates per second)
+
+# Speech-to-text engines, raced against each other (the first transcript wins)
+STT_BACKENDS = ["google"]  # google, whisper (offline, needs faster-whisper), fake (tests)
+STT_DEADLINE = 3.0  # seconds before a transcription is given up
+WHISPER_MODEL = "base.en"  # faster-whisper model size or path
+WHISPER_COMPUTE_TYPE = "int8"  # quantization used on the CPU
+
+# Speculative understanding of interim transcripts while the user speaks
+SPECULATIVE_MODE = True
+SPECULATION_INTERVAL = 0.6  # seconds of new audio between interim transcripts
+SPECULATION_MAX_INFLIGHT = 2  # concurrent speculative brain calls
+SPECULATION_MIN_STABILITY = 0.5  # share of an interim transcript that must agree with the previous one (unstable partials mostly waste brain calls)
 
 # Gemini AI Settings
-GEMINI_MODEL = "gemini-pro"
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")  # Must support system instructions
 GEMINI_TEMPERATURE = 0.3  # Lower = more focused/deterministic
-GEMINI_MAX_TOKENS = 500
+GEMINI_MAX_TOKENS = 200  # A command decision is a short JSON object (a plan a few of them)
+GEMINI_CHAT_MAX_TOKENS = 500
+PROMPT_TOKEN_BUDGET = 400  # max input tokens per command request
+GEMINI_DEADLINE = 4.0  # seconds before a command request is abandoned
+GEMINI_HEDGING = True  # send a second request when the first is slow
+GEMINI_HEDGE_DELAY = 1.0  # seconds to wait before hedging until p95 is known
+GEMINI_HEDGE_MIN_SAMPLES = 20  # latency samples needed to hedge at p95
+GEMINI_BATCH_SIZE = 20  # commands packed into one batched request
+GEMINI_BATCH_CONCURRENCY = 3  # batched requests in flight at once
+GEMINI_BATCH_DEADLINE = 20.0  # seconds before a batched request is abandoned
+PLAN_MAX_STEPS = 5  # most actions chained in one utterance
+PLAN_MAX_PARALLEL = 3  # plan steps executed at the same time
+PLAN_FOCUS_TIMEOUT = 5.0  # seconds a step that opens a window waits for it to take the focus before dependent keystrokes
+PLAN_FOCUS_SETTLE = 0.3  # seconds for the new window to accept input once it has the focus
+PLAN_FOCUS_FALLBACK = 1.5  # seconds to wait instead where the focused window cannot be queried
+GEMINI_STREAMING = True  # Dispatch as soon as confidence, action and param are streamed
+
+# Wake word: say "Jarvis" instead of pressing the hotkey
+WAKE_WORD_ENABLED = True  # needs a model: python wake_word.py --enroll take1.wav take2.wav ...
+WAKE_WORD_MODEL = "wake_word.npz"
+WAKE_WORD_SENSITIVITY = 1.1  # allowed distance relative to the enrolled takes (higher triggers more easily)
+WAKE_WORD_COOLDOWN = 2.0  # seconds after a trigger before the next one
 
 # Hotkey Settings
 HOTKEY = "<cmd>+h"  # Windows+H (use <cmd> for Windows key)
 HOTKEY_ALTERNATIVE = "ctrl+shift+j"  # Alternative if Windows+H doesn't work
+HOTKEY_DEBOUNCE = 0.3  # seconds after a trigger before the hotkey fires again
+HOTKEY_STUCK_TIMEOUT = 10.0  # seconds after which a held key is assumed released (missed release event)
 
 # GUI Settings
 OVERLAY_POSITION = "top-right"  # top-right, top-left, bottom-right, bottom-left, center
 OVERLAY_WIDTH = 300
 OVERLAY_HEIGHT = 80
 OVERLAY_OPACITY = 0.9
+OVERLAY_REFRESH_INTERVAL = 0.05  # seconds per overlay frame (updates arriving within one frame are merged)
+OVERLAY_HUD = False  # show per-stage latency of each command and a p50/p95 sparkline
+OVERLAY_HUD_HEIGHT = 90  # extra pixels the HUD adds below the status
+OVERLAY_HUD_HISTORY = 20  # commands in the sparkline and percentiles
+OVERLAY_HUD_FPS = 5  # most HUD redraws per second
 
 # Typing Settings
 TYPING_SPEED = 0.01  # seconds between keystrokes (0.01 = very fast)
 TYPING_MODE = "instant"  # instant, fast, medium, slow
 
 # Performance Settings
-CACHE_COMMANDS = True
-PRELOAD_AI = True
-ASYNC_MODE = True
+CACHE_COMMANDS = True  # answer known and learned commands without Gemini
+PRELOAD_AI = True  # build the Gemini brain at startup instead of on the first command
+ASYNC_MODE = True  # build components in the background after the hotkey listener starts
+RUNTIME_WORKERS = 4  # threads for blocking work such as interim transcription
+COMMAND_QUEUE_SIZE = 3  # commands waiting per pipeline stage before new activations are rejected
 
 # Audio Feedback
 FEEDBACK_SOUND = True
 VOICE_FEEDBACK = False  # Text-to-speech (optional, slower)
 
+# Metrics
+LATENCY_WINDOW_SIZE = 200  # recent samples kept for percentiles
+
+# Tracing: per-stage spans exported in the background after each command
+TRACING_ENABLED = True
+TRACE_FILE = "jarvis_trace.jsonl"  # one JSON line per span
+TRACE_MAX_BYTES = 10 * 1024 * 1024  # trace file size before it is rotated to <file>.1
+TRACE_FLUSH_INTERVAL = 1.0  # seconds between exports at most
+METRICS_FILE = "jarvis_metrics.prom"  # Prometheus text format
+TRACE_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]  # seconds
+
 # Logging
 LOG_COMMANDS = True
 LOG_FILE = "jarvis.log"
@@ -69,6 +140,35 @@ APP_PATHS = {
     "powershell": "powershell",
 }
 
+# Website shortcuts (spoken name → address)
+WEBSITE_SHORTCUTS = {
+    "youtube": "youtube.com",
+    "gmail": "mail.google.com",
+    "github": "github.com",
+    "twitter": "twitter.com",
+    "facebook": "facebook.com",
+}
+
+# Command Index: minimum fuzzy score (0-1) for a cached command to match
+COMMAND_MATCH_THRESHOLD = 0.85
+
+# Intent Parser: minimum rule confidence to skip the Gemini call
+INTENT_PARSER_MIN_CONFIDENCE = 0.9
+
+# Response Cache: validated Gemini decisions remembered on disk
+RESPONSE_CACHE_FILE = "jarvis_cache.db"
+RESPONSE_CACHE_MAX_ENTRIES = 5000
+RESPONSE_CACHE_TTL = 30 * 24 * 3600  # seconds
+RESPONSE_CACHE_MIN_CONFIDENCE = 0.7
+
+# Intent Classifier: offline model trained from known and logged decisions
+INTENT_MODEL_FILE = "intent_model.npz"
+INTENT_FEATURE_DIM = 4096  # hashed character n-gram buckets
+INTENT_CLASSIFIER_MIN_SCORE = 0.3  # minimum similarity to the best action
+INTENT_CLASSIFIER_MIN_MARGIN = 0.2  # minimum lead over the runner-up action
+INTENT_CLASSIFIER_PARAM_MIN_SCORE = 0.7  # fixed parameters not named in the utterance need this similarity
+INTENT_CLASSIFIER_PARAM_MIN_MARGIN = 0.3  # ... and this lead over the runner-up parameter
+
 # Command Cache (for instant responses)
 COMMAND_CACHE = {
     "open edge": {"action": "launch_app", "param": "edge"},
@@ -4,112 +4,404 @@ Uses Google Gemini to understand commands and decide actions
 """
 
 import google.generativeai as genai
-from config import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_TEMPERATURE, COMMAND_CACHE, DEBUG_MODE
+from config import (
+    GEMINI_API_KEY, GEMINI_MODEL, GEMINI_TEMPERATURE, GEMINI_MAX_TOKENS,
+    GEMINI_CHAT_MAX_TOKENS, GEMINI_STREAMING, GEMINI_DEADLINE, GEMINI_HEDGING,
+    GEMINI_HEDGE_DELAY, GEMINI_HEDGE_MIN_SAMPLES, GEMINI_BATCH_SIZE, GEMINI_BATCH_CONCURRENCY,
+    GEMINI_BATCH_DEADLINE, INTENT_PARSER_MIN_CONFIDENCE, CACHE_COMMANDS, DEBUG_MODE,
+)
+from command_index import CommandIndex, normalize_utterance
+from action_plan import split_utterance, make_plan, parse_plan
+from intent_parser import IntentParser
+from metrics import LatencyWindow
+from prompt_compiler import PromptCompiler
+from response_cache import ResponseCache
+from stream_parser import ActionStreamParser
+from tracing import tracer
+from runtime import runtime
+try:
+    from intent_classifier import IntentClassifier
+except ImportError:
+    IntentClassifier = None  # NumPy not installed
+from collections import OrderedDict
+import asyncio
 import json
 import re
+import threading
+import time
+
+# Speculative answers kept until a final transcript confirms one
+MAX_UNCONFIRMED = 32
+
+# Stands for "load the trained model" where None means no classifier
+DEFAULT_CLASSIFIER = object()
 
 class GeminiBrain:
-    def __init__(self):
+    def __init__(self, model=None, response_cache=None, classifier=DEFAULT_CLASSIFIER):
+        """
+        Initialize the brain
+        
+        Args:
+            model: Optional stand-in for the Gemini model (used by benchmarks)
+            response_cache: Optional ResponseCache to use instead of the default file
+            classifier: IntentClassifier to use, None for none (default:
+                load INTENT_MODEL_FILE if NumPy is installed)
+        """
         # Configure Gemini API
+        if model is None and not GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY environment variable not set. Create .env file from .env.example")
         genai.configure(api_key=GEMINI_API_KEY)
         
+        # Instructions are compiled once and sent as the system instruction,
+        # so each request only carries the user's command
+        self.prompts = PromptCompiler()
+        
         # Initialize model
-        self.model = genai.GenerativeModel(
+        self.model = model or genai.GenerativeModel(
             model_name=GEMINI_MODEL,
             generation_config={
                 "temperature": GEMINI_TEMPERATURE,
                 "top_p": 0.95,
                 "top_k": 40,
-                "max_output_tokens": 500,
-            }
+                "max_output_tokens": GEMINI_MAX_TOKENS,
+            },
+            system_instruction=self.prompts.command_instruction
         )
+        self.chat_model = None
         
-        # System prompt for command understanding
-        self.system_prompt = """You are JARVIS, a voice assistant that converts natural language commands into structured actions.
-
-Given a user voice command, respond with ONLY a JSON object in this exact format:
-{
-    "action": "action_type",
-    "param": "parameter",
-    "confidence": 0.95
-}
-
-Action types:
-- "launch_app": Open an application (param: app name like "edge", "chrome", "notepad", "vscode", "calculator")
-- "type_text": Type text on screen (param: the exact text to type)
-- "web_search": Search on Google (param: search query)
-- "open_website": Open specific website (param: URL or site name)
-- "system_control": System action (param: "close_window", "minimize_all", "lock", "volume_up", "volume_down", "mute", "screenshot")
-- "file_operation": File/folder operation (param: "open_downloads", "open_documents", "open_desktop")
-- "unknown": Cannot determine action (param: reason)
-
-Examples:
-User: "open edge browser"
-Response: {"action": "launch_app", "param": "edge", "confidence": 0.98}
-
-User: "search for pizza near me"
-Response: {"action": "web_search", "param": "pizza near me", "confidence": 0.95}
-
-User: "type hello world"
-Response: {"action": "type_text", "param": "hello world", "confidence": 0.99}
-
-User: "close this window"
-Response: {"action": "system_control", "param": "close_window", "confidence": 0.97}
-
-User: "go to youtube"
-Response: {"action": "open_website", "param": "youtube.com", "confidence": 0.96}
-
-User: "open downloads folder"
-Response: {"action": "file_operation", "param": "open_downloads", "confidence": 0.98}
-
-Respond with ONLY the JSON object, no other text."""
+        # Known commands for instant responses
+        self.command_index = CommandIndex() if CACHE_COMMANDS else None
+        self.intent_parser = IntentParser()
+        
+        # Decisions learned from earlier Gemini calls (loaded in the background)
+        self.response_cache = response_cache or ResponseCache()
+        if CACHE_COMMANDS:
+            self.response_cache.start()
+        else:
+            self.response_cache.disable()
+        
+        # Offline classifier trained from earlier decisions (optional)
+        if classifier is DEFAULT_CLASSIFIER:
+            classifier = IntentClassifier.load() if IntentClassifier else None
+        self.classifier = classifier
+        
+        # Async client state (requests run on the shared runtime loop, so
+        # the Gemini client reuses its connection across calls)
+        self.latency = LatencyWindow()
+        self.hedges = 0
+        self.timeouts = 0
+        
+        # Gemini answers to interim transcripts, cached only once confirmed
+        self.unconfirmed = OrderedDict()  # normalized transcript -> (text, result)
+        self.unconfirmed_lock = threading.Lock()
         
         print("✓ Gemini AI Brain initialized")
     
-    def understand_command(self, text):
+    def understand_command(self, text, speculative=False):
         """
         Understand voice command and return action
         
+        Thin blocking wrapper around understand_command_async, safe to call
+        from any thread except the runtime's event loop.
+        
         Args:
             text: Voice command text
+            speculative: The text is an interim transcript; Gemini's answer
+                is only cached once confirm_speculation() is called for it
             
         Returns:
             dict: {"action": "action_type", "param": "parameter", "confidence": float}
         """
-        if not text:
-            return {"action": "unknown", "param": "no input", "confidence": 0.0}
+        local = self._understand_locally(text)
+        if local:
+            return local
         
-        # Check cache first for instant response
-        if text in COMMAND_CACHE:
+        # Carry the caller's trace over to the brain's event loop
+        future = runtime.submit(self._understand_remotely(text, trace=tracer.current(), speculative=speculative))
+        return future.result()
+    
+    def confirm_speculation(self, text):
+        """
+        Cache the speculative answer for a transcript the user really said
+        
+        Args:
+            text: Final transcript that matched the speculation
+        """
+        with self.unconfirmed_lock:
+            entry = self.unconfirmed.pop(normalize_utterance(text), None)
+        if entry:
+            self.response_cache.put(text, entry[1])
+    
+    async def understand_command_async(self, text, deadline=GEMINI_DEADLINE):
+        """
+        Understand voice command without blocking the event loop
+        
+        Args:
+            text: Voice command text
+            deadline: Seconds to wait for Gemini before giving up
+            
+        Returns:
+            dict: {"action": "action_type", "param": "parameter", "confidence": float}
+        """
+        local = self._understand_locally(text)
+        if local:
+            return local
+        
+        return await self._understand_remotely(text, deadline)
+    
+    def understand_commands(self, texts):
+        """
+        Understand many commands at once (blocking wrapper)
+        
+        Args:
+            texts: Voice command texts
+            
+        Returns:
+            list: One action dict per input, in input order
+        """
+        future = runtime.submit(self.understand_commands_async(texts))
+        return future.result()
+    
+    async def understand_commands_async(self, texts):
+        """
+        Understand many commands at once. Duplicates are resolved once, local
+        hits never reach the network and the remaining commands are packed
+        into a few batched Gemini requests.
+        
+        Args:
+            texts: Voice command texts
+            
+        Returns:
+            list: One action dict per input, in input order
+        """
+        # Deduplicate by normalized utterance
+        unique = {}
+        for text in texts:
+            unique.setdefault(normalize_utterance(text), text)
+        
+        results = {}
+        misses = []
+        for key, text in unique.items():
+            local = self._understand_locally(text)
+            if local:
+                results[key] = local
+            else:
+                misses.append((key, text))
+        
+        if misses:
             if DEBUG_MODE:
-                print(f"⚡ Cache hit: '{text}'")
-            cached = COMMAND_CACHE[text]
-            cached["confidence"] = 1.0
-            return cached
+                print(f"🤖 AI analyzing {len(misses)} of {len(texts)} commands in batches")
+            
+            semaphore = asyncio.Semaphore(GEMINI_BATCH_CONCURRENCY)
+            batches = [misses[i:i + GEMINI_BATCH_SIZE] for i in range(0, len(misses), GEMINI_BATCH_SIZE)]
+            
+            async def _run(batch):
+                async with semaphore:
+                    return await self._ask_model_batch([text for _, text in batch])
+            
+            for batch, answers in zip(batches, await asyncio.gather(*(_run(b) for b in batches))):
+                for (key, text), result in zip(batch, answers):
+                    results[key] = result
+        
+        return [dict(results[normalize_utterance(text)]) for text in texts]
+    
+    async def _ask_model_batch(self, texts):
+        """
+        Send one batched request to Gemini
+        
+        Args:
+            texts: Voice command texts
+            
+        Returns:
+            list: One action dict per text, in order
+        """
+        request = self.prompts.batch_request(texts)
         
         try:
-            if DEBUG_MODE:
-                print(f"🤖 AI analyzing: '{text}'")
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(
+                    request,
+                    generation_config={"max_output_tokens": GEMINI_MAX_TOKENS * len(texts)}
+                ),
+                GEMINI_BATCH_DEADLINE
+            )
+            self.prompts.record(request, response, response.text, commands=len(texts))
+            answers = self._parse_response(response.text)
+            if not isinstance(answers, list):
+                raise ValueError("Invalid batch response format")
+        
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"❌ AI timeout: batch of {len(texts)} not answered within {GEMINI_BATCH_DEADLINE:.1f}s")
+            return [{"action": "unknown", "param": "timeout", "confidence": 0.0} for _ in texts]
+        
+        except Exception as e:
+            print(f"❌ AI batch error: {e}")
+            return [{"action": "unknown", "param": str(e), "confidence": 0.0} for _ in texts]
+        
+        # Match answers by id, falling back to position
+        by_id = {}
+        for position, answer in enumerate(answers, 1):
+            if isinstance(answer, dict):
+                by_id.setdefault(answer.get("id", position), answer)
+        
+        results = []
+        for i, text in enumerate(texts, 1):
+            answer = by_id.get(i) or by_id.get(str(i))
+            if answer and "steps" in answer:
+                try:
+                    results.append(parse_plan(answer))
+                except ValueError as e:
+                    results.append({"action": "unknown", "param": str(e), "confidence": 0.0})
+                continue
             
-            # Send to Gemini
-            prompt = f"{self.system_prompt}\n\nUser: \"{text}\""
-            response = self.model.generate_content(prompt)
+            if not answer or "action" not in answer or "param" not in answer:
+                results.append({"action": "unknown", "param": "missing from batch", "confidence": 0.0})
+                continue
+            
+            result = {
+                "action": answer["action"],
+                "param": answer["param"],
+                "confidence": answer.get("confidence", 0.8),
+            }
+            if "confidence" in answer:
+                self.response_cache.put(text, result)
+            results.append(result)
+        
+        return results
+    
+    def _understand_locally(self, text):
+        """
+        Resolve a command without the network
+        
+        Args:
+            text: Voice command text
             
-            # Extract JSON from response
-            response_text = response.text.strip()
+        Returns:
+            dict: Action, or None if Gemini is needed
+        """
+        with tracer.span("cache_lookup") as span:
+            source, result = self._lookup(text)
+            span.set(cache_hit=result is not None, source=source or "none")
+        
+        tracer.annotate(cache_hit=result is not None, source=source or "model")
+        return result
+    
+    def _lookup(self, text, count=True):
+        """
+        Try each local source in turn
+        
+        Args:
+            text: Voice command text
+            count: Record the learned cache lookup in its hit/miss counters
+                (off for the parts of an utterance, which are not commands
+                in their own right)
             
+        Returns:
+            tuple: (source name, action), or (None, None) if Gemini is needed
+        """
+        if not text:
+            return "empty", {"action": "unknown", "param": "no input", "confidence": 0.0}
+        
+        # Several commands in one breath, each of them understood locally
+        plan = self._plan_locally(text)
+        if plan:
+            if DEBUG_MODE:
+                print(f"⚡ Local plan: '{text}' → {len(plan['steps'])} steps")
+            return "local_plan", plan
+        
+        # Check known commands first for instant response
+        cached = self.command_index.lookup(text) if self.command_index else None
+        if cached:
+            if DEBUG_MODE:
+                print(f"⚡ Cache hit: '{text}' (score {cached['confidence']:.2f})")
+            return "index", cached
+        
+        # Then the local grammar for common command patterns
+        parsed = self.intent_parser.parse(text)
+        if parsed and parsed["confidence"] >= INTENT_PARSER_MIN_CONFIDENCE:
             if DEBUG_MODE:
-                print(f"AI Response: {response_text}")
+                print(f"⚡ Local parse: '{text}' → {parsed['action']}")
+            return "parser", parsed
+        
+        # Then decisions Gemini already made for this utterance
+        learned = self.response_cache.get(text, count=count)
+        if learned:
+            if DEBUG_MODE:
+                print(f"⚡ Learned cache hit: '{text}'")
+            return "learned", learned
+        
+        # Finally the offline classifier, when it is clearly sure
+        if self.classifier:
+            predicted = self.classifier.predict(text)
+            if predicted:
+                if DEBUG_MODE:
+                    print(f"⚡ Classified: '{text}' → {predicted['action']} (margin {predicted['margin']:.2f})")
+                del predicted["margin"]
+                return "classifier", predicted
+        
+        return None, None
+    
+    def _plan_locally(self, text):
+        """
+        Understand an utterance chaining several commands without the network
+        
+        Args:
+            text: Voice command text
             
-            # Parse JSON
-            # Remove markdown code blocks if present
-            response_text = re.sub(r'```json\n?', '', response_text)
-            response_text = re.sub(r'```\n?', '', response_text)
+        Returns:
+            dict: Plan, or None unless it splits into commands that are all
+                understood locally
+        """
+        parts = split_utterance(text)
+        if not parts:
+            return None
+        
+        steps = []
+        confidence = 1.0
+        for part in parts:
+            _, result = self._lookup(part, count=False)
+            if not result:
+                return None
+            steps.append({"action": result["action"], "param": result["param"], "after": []})
+            confidence = min(confidence, result["confidence"])
+        
+        return make_plan(steps, confidence)
+    
+    async def _understand_remotely(self, text, deadline=GEMINI_DEADLINE, trace=None, speculative=False):
+        """
+        Ask Gemini, giving up after the deadline
+        
+        Args:
+            text: Voice command text
+            deadline: Seconds to wait for Gemini
+            trace: Trace to record spans under (defaults to the current one)
+            speculative: Hold the answer back from the cache until confirmed
+            
+        Returns:
+            dict: {"action": "action_type", "param": "parameter", "confidence": float}
+        """
+        with tracer.activate(trace or tracer.current()):
+            return await self._ask_and_validate(text, deadline, speculative)
+    
+    async def _ask_and_validate(self, text, deadline, speculative=False):
+        """Ask Gemini and validate its answer"""
+        try:
+            if DEBUG_MODE:
+                print(f"🤖 AI analyzing: '{text}'")
+            
+            # Send to Gemini
+            request = self.prompts.command_request(text)
+            result = await asyncio.wait_for(self._ask_model_hedged(request), deadline)
             
-            result = json.loads(response_text)
+            # An answer without the model's own confidence is used but never
+            # remembered: the default would clear the cache's confidence bar
+            rated = "confidence" in result
             
             # Validate result
-            if "action" not in result or "param" not in result:
+            if "steps" in result:
+                result = parse_plan(result)
+            elif "action" not in result or "param" not in result:
                 raise ValueError("Invalid response format")
             
             if "confidence" not in result:
@@ -118,17 +410,171 @@ Respond with ONLY the JSON object, no other text."""
             if DEBUG_MODE:
                 print(f"✓ Understood: {result}")
             
+            if not rated:
+                if DEBUG_MODE:
+                    print("⚠️  No confidence in the answer, not caching it")
+            elif speculative:
+                # Partial transcripts ("open chr") must not become cached
+                # decisions or training data unless the user said them
+                with self.unconfirmed_lock:
+                    self.unconfirmed[normalize_utterance(text)] = (text, result)
+                    while len(self.unconfirmed) > MAX_UNCONFIRMED:
+                        self.unconfirmed.popitem(last=False)
+            else:
+                self.response_cache.put(text, result)
             return result
+        
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"❌ AI timeout: no answer within {deadline:.1f}s")
+            return {"action": "unknown", "param": "timeout", "confidence": 0.0}
             
         except json.JSONDecodeError as e:
             print(f"❌ JSON parse error: {e}")
-            print(f"Response was: {response_text}")
             return {"action": "unknown", "param": "parse error", "confidence": 0.0}
             
         except Exception as e:
             print(f"❌ AI error: {e}")
             return {"action": "unknown", "param": str(e), "confidence": 0.0}
     
+    async def _ask_model_hedged(self, request):
+        """
+        Ask Gemini, sending a second identical request if the first is slower
+        than recent p95 latency; the first answer wins and the other is cancelled
+        
+        Args:
+            request: Request content for the model
+            
+        Returns:
+            dict: Parsed fields of the response
+        """
+        tasks = {asyncio.ensure_future(self._ask_model(request))}
+        
+        try:
+            if GEMINI_HEDGING:
+                done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay())
+                if not done:
+                    self.hedges += 1
+                    if DEBUG_MODE:
+                        print("🔀 Slow response, sending hedged request")
+                    tasks.add(asyncio.ensure_future(self._ask_model(request)))
+            
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _hedge_delay(self):
+        """Seconds to wait before hedging, from the recent p95 latency"""
+        if len(self.latency) < GEMINI_HEDGE_MIN_SAMPLES:
+            return GEMINI_HEDGE_DELAY
+        return self.latency.percentile(95)
+    
+    async def _ask_model(self, request):
+        """
+        Send one request to Gemini
+        
+        Args:
+            request: Request content for the model
+            
+        Returns:
+            dict: Parsed fields of the response
+        """
+        start = time.perf_counter()
+        
+        with tracer.span("llm_call", streaming=GEMINI_STREAMING):
+            if GEMINI_STREAMING:
+                result = await self._generate_streaming(request)
+            else:
+                response = await self.model.generate_content_async(request)
+                self.prompts.record(request, response, response.text)
+                result = self._parse_response(response.text)
+        
+        self.latency.add(time.perf_counter() - start)
+        return result
+    
+    async def _generate_streaming(self, request):
+        """
+        Stream the response and stop as soon as confidence, action and param
+        are complete, without waiting for trailing tokens
+        
+        Args:
+            request: Request content for the model
+            
+        Returns:
+            dict: Parsed fields of the response
+        """
+        parser = ActionStreamParser()
+        chunks = []
+        
+        parse_time = 0.0
+        
+        response = await self.model.generate_content_async(request, stream=True)
+        async for chunk in response:
+            chunks.append(chunk.text)
+            start = time.perf_counter()
+            ready = parser.feed(chunk.text)
+            parse_time += time.perf_counter() - start
+            if ready:
+                tracer.record("json_parse", parse_time, streaming=True)
+                self.prompts.record(request, response_text="".join(chunks))
+                if DEBUG_MODE:
+                    print(f"⚡ Early dispatch after {len(chunks)} chunk(s): {parser.result()}")
+                return parser.result()
+        
+        # The stream ended before all three fields were seen: parse it whole
+        self.prompts.record(request, response_text="".join(chunks))
+        return self._parse_response("".join(chunks))
+    
+    def stats(self):
+        """
+        Get brain metrics
+        
+        Returns:
+            dict: Model latency, hedges, timeouts, cache and token counters
+        """
+        return {
+            "latency": self.latency.summary(),
+            "hedges": self.hedges,
+            "timeouts": self.timeouts,
+            "response_cache": self.response_cache.stats(),
+            "tokens": self.prompts.usage(),
+        }
+    
+    def _parse_response(self, response_text):
+        """
+        Parse a complete response from Gemini
+        
+        Args:
+            response_text: Raw response text
+            
+        Returns:
+            dict: Parsed JSON object
+        """
+        response_text = response_text.strip()
+        
+        if DEBUG_MODE:
+            print(f"AI Response: {response_text}")
+        
+        with tracer.span("json_parse", streaming=False):
+            # Remove markdown code blocks if present
+            response_text = re.sub(r'```json\n?', '', response_text)
+            response_text = re.sub(r'```\n?', '', response_text)
+            
+            try:
+                return json.loads(response_text)
+            except json.JSONDecodeError:
+                print(f"Response was: {response_text}")
+                raise
+    
     def get_smart_response(self, text):
         """
         Get a conversational response (for advanced features)
@@ -140,7 +586,19 @@ Respond with ONLY the JSON object, no other text."""
             str: AI response
         """
         try:
-            response = self.model.generate_content(f"User says: {text}\nRespond briefly and helpfully.")
+            if self.chat_model is None:
+                self.chat_model = genai.GenerativeModel(
+                    model_name=GEMINI_MODEL,
+                    generation_config={
+                        "temperature": GEMINI_TEMPERATURE,
+                        "max_output_tokens": GEMINI_CHAT_MAX_TOKENS,
+                    },
+                    system_instruction=self.prompts.chat_instruction
+                )
+            
+            request = self.prompts.chat_request(text)
+            response = self.chat_model.generate_content(request)
+            self.prompts.record(request, response, response.text, self.prompts.chat_instruction)
             return response.text.strip()
         except Exception as e:
             print(f"❌ AI response error: {e}")
@@ -165,12 +623,15 @@ def test():
         "open downloads folder",
     ]
     
-    for cmd in test_commands:
+    results = brain.understand_commands(test_commands)
+    
+    for cmd, result in zip(test_commands, results):
         print(f"\nCommand: '{cmd}'")
-        result = brain.understand_command(cmd)
         print(f"→ Action: {result['action']}")
         print(f"→ Param: {result['param']}")
         print(f"→ Confidence: {result['confidence']:.2f}")
+    
+    print(f"\nStats: {brain.stats()}")
 
 if __name__ == "__main__":
     test()
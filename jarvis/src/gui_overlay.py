@@ -1,19 +1,76 @@
 """
 GUI Overlay Module
 Shows visual feedback for Jarvis status
+
+The overlay owns one Tk thread. Other threads only put updates on a
+queue and wake the Tk thread, which drains it at most once per frame, so
+a status change never blocks the voice or brain stages and an idle
+overlay does not wake up at all.
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
-from config import OVERLAY_POSITION, OVERLAY_WIDTH, OVERLAY_HEIGHT, OVERLAY_OPACITY
-import threading
+from config import (
+    OVERLAY_POSITION, OVERLAY_WIDTH, OVERLAY_HEIGHT, OVERLAY_OPACITY, OVERLAY_REFRESH_INTERVAL,
+    OVERLAY_HUD, OVERLAY_HUD_HEIGHT, OVERLAY_HUD_HISTORY, OVERLAY_HUD_FPS,
+)
+from metrics import LatencyWindow
+
+# Pipeline stages shown in the HUD, with their labels
+HUD_STAGES = [("listen", "capture"), ("recognize", "stt"), ("understand", "brain"), ("execute", "exec")]
+
+# Height of the HUD sparkline in pixels
+SPARKLINE_HEIGHT = 28
+
+
+def format_seconds(seconds):
+    """Format a duration compactly (ms below one second)"""
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
 
 class JarvisOverlay:
-    def __init__(self):
+    def __init__(self, hud=OVERLAY_HUD):
+        """
+        Initialize the overlay (the window is created on its own thread)
+        
+        Args:
+            hud: Also show how long each stage of the last command took,
+                and p50/p95 over recent commands
+        """
+        self.hud = hud
+        self.height = OVERLAY_HEIGHT + (OVERLAY_HUD_HEIGHT if hud else 0)
         self.root = None
         self.label = None
+        self.stable_label = None
+        self.tail_label = None
         self.is_visible = False
         self.current_status = ""
+        self.hide_timer = None
+        self.generation = 0  # bumped by every status change, so an older auto-hide knows it is stale
+        self.closed = False
+        
+        # Updates from any thread, applied by the Tk thread
+        self.updates = queue.SimpleQueue()
+        self.wake_lock = threading.Lock()
+        self.drain_pending = False  # the Tk thread was woken and has not drained yet
+        self.drain_timer = None  # drain deferred to the next frame
+        self.frame_at = float("-inf")  # time.perf_counter() of the last drain
+        self.threaded = True  # whether other threads may call into Tcl
+        
+        # HUD state (Tk thread)
+        self.hud_label = None
+        self.hud_canvas = None
+        self.last_command = None  # (timings, cache_hit, source) of the latest command
+        self.totals = LatencyWindow(size=OVERLAY_HUD_HISTORY)  # total seconds of recent commands
+        self.hud_dirty = False
+        self.hud_drawn_at = 0.0
+        
+        # Metrics
+        self.frames = 0  # frames that applied at least one update
+        self.coalesced = 0  # updates merged into a later one in the same frame
         
         # Status emojis
         self.status_icons = {
@@ -25,8 +82,35 @@ class JarvisOverlay:
             "error": "❌",
         }
         
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="overlay", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=5.0)
+        
         print("✓ GUI Overlay initialized")
     
+    def _run(self):
+        """Tk thread: create the window and process events until destroyed"""
+        try:
+            self._create_window()
+            self.root.bind("<<JarvisDrain>>", self._drain)
+            self.threaded = bool(int(self.root.tk.call("info", "exists", "tcl_platform(threaded)")))
+        except Exception as e:
+            print(f"❌ GUI Overlay unavailable: {e}")
+            self.closed = True
+            self.ready.set()
+            return
+        
+        # Ready once the main loop runs (other threads can only wake it
+        # from then on); updates queued before that are drained then
+        self.root.after(0, self._start)
+        try:
+            self.root.mainloop()
+        finally:
+            self.root.destroy()
+            self.root = None
+            self.closed = True
+    
     def _create_window(self):
         """Create the overlay window"""
         self.root = tk.Tk()
@@ -39,7 +123,7 @@ class JarvisOverlay:
         self.root.overrideredirect(True)  # No window decorations
         
         # Set size
-        self.root.geometry(f"{OVERLAY_WIDTH}x{OVERLAY_HEIGHT}")
+        self.root.geometry(f"{OVERLAY_WIDTH}x{self.height}")
         
         # Position window
         self._position_window()
@@ -60,12 +144,37 @@ class JarvisOverlay:
             font=('Segoe UI', 14, 'bold'),
             bg='#1e1e1e',
             fg='#ffffff',
-            pady=20
+            pady=8
         )
         self.label.pack(fill=tk.BOTH, expand=True)
         
+        # Live transcript: words that have settled, then the words that may still change
+        transcript = tk.Frame(frame, bg='#1e1e1e')
+        transcript.pack(pady=(0, 8))
+        self.stable_label = tk.Label(transcript, font=('Segoe UI', 10), bg='#1e1e1e', fg='#ffffff')
+        self.stable_label.pack(side=tk.LEFT)
+        self.tail_label = tk.Label(transcript, font=('Segoe UI', 10, 'italic'), bg='#1e1e1e', fg='#888888')
+        self.tail_label.pack(side=tk.LEFT)
+        
+        if self.hud:
+            self._create_hud(frame)
+        
         # Bind click to close
-        self.label.bind('<Button-1>', lambda e: self.hide())
+        self.label.bind('<Button-1>', lambda e: self._hide())
+    
+    def _create_hud(self, frame):
+        """Create the latency HUD below the status"""
+        self.hud_label = tk.Label(
+            frame,
+            font=('Consolas', 9),
+            bg='#1e1e1e',
+            fg='#cccccc',
+            justify=tk.LEFT,
+            anchor='w'
+        )
+        self.hud_label.pack(fill=tk.X, padx=8)
+        self.hud_canvas = tk.Canvas(frame, height=SPARKLINE_HEIGHT, bg='#1e1e1e', highlightthickness=0)
+        self.hud_canvas.pack(fill=tk.X, padx=8, pady=(2, 6))
     
     def _position_window(self):
         """Position window based on config"""
@@ -75,64 +184,258 @@ class JarvisOverlay:
         positions = {
             "top-right": (screen_width - OVERLAY_WIDTH - 20, 20),
             "top-left": (20, 20),
-            "bottom-right": (screen_width - OVERLAY_WIDTH - 20, screen_height - OVERLAY_HEIGHT - 60),
-            "bottom-left": (20, screen_height - OVERLAY_HEIGHT - 60),
-            "center": (screen_width // 2 - OVERLAY_WIDTH // 2, screen_height // 2 - OVERLAY_HEIGHT // 2),
+            "bottom-right": (screen_width - OVERLAY_WIDTH - 20, screen_height - self.height - 60),
+            "bottom-left": (20, screen_height - self.height - 60),
+            "center": (screen_width // 2 - OVERLAY_WIDTH // 2, screen_height // 2 - self.height // 2),
         }
         
         x, y = positions.get(OVERLAY_POSITION, positions["top-right"])
         self.root.geometry(f"+{x}+{y}")
     
-    def show(self, status="active"):
-        """Show the overlay with given status"""
-        if not self.root:
-            self._create_window()
+    def _start(self):
+        """First callback of the main loop (Tk thread)"""
+        self.ready.set()
+        self._drain()
+    
+    def _put(self, kind, args):
+        """Queue an update and wake the Tk thread unless it is already due to drain"""
+        self.updates.put((kind, args))
+        with self.wake_lock:
+            if self.drain_pending or not self.threaded:
+                return
+            self.drain_pending = True
+        try:
+            # Thread-safe with threaded Tcl: the event is handed to the Tk thread
+            self.root.event_generate("<<JarvisDrain>>", when="tail")
+        except Exception:
+            pass  # the main loop has not started (it drains on start) or has ended
+    
+    def _schedule_drain(self, delay):
+        """Drain again after `delay` seconds, unless already scheduled (Tk thread)"""
+        if self.drain_timer is None:
+            self.drain_timer = self.root.after(max(1, int(delay * 1000)), self._drain_later)
+    
+    def _drain_later(self):
+        """Deferred drain (Tk thread)"""
+        self.drain_timer = None
+        self._drain()
+    
+    def _drain(self, event=None):
+        """
+        Apply the updates queued since the last frame (Tk thread, at most
+        once per OVERLAY_REFRESH_INTERVAL); of several status or transcript
+        updates only the newest is drawn
+        """
+        wait = self.frame_at + OVERLAY_REFRESH_INTERVAL - time.perf_counter()
+        if wait > 0:
+            self._schedule_drain(wait)  # updates arriving meanwhile join this frame
+            return
+        self.frame_at = time.perf_counter()
+        
+        # Updates queued from here on wake the Tk thread again
+        with self.wake_lock:
+            self.drain_pending = False
         
+        status = None
+        transcript = None
+        queued_transcript = False  # whether `transcript` came from a queued update
+        hide = False
+        count = 0
+        while True:
+            try:
+                kind, args = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            
+            # Count the queued updates a newer one overwrites before drawing
+            if kind == "stop":
+                self.root.quit()
+                return
+            if kind in ("status", "hide"):
+                self.coalesced += (status is not None) + hide
+                status, hide = (args, False) if kind == "status" else (None, True)
+                if kind == "status" and args[0] == "listening":
+                    # A new command starts with an empty transcript
+                    self.coalesced += queued_transcript
+                    transcript, queued_transcript = ("", ""), False
+            elif kind == "transcript":
+                self.coalesced += queued_transcript
+                transcript, queued_transcript = args, True
+            elif kind == "timings":
+                # Every command counts towards the percentiles; only the last is drawn
+                self.last_command = args
+                self.totals.add(args[0].get("total", 0.0))
+                self.hud_dirty = True
+        
+        if count:
+            self.frames += 1
+            if transcript is not None:
+                self._set_transcript(*transcript)
+            if status is not None:
+                self._set_status(*status)
+            if hide:
+                self._hide()
+        
+        # The HUD redraws at most OVERLAY_HUD_FPS times a second
+        if self.hud_dirty:
+            wait = self.hud_drawn_at + 1.0 / OVERLAY_HUD_FPS - time.perf_counter()
+            if wait > 0:
+                self._schedule_drain(wait)
+            else:
+                self._draw_hud()
+        
+        # Without thread support in Tcl nobody can wake this thread: poll
+        if not self.threaded:
+            self._schedule_drain(OVERLAY_REFRESH_INTERVAL)
+    
+    def show(self, status="active"):
+        """Show the overlay with given status (safe from any thread)"""
+        self.update_status(status)
+    
+    def _show(self, status):
+        """Show the window with a status (Tk thread)"""
         self.current_status = status
         icon = self.status_icons.get(status, "⚡")
-        text = f"{icon}  {status.upper()}"
+        self.label.config(text=f"{icon}  {status.upper()}")
         
-        if self.label:
-            self.label.config(text=text)
-        
-        self.root.deiconify()
-        self.is_visible = True
-        self.root.update()
+        if not self.is_visible:
+            self.root.deiconify()
+            self.is_visible = True
     
     def hide(self):
-        """Hide the overlay"""
-        if self.root and self.is_visible:
+        """Hide the overlay (safe from any thread)"""
+        if not self.closed:
+            self._put("hide", None)
+    
+    def _hide(self):
+        """Hide the window (Tk thread)"""
+        if self.is_visible:
             self.root.withdraw()
             self.is_visible = False
     
     def update_status(self, status, auto_hide_delay=None):
         """
-        Update overlay status
+        Update overlay status (safe from any thread, never blocks)
         
         Args:
             status: Status string (listening, thinking, executing, etc.)
             auto_hide_delay: Seconds to wait before auto-hiding (None = don't hide)
         """
-        self.show(status)
+        if not self.closed:
+            self._put("status", (status, auto_hide_delay))
+    
+    def _set_status(self, status, auto_hide_delay):
+        """Apply a status update (Tk thread)"""
+        # A newer status replaces any pending auto-hide
+        self.generation += 1
+        if self.hide_timer:
+            self.root.after_cancel(self.hide_timer)
+            self.hide_timer = None
+        
+        self._show(status)
         
         if auto_hide_delay:
-            def auto_hide():
-                import time
-                time.sleep(auto_hide_delay)
-                self.hide()
-            
-            threading.Thread(target=auto_hide, daemon=True).start()
+            self.hide_timer = self.root.after(int(auto_hide_delay * 1000), self._auto_hide, self.generation)
     
-    def run(self):
-        """Run the GUI main loop (blocking)"""
-        if self.root:
-            self.root.mainloop()
+    def _auto_hide(self, generation):
+        """Hide after a delay, unless another status arrived since (Tk thread)"""
+        if generation == self.generation:
+            self.hide_timer = None
+            self._hide()
+    
+    def update_transcript(self, text, stable=""):
+        """
+        Show what has been recognized so far (safe from any thread, never blocks)
+        
+        Args:
+            text: Interim transcript
+            stable: Leading words of the transcript unlikely to change
+        """
+        if not self.closed:
+            self._put("transcript", (text, stable))
+    
+    def _set_transcript(self, text, stable):
+        """Apply a transcript update (Tk thread)"""
+        tail = text[len(stable):].strip() if text.startswith(stable) else text
+        self.stable_label.config(text=stable)
+        self.tail_label.config(text=tail)
+    
+    def update_timings(self, timings, cache_hit=None, source=None):
+        """
+        Add a finished command to the HUD (safe from any thread, never blocks)
+        
+        Args:
+            timings: Seconds per pipeline stage and "total" (Job.timings)
+            cache_hit: Whether the brain answered from a cache, if known
+            source: What answered (e.g. "index", "parser", "model")
+        """
+        if self.hud and not self.closed:
+            self._put("timings", (dict(timings), cache_hit, source))
+    
+    def _draw_hud(self):
+        """Draw the last command's stage times and the recent totals (Tk thread)"""
+        self.hud_dirty = False
+        self.hud_drawn_at = time.perf_counter()
+        timings, cache_hit, source = self.last_command
+        
+        stages = []
+        for stage, label in HUD_STAGES:
+            if stage not in timings:
+                continue
+            text = f"{label} {format_seconds(timings[stage])}"
+            if stage == "understand" and cache_hit is not None:
+                text += f" ({source})" if cache_hit else " (miss)"
+            stages.append(text)
+        
+        p50 = self.totals.percentile(50)
+        p95 = self.totals.percentile(95)
+        lines = [
+            "  ".join(stages[:2]),
+            "  ".join(stages[2:]),
+            f"last {format_seconds(timings.get('total', 0.0))}  p50 {format_seconds(p50)}  p95 {format_seconds(p95)}",
+        ]
+        self.hud_label.config(text="\n".join(line for line in lines if line))
+        
+        # Sparkline of recent totals, with the p50 and p95 marked
+        canvas = self.hud_canvas
+        canvas.delete("all")
+        with self.totals.lock:
+            totals = list(self.totals.samples)
+        width = max(canvas.winfo_width(), OVERLAY_WIDTH - 20)
+        top = max(totals) or 1.0
+        
+        def y(seconds):
+            return SPARKLINE_HEIGHT - 2 - (SPARKLINE_HEIGHT - 4) * seconds / top
+        
+        for value, color in ((p50, '#4caf50'), (p95, '#ff9800')):
+            canvas.create_line(0, y(value), width, y(value), fill=color, dash=(2, 2))
+        if len(totals) > 1:
+            step = width / (OVERLAY_HUD_HISTORY - 1)
+            points = []
+            for i, seconds in enumerate(totals):
+                points += [i * step, y(seconds)]
+            canvas.create_line(*points, fill='#0078d4', width=2)
+        else:
+            canvas.create_oval(0, y(totals[0]) - 2, 4, y(totals[0]) + 2, fill='#0078d4', outline='')
+    
+    def stats(self):
+        """
+        Get overlay metrics
+        
+        Returns:
+            dict: Frames drawn and updates merged away
+        """
+        return {"frames": self.frames, "coalesced": self.coalesced}
     
     def destroy(self):
-        """Destroy the overlay"""
-        if self.root:
-            self.root.destroy()
-            self.root = None
+        """Destroy the overlay (safe from any thread)"""
+        if self.closed:
+            return
+        self.closed = True
+        self._put("stop", None)
+        if threading.current_thread() is not self.thread:
+            self.thread.join(timeout=1.0)
 
 # Test function
 def test():
@@ -1,69 +1,233 @@
 """
 Hotkey Listener Module
-Detects Windows+H (or configured hotkey) to activate Jarvis
+Detects the configured hotkeys (Windows+H or Ctrl+Shift+J by default) to
+activate Jarvis
 """
 
+import time
 from pynput import keyboard
-from pynput.keyboard import Key, KeyCode
-from config import DEBUG_MODE
-import threading
+from pynput.keyboard import Key
+from config import HOTKEY, HOTKEY_ALTERNATIVE, HOTKEY_DEBOUNCE, HOTKEY_STUCK_TIMEOUT, DEBUG_MODE
+from metrics import LatencyWindow
+
+# Left/right variants count as the same modifier in hotkeys (they are still
+# tracked apart while held)
+MODIFIER_SIDES = {
+    "cmd_l": "cmd", "cmd_r": "cmd",
+    "ctrl_l": "ctrl", "ctrl_r": "ctrl",
+    "shift_l": "shift", "shift_r": "shift",
+    "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+}
+
+# Other spellings accepted in config
+KEY_ALIASES = {"win": "cmd", "windows": "cmd", "super": "cmd", "control": "ctrl", "option": "alt"}
+
+
+def key_name(key, sided=False):
+    """
+    Get the name a key goes by in hotkey strings
+    
+    Args:
+        key: pynput Key or KeyCode
+        sided: Keep the side of a modifier ("ctrl_r" rather than "ctrl")
+        
+    Returns:
+        str: e.g. "ctrl", "f1" or "h", or None for keys without a name
+    """
+    name = getattr(key, "name", None)
+    if name:
+        return name if sided else MODIFIER_SIDES.get(name, name)
+    
+    char = getattr(key, "char", None)
+    if char:
+        if ord(char) < 32:
+            char = chr(ord(char) + 96)  # Ctrl+letter arrives as a control character
+        return char.lower()
+    
+    # Letters pressed with modifiers may only carry a virtual key code
+    vk = getattr(key, "vk", None)
+    if vk is not None and 65 <= vk <= 90:
+        return chr(vk).lower()
+    return None
+
+
+def parse_hotkey(hotkey):
+    """
+    Parse a hotkey string such as "<cmd>+h" or "ctrl+shift+j"
+    
+    Args:
+        hotkey: Key names joined by "+" (modifiers may be written as <cmd>)
+        
+    Returns:
+        frozenset: Names of the keys that make up the hotkey
+        
+    Raises:
+        ValueError: If a key name is not recognized
+    """
+    names = set()
+    for part in hotkey.lower().split("+"):
+        name = part.strip().strip("<>")
+        name = KEY_ALIASES.get(name, name)
+        if len(name) != 1 and not hasattr(Key, name):
+            raise ValueError(f"Unknown key '{part.strip()}' in hotkey '{hotkey}'")
+        names.add(MODIFIER_SIDES.get(name, name))
+    return frozenset(names)
+
 
 class HotkeyListener:
-    def __init__(self, callback):
+    def __init__(self, callback, hotkeys=None, debounce=HOTKEY_DEBOUNCE, stuck_timeout=HOTKEY_STUCK_TIMEOUT):
         """
         Initialize hotkey listener
         
         Args:
             callback: Function to call when hotkey is pressed
+            hotkeys: Hotkey strings (default: HOTKEY and HOTKEY_ALTERNATIVE)
+            debounce: Seconds after firing before a hotkey fires again
+            stuck_timeout: Seconds of keyboard silence after which keys
+                still held are assumed released (their release was missed)
         """
         self.callback = callback
-        self.current_keys = set()
+        self.hotkeys = hotkeys or [hotkey for hotkey in (HOTKEY, HOTKEY_ALTERNATIVE) if hotkey]
+        self.debounce = debounce
+        self.stuck_timeout = stuck_timeout
         self.listener = None
         self.is_running = False
         
-        # Define hotkeys (Windows+H or Ctrl+Shift+J)
-        self.hotkey_combinations = [
-            {Key.cmd, KeyCode.from_char('h')},  # Windows+H
-            {Key.ctrl, Key.shift, KeyCode.from_char('j')},  # Ctrl+Shift+J (alternative)
-        ]
+        # Compile the hotkeys: one bit per key they use, one mask per hotkey,
+        # so each key event is a dict lookup and an integer compare
+        self.bits = {}  # key name -> bit
+        self.combinations = {}  # mask -> hotkey string
+        for hotkey in self.hotkeys:
+            mask = 0
+            for name in parse_hotkey(hotkey):
+                mask |= self.bits.setdefault(name, 1 << len(self.bits))
+            self.combinations[mask] = hotkey
+        
+        self.state = 0  # bits of the hotkey keys held down (on either side)
+        self.sides_held = {}  # bit -> physical keys holding it (both Ctrl keys count twice)
+        self.current_keys = {}  # physical hotkey key held down -> time.perf_counter() of its last press
+        self.last_event = float("-inf")
+        self.last_fired = float("-inf")
+        
+        # Metrics
+        self.handling = LatencyWindow()  # seconds spent per key event
+        self.events = 0
+        self.fired = 0
+        self.repeats = 0
+        self.debounced = 0
+        self.recovered = 0
         
         print("✓ Hotkey Listener initialized")
         if DEBUG_MODE:
-            print("  Hotkeys: Windows+H or Ctrl+Shift+J")
+            print(f"  Hotkeys: {' or '.join(self.hotkeys)}")
     
     def on_press(self, key):
         """Handle key press"""
+        now = time.perf_counter()
+        self.events += 1
         try:
-            # Normalize the key
-            if hasattr(key, 'char') and key.char:
-                key = KeyCode.from_char(key.char.lower())
+            self._release_stuck(now)
+            
+            name = key_name(key, sided=True)
+            bit = self.bits.get(MODIFIER_SIDES.get(name, name))
+            if not bit:
+                return  # not part of any hotkey
             
-            self.current_keys.add(key)
+            # Auto-repeat while held: the hotkey fires on the press edge only
+            if name in self.current_keys:
+                self.repeats += 1
+                self.current_keys[name] = now
+                return
             
-            # Check if any hotkey combination is pressed
-            for combo in self.hotkey_combinations:
-                if combo.issubset(self.current_keys):
-                    if DEBUG_MODE:
-                        print("🔥 Hotkey detected!")
-                    self.callback()
+            self.current_keys[name] = now
+            self.sides_held[bit] = self.sides_held.get(bit, 0) + 1
+            if self.state & bit:
+                return  # other side of a modifier already held
+            self.state |= bit
+            
+            hotkey = self.combinations.get(self.state)
+            if hotkey is None:
+                return
+            if now - self.last_fired < self.debounce:
+                self.debounced += 1
+                return
+            
+            self.last_fired = now
+            self.fired += 1
+            if DEBUG_MODE:
+                print(f"🔥 Hotkey detected! ({hotkey})")
+            self.callback()
                     
         except Exception as e:
             if DEBUG_MODE:
                 print(f"Key press error: {e}")
+        finally:
+            self.handling.add(time.perf_counter() - now)
     
     def on_release(self, key):
         """Handle key release"""
+        now = time.perf_counter()
+        self.events += 1
         try:
-            # Normalize the key
-            if hasattr(key, 'char') and key.char:
-                key = KeyCode.from_char(key.char.lower())
+            self._release_stuck(now)
             
-            if key in self.current_keys:
-                self.current_keys.remove(key)
+            name = key_name(key, sided=True)
+            if self.current_keys.pop(name, None) is not None:
+                self._release(name)
                 
         except Exception as e:
             if DEBUG_MODE:
                 print(f"Key release error: {e}")
+        finally:
+            self.handling.add(time.perf_counter() - now)
+    
+    def _release(self, name):
+        """Clear a key's bit once no side of it is held (name already dropped from current_keys)"""
+        bit = self.bits[MODIFIER_SIDES.get(name, name)]
+        self.sides_held[bit] -= 1
+        if not self.sides_held[bit]:
+            del self.sides_held[bit]
+            self.state &= ~bit
+    
+    def _release_stuck(self, now):
+        """
+        Forget the keys still held after stuck_timeout without any key
+        event, whose release was probably swallowed (e.g. by a window that
+        grabbed focus); a key held while others are typed is held on purpose
+        
+        Args:
+            now: time.perf_counter() of the current event
+        """
+        idle = now - self.last_event
+        self.last_event = now
+        if not self.current_keys or idle <= self.stuck_timeout:
+            return
+        
+        stuck = list(self.current_keys)
+        for name in stuck:
+            del self.current_keys[name]
+            self._release(name)
+            self.recovered += 1
+        
+        if stuck and DEBUG_MODE:
+            print(f"⚠️  Released stuck keys: {', '.join(stuck)}")
+    
+    def stats(self):
+        """
+        Get hotkey metrics
+        
+        Returns:
+            dict: Event, trigger, ignored repeat, debounce and stuck-key
+                counts, and per-event handling time percentiles
+        """
+        return {
+            "events": self.events,
+            "fired": self.fired,
+            "repeats_ignored": self.repeats,
+            "debounced": self.debounced,
+            "stuck_released": self.recovered,
+            "handling": self.handling.summary(),
+        }
     
     def start(self):
         """Start listening for hotkeys"""
@@ -78,7 +242,7 @@ class HotkeyListener:
             on_release=self.on_release
         )
         self.listener.start()
-        print("✓ Hotkey listener started (Press Windows+H or Ctrl+Shift+J)")
+        print(f"✓ Hotkey listener started (Press {' or '.join(self.hotkeys)})")
     
     def stop(self):
         """Stop listening for hotkeys"""
@@ -86,6 +250,8 @@ class HotkeyListener:
             self.listener.stop()
             self.is_running = False
             print("✓ Hotkey listener stopped")
+            if DEBUG_MODE:
+                print(f"Hotkey: {self.stats()}")
     
     def is_active(self):
         """Check if listener is running"""
@@ -97,7 +263,7 @@ def test():
     print("=" * 60)
     print("Hotkey Listener Test")
     print("=" * 60)
-    print("\nPress Windows+H or Ctrl+Shift+J to trigger")
+    print(f"\nPress {HOTKEY} or {HOTKEY_ALTERNATIVE} to trigger")
     print("Press Ctrl+C to exit\n")
     
     def on_hotkey():
@@ -0,0 +1,291 @@
+"""
+Intent Classifier Module
+Offline nearest-centroid classifier over hashed character n-grams
+
+Train (offline) with:
+    python intent_classifier.py --train
+"""
+
+import re
+import sys
+import time
+import zlib
+import numpy as np
+from action_schema import ACTIONS, EXAMPLES, app_names, site_names
+from command_index import normalize_utterance
+from response_cache import export_entries
+from config import (
+    APP_PATHS, COMMAND_CACHE, INTENT_MODEL_FILE, INTENT_FEATURE_DIM,
+    INTENT_CLASSIFIER_MIN_SCORE, INTENT_CLASSIFIER_MIN_MARGIN,
+    INTENT_CLASSIFIER_PARAM_MIN_SCORE, INTENT_CLASSIFIER_PARAM_MIN_MARGIN, DEBUG_MODE,
+)
+
+# Bump when the feature hashing or file layout changes
+MODEL_VERSION = 1
+
+NGRAM_SIZES = (3, 4, 5)
+
+# Actions whose parameter comes from a fixed set, so it can be classified too
+CLOSED_ACTIONS = ("launch_app", "system_control", "file_operation")
+
+
+def hash_features(texts, dim=INTENT_FEATURE_DIM):
+    """
+    Turn texts into L2-normalized hashed character n-gram vectors
+
+    Args:
+        texts: List of command texts
+        dim: Number of hash buckets
+
+    Returns:
+        np.ndarray: Matrix of shape (len(texts), dim), float32
+    """
+    rows = []
+    cols = []
+    for row, text in enumerate(texts):
+        padded = f" {normalize_utterance(text)} ".encode()
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                rows.append(row)
+                cols.append(zlib.crc32(padded[i:i + n]) % dim)
+
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def training_examples():
+    """
+    Collect labelled utterances from the config, the schema examples and
+    the decisions Gemini made in the past
+
+    Returns:
+        list: (text, action, param) tuples
+    """
+    examples = [(f"open {app}", "launch_app", app) for app in APP_PATHS]
+    examples += [(text, cmd["action"], cmd["param"]) for text, cmd in COMMAND_CACHE.items()]
+    examples += list(EXAMPLES)
+    examples += [row for row in export_entries() if row[1] in ACTIONS]
+    return examples
+
+
+class IntentClassifier:
+    def __init__(self, labels, centroids, dim=INTENT_FEATURE_DIM):
+        """
+        Initialize from trained centroids
+
+        Args:
+            labels: Label per centroid ("action" or "action:param")
+            centroids: Matrix of unit centroids, one row per label
+            dim: Number of hash buckets used for training
+        """
+        self.labels = list(labels)
+        self.centroids = centroids
+        self.dim = dim
+
+        self.action_rows = np.array([i for i, l in enumerate(self.labels) if ":" not in l], dtype=np.intp)
+        self.param_rows = {}
+        for i, label in enumerate(self.labels):
+            if ":" in label:
+                self.param_rows.setdefault(label.split(":", 1)[0], []).append(i)
+
+        # Prefix patterns for actions whose parameter is free text
+        self.verb_patterns = {
+            action: re.compile(
+                r"(?:please )?(?:%s) (?P<param>.+)" % "|".join(
+                    re.escape(v) for v in sorted(spec["verbs"], key=len, reverse=True)
+                ),
+                re.IGNORECASE
+            )
+            for action, spec in ACTIONS.items()
+            if action not in CLOSED_ACTIONS
+        }
+        self.apps = app_names()
+        self.sites = site_names()
+
+        # Phrases that name each fixed parameter outright
+        names = {}
+        for name, app in self.apps.items():
+            names.setdefault(app, []).append(name)
+        self.param_phrases = {"launch_app": [
+            (app, re.compile(r"\b(?:%s)\b" % "|".join(
+                re.escape(n) for n in sorted(spoken, key=len, reverse=True))))
+            for app, spoken in names.items()
+        ]}
+        for action in CLOSED_ACTIONS:
+            if "params" in ACTIONS[action]:
+                self.param_phrases[action] = [
+                    (param, re.compile("|".join(phrases)))
+                    for param, phrases in ACTIONS[action]["params"].items()
+                ]
+
+    @classmethod
+    def train(cls, examples, dim=INTENT_FEATURE_DIM):
+        """
+        Compute one centroid per action and per fixed parameter
+
+        Args:
+            examples: (text, action, param) tuples
+            dim: Number of hash buckets
+
+        Returns:
+            IntentClassifier: Trained classifier
+        """
+        vectors = hash_features([text for text, _, _ in examples], dim)
+
+        groups = {}
+        for i, (_, action, param) in enumerate(examples):
+            groups.setdefault(action, []).append(i)
+            if action in CLOSED_ACTIONS:
+                groups.setdefault(f"{action}:{param}", []).append(i)
+
+        labels = sorted(groups)
+        centroids = np.stack([vectors[groups[label]].mean(axis=0) for label in labels])
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        return cls(labels, centroids.astype(np.float32), dim)
+
+    def save(self, path=INTENT_MODEL_FILE):
+        """Write the model as a compact .npz file"""
+        np.savez_compressed(
+            path,
+            version=MODEL_VERSION,
+            dim=self.dim,
+            labels=np.array(self.labels),
+            centroids=self.centroids.astype(np.float16),
+        )
+
+    @classmethod
+    def load(cls, path=INTENT_MODEL_FILE):
+        """
+        Load a trained model
+
+        Args:
+            path: Model file written by save()
+
+        Returns:
+            IntentClassifier: The classifier, or None if missing or outdated
+        """
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != MODEL_VERSION:
+                    print(f"⚠️  Intent model {path} is outdated, retrain with: python intent_classifier.py --train")
+                    return None
+                return cls(data["labels"].tolist(), data["centroids"].astype(np.float32), int(data["dim"]))
+        except FileNotFoundError:
+            if DEBUG_MODE:
+                print(f"⚠️  No intent model at {path} (train with: python intent_classifier.py --train)")
+            return None
+
+    def predict(self, text):
+        """
+        Classify a command
+
+        Args:
+            text: Voice command text
+
+        Returns:
+            dict: {"action", "param", "confidence", "margin"}, or None unless
+                the prediction is confident and clearly ahead of the runner-up
+        """
+        vector = hash_features([text], self.dim)[0]
+        scores = self.centroids @ vector
+
+        action_scores = scores[self.action_rows]
+        order = np.argsort(action_scores)[::-1]
+        best = action_scores[order[0]]
+        margin = best - action_scores[order[1]] if len(order) > 1 else best
+
+        if best < INTENT_CLASSIFIER_MIN_SCORE or margin < INTENT_CLASSIFIER_MIN_MARGIN:
+            return None
+
+        action = self.labels[self.action_rows[order[0]]]
+        param = self._param(action, text, scores)
+        if not param:
+            return None
+
+        return {
+            "action": action,
+            "param": param,
+            "confidence": round(float(best), 2),
+            "margin": round(float(margin), 2),
+        }
+
+    def _param(self, action, text, scores):
+        """Pick the parameter for a predicted action"""
+        if action in CLOSED_ACTIONS:
+            return self._closed_param(action, text, scores)
+
+        pattern = self.verb_patterns.get(action)
+        match = pattern.fullmatch(" ".join(text.split())) if pattern else None
+        if not match:
+            return None
+
+        param = match.group("param").strip()
+        if action == "open_website":
+            param = self.sites.get(param.lower(), param)
+        return param
+
+    def _closed_param(self, action, text, scores):
+        """
+        Pick a fixed parameter, only trusting the nearest centroid when the
+        utterance names the parameter or the centroid is clearly ahead
+        (otherwise "open photoshop" would launch whichever app is closest)
+        """
+        rows = sorted(self.param_rows.get(action, []), key=lambda i: scores[i], reverse=True)
+        ranked = [self.labels[i].split(":", 1)[1] for i in rows]
+
+        normalized = normalize_utterance(text)
+        named = [param for param, pattern in self.param_phrases.get(action, []) if pattern.search(normalized)]
+        if named:
+            # Highest-scoring named parameter (named ones without a centroid last)
+            return min(named, key=lambda p: ranked.index(p) if p in ranked else len(ranked))
+
+        if not rows:
+            return None
+        best = scores[rows[0]]
+        margin = best - scores[rows[1]] if len(rows) > 1 else best
+        if best < INTENT_CLASSIFIER_PARAM_MIN_SCORE or margin < INTENT_CLASSIFIER_PARAM_MIN_MARGIN:
+            return None
+        return ranked[0]
+
+def train():
+    """Retrain the model from all known decisions and save it"""
+    examples = training_examples()
+    start = time.perf_counter()
+    classifier = IntentClassifier.train(examples)
+    classifier.save()
+    print(f"✓ Trained on {len(examples)} examples, {len(classifier.labels)} labels "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms → {INTENT_MODEL_FILE}")
+
+# Test function
+def test():
+    """Test the intent classifier"""
+    print("=" * 60)
+    print("Intent Classifier Test")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    classifier = IntentClassifier.load()
+    if classifier is None:
+        classifier = IntentClassifier.train(training_examples())
+    print(f"Model ready in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    test_commands = [
+        "shut this window",
+        "open the calculator",
+        "please search for cheap flights",
+        "take me to github",
+        "what's the meaning of life",
+    ]
+
+    for cmd in test_commands:
+        print(f"'{cmd}' → {classifier.predict(cmd)}")
+
+if __name__ == "__main__":
+    if "--train" in sys.argv:
+        train()
+    else:
+        test()
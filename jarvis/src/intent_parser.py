@@ -0,0 +1,123 @@
+"""
+Intent Parser Module
+Rule-based local understanding of common commands (no network)
+"""
+
+import re
+from action_schema import ACTIONS, app_names, site_names
+from config import DEBUG_MODE
+
+# Politeness and wake words around the actual command
+_PREFIX = r"(?:(?:hey |ok |okay )?jarvis,? )?(?:(?:please|can you|could you|would you|will you) )*"
+_SUFFIX = r"(?: please)?[.!?]*"
+
+_DOMAIN = r"[a-z0-9-]+(?:\.[a-z0-9-]+)+(?:/\S*)?"
+
+
+def _alternation(phrases):
+    """Build a regex alternation, longest phrase first"""
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+class IntentParser:
+    def __init__(self):
+        """Compile the grammar from the action schema"""
+        self.apps = app_names()
+        self.sites = site_names()
+
+        apps = _alternation(self.apps)
+        sites = _alternation(self.sites)
+
+        # (action, compiled pattern, param builder, confidence), tried in order
+        self.rules = []
+
+        for action in ("system_control", "file_operation"):
+            for param, phrases in ACTIONS[action]["params"].items():
+                pattern = "|".join(phrases)
+                self._add(action, f"(?:{pattern})", lambda m, p=param: p, 0.97)
+
+        site_verbs = _alternation(ACTIONS["open_website"]["verbs"])
+        self._add("open_website", rf"(?:{site_verbs}) (?P<site>{sites})(?: website| site| dot com)?",
+                  lambda m: self.sites[m.group("site").lower()], 0.96)
+        self._add("open_website", rf"(?:{site_verbs}) (?P<param>{_DOMAIN})",
+                  lambda m: m.group("param"), 0.95)
+
+        app_verbs = _alternation(ACTIONS["launch_app"]["verbs"])
+        self._add("launch_app", rf"(?:{app_verbs}) (?:the )?(?P<app>{apps})(?: browser| app| application)?",
+                  lambda m: self.apps[m.group("app").lower()], 0.98)
+
+        search_verbs = _alternation(ACTIONS["web_search"]["verbs"])
+        self._add("web_search", rf"(?:{search_verbs}) (?:the web for |google for |online for )?(?P<param>.+?)",
+                  lambda m: m.group("param"), 0.95)
+
+        type_verbs = _alternation(ACTIONS["type_text"]["verbs"])
+        self._add("type_text", rf"(?:{type_verbs}) (?P<param>.+)",
+                  lambda m: m.group("param"), 0.95, keep_suffix=True)
+
+        # Unknown targets still parse, but below the acceptance threshold
+        goto_verbs = _alternation(v for v in ACTIONS["open_website"]["verbs"] if v != "open")
+        self._add("open_website", rf"(?:{goto_verbs}) (?P<param>\w+)",
+                  lambda m: f"{m.group('param')}.com", 0.75)
+        self._add("launch_app", rf"(?:{app_verbs}) (?P<param>.+?)",
+                  lambda m: m.group("param"), 0.6)
+
+        if DEBUG_MODE:
+            print(f"✓ Intent parser compiled ({len(self.rules)} rules)")
+
+    def _add(self, action, body, build_param, confidence, keep_suffix=False):
+        """Compile one rule of the grammar"""
+        suffix = "" if keep_suffix else _SUFFIX
+        pattern = re.compile(rf"{_PREFIX}{body}{suffix}", re.IGNORECASE)
+        self.rules.append((action, pattern, build_param, confidence))
+
+    def parse(self, text):
+        """
+        Parse a command with the local grammar
+
+        Args:
+            text: Voice command text
+
+        Returns:
+            dict: {"action", "param", "confidence"} for the first matching rule, or None
+        """
+        if not text:
+            return None
+
+        text = " ".join(text.split())
+        for action, pattern, build_param, confidence in self.rules:
+            match = pattern.fullmatch(text)
+            if match:
+                param = build_param(match).strip()
+                if param:
+                    return {"action": action, "param": param, "confidence": confidence}
+
+        return None
+
+# Test function
+def test():
+    """Test the intent parser"""
+    print("=" * 60)
+    print("Intent Parser Test")
+    print("=" * 60)
+
+    parser = IntentParser()
+
+    test_commands = [
+        "open edge browser",
+        "search for pizza near me",
+        "type hello world",
+        "close this window",
+        "go to youtube",
+        "open downloads folder",
+        "volume up",
+        "please open vs code",
+        "go to example.org",
+        "open photoshop",
+        "what's the weather like",
+    ]
+
+    for cmd in test_commands:
+        print(f"'{cmd}' → {parser.parse(cmd)}")
+
+if __name__ == "__main__":
+    test()
@@ -3,118 +3,422 @@ JARVIS - Your Personal AI Assistant
 Main application entry point
 """
 
+from components import Component, startup_profile
+import argparse
 import time
-import sys
-from voice_recognition import VoiceRecognizer
-from gemini_brain import GeminiBrain
-from action_executor import ActionExecutor
-from hotkey_listener import HotkeyListener
-from gui_overlay import JarvisOverlay
-from config import DEBUG_MODE
-import threading
+from speculation import Speculator
+from pipeline import CommandPipeline
+from tracing import tracer
+from runtime import runtime
+from config import (
+    SPECULATIVE_MODE, PRELOAD_AI, ASYNC_MODE, WAKE_WORD_ENABLED, AUDIO_PREROLL,
+    HOTKEY, HOTKEY_ALTERNATIVE, DEBUG_MODE,
+)
+
+startup_profile.milestone("core_imported")
+
+# How hotkey key names are shown to the user
+KEY_LABELS = {"cmd": "Windows", "win": "Windows", "windows": "Windows", "super": "Windows", "control": "Ctrl"}
+
+
+def hotkey_label(hotkey):
+    """
+    Spell a configured hotkey the way it is printed on the keyboard
+    (without importing the hotkey listener and its keyboard hook)
+    
+    Args:
+        hotkey: Hotkey string such as "<cmd>+h" or "ctrl+shift+j"
+        
+    Returns:
+        str: e.g. "Windows+H" or "Ctrl+Shift+J"
+    """
+    names = [part.strip().strip("<>").lower() for part in hotkey.split("+")]
+    return "+".join(KEY_LABELS.get(name, name.upper() if len(name) == 1 else name.title()) for name in names)
 
 class Jarvis:
-    def __init__(self):
+    def __init__(self, voice=None, brain=None, executor=None, overlay=None):
+        """
+        Initialize Jarvis
+        
+        Args:
+            voice, brain, executor, overlay: Optional stand-ins for the
+                default components (used by benchmarks)
+        """
         print("=" * 60)
         print("JARVIS - Personal AI Assistant")
         print("=" * 60)
         print()
         
-        # Initialize components
-        print("Initializing components...")
-        self.voice = VoiceRecognizer()
-        self.brain = GeminiBrain()
-        self.executor = ActionExecutor()
-        self.overlay = JarvisOverlay()
+        # Heavy components are built on first use or warmed in the
+        # background once the hotkey listener is up
+        self.voice = Component("voice", "voice_recognition", "VoiceRecognizer", voice)
+        self.brain = Component("brain", "gemini_brain", "GeminiBrain", brain)
+        self.executor = Component("executor", "action_executor", "ActionExecutor", executor)
+        self.overlay = Component("overlay", "gui_overlay", "JarvisOverlay", overlay)
+        self.speculator = Speculator(self.brain) if SPECULATIVE_MODE else None
+        self.wake_word = None
+        
+        # Capture, understanding and execution run as overlapping stages
+        self.pipeline = CommandPipeline(
+            [("capture", self._capture), ("understand", self._understand), ("execute", self._execute)],
+            on_done=self._finish,
+        )
+        
+        self.last_timings = {}
         
-        self.is_processing = False
-        self.should_exit = False
+        # Without background warm-up, build everything before the hotkey
+        if not ASYNC_MODE:
+            print("Initializing components...")
+            for component in self._startup_components():
+                component.get()
         
         print()
         print("=" * 60)
         print("✓ JARVIS is ready!")
         print("=" * 60)
         print()
-        print("Press Windows+H or Ctrl+Shift+J to activate")
+        hotkeys = [hotkey_label(hotkey) for hotkey in (HOTKEY, HOTKEY_ALTERNATIVE) if hotkey]
+        print(f"Press {' or '.join(hotkeys)} to activate")
         print("Press Ctrl+C to exit")
         print()
     
-    def on_hotkey_pressed(self):
-        """Handle hotkey activation"""
-        if self.is_processing:
-            if DEBUG_MODE:
-                print("⚠️  Already processing a command...")
-            return
+    def on_hotkey_pressed(self, activated_at=None, trigger="hotkey", trigger_id=None):
+        """
+        Handle hotkey activation
         
-        # Process command in separate thread to not block hotkey listener
-        threading.Thread(target=self.process_command, daemon=True).start()
+        Args:
+            activated_at: time.perf_counter() of the key press (or of the
+                end of the wake word), if known
+            trigger: "hotkey" or "wake_word"
+            trigger_id: Wake word trigger to resolve once the command ends
+        """
+        if activated_at is None:
+            activated_at = time.perf_counter()
+        
+        # Queue the command; the hotkey listener never waits for the pipeline
+        job = self.pipeline.submit(activated_at, trigger=trigger, trigger_id=trigger_id)
+        
+        if job is None:
+            print("⚠️  Command queue full, activation ignored")
+            if trigger_id is not None and self.wake_word:
+                self.wake_word.resolve(trigger_id, heard=None)
+        elif DEBUG_MODE and self.pipeline.active > 1:
+            print(f"⏳ Command #{job.id} queued")
     
-    def process_command(self):
-        """Process a voice command (full pipeline)"""
-        self.is_processing = True
-        start_time = time.time()
+    def process_command(self, activated_at=None):
+        """
+        Process one voice command through every stage in this thread
         
-        try:
-            # Step 1: Show listening overlay
-            self.overlay.update_status("listening")
+        Args:
+            activated_at: time.perf_counter() of the hotkey press, if any
+            
+        Returns:
+            Job: The finished command
+        """
+        return self.pipeline.run(activated_at)
+    
+    def cancel(self):
+        """Cancel queued and running commands"""
+        dropped = self.pipeline.cancel()
+        if self.speculator:
+            self.speculator.discard()
+        if DEBUG_MODE:
+            print(f"🚫 Cancelled ({dropped} queued command(s) dropped)")
+    
+    def _capture(self, job):
+        """
+        Pipeline stage 1: listen for the command
+        
+        Args:
+            job: The command
+            
+        Returns:
+            bool: False if nothing was heard
+        """
+        job.marks["start"] = time.perf_counter()
+        job.trace = tracer.begin("command", command_id=job.id)
+        
+        def on_status(status):
+            job.marks.setdefault(status, time.perf_counter())
+            self.overlay.update_status(status)
+        
+        with tracer.activate(job.trace.trace_id):
+            if job.activated_at is not None:
+                tracer.record("hotkey_to_listen", job.marks["start"] - job.activated_at)
             
-            # Step 2: Listen for voice
-            text = self.voice.listen(callback=lambda status: self.overlay.update_status(status))
+            # Speech may begin just before the key press; after the wake
+            # word the command starts where the word ended
+            since = job.activated_at
+            if since is not None and job.trigger == "hotkey":
+                since -= AUDIO_PREROLL
+            
+            def on_partial(hypothesis):
+                self.overlay.update_transcript(hypothesis.text, hypothesis.stable)
+                if self.speculator:
+                    self.speculator.speculate(hypothesis)
+            
+            self.overlay.update_status("listening")
+            text = self.voice.listen(callback=on_status, on_partial=on_partial, since=since)
+            job.marks["heard"] = time.perf_counter()
             
             if not text:
+                if self.speculator:
+                    self.speculator.discard()
+                job.trace.set(outcome="no_speech")
                 self.overlay.update_status("error", auto_hide_delay=2)
                 print("❌ No speech detected\n")
-                return
+                return False
             
             print(f"\n🎤 You said: '{text}'")
+            job.text = text
             
-            # Step 3: AI understanding
+            # Claim the matching speculation now, before the next
+            # utterance starts speculating
+            if self.speculator:
+                job.speculation = self.speculator.claim(text)
+        
+        return True
+    
+    def _understand(self, job):
+        """
+        Pipeline stage 2: turn the transcript into an action
+        
+        Args:
+            job: The command
+            
+        Returns:
+            bool: False if the command was not understood
+        """
+        job.marks["thinking"] = time.perf_counter()
+        
+        with tracer.activate(job.trace.trace_id):
             self.overlay.update_status("thinking")
-            action_dict = self.brain.understand_command(text)
+            if self.speculator:
+                action_dict = self.speculator.result(job.text, job.speculation)
+            else:
+                action_dict = self.brain.understand_command(job.text)
+            job.marks["understood"] = time.perf_counter()
+            job.trace.set(action=action_dict["action"], confidence=action_dict.get("confidence", 0.0))
             
             if action_dict["action"] == "unknown":
+                job.trace.set(outcome="not_understood")
                 self.overlay.update_status("error", auto_hide_delay=2)
                 print(f"❓ Could not understand: {action_dict['param']}\n")
-                return
-            
-            # Step 4: Execute action
+                return False
+        
+        job.action_dict = action_dict
+        return True
+    
+    def _execute(self, job):
+        """
+        Pipeline stage 3: run the action and show the result
+        
+        Args:
+            job: The command
+        """
+        job.marks["executing"] = time.perf_counter()
+        
+        with tracer.activate(job.trace.trace_id):
             self.overlay.update_status("executing")
-            success = self.executor.execute(action_dict)
-            
-            # Step 5: Show result
-            if success:
-                self.overlay.update_status("success", auto_hide_delay=1.5)
-                elapsed = time.time() - start_time
-                print(f"✓ Command completed in {elapsed:.2f}s\n")
-            else:
-                self.overlay.update_status("error", auto_hide_delay=2)
-                print("❌ Command failed\n")
+            with tracer.span("execution", action=job.action_dict["action"]) as span:
+                success = self.executor.execute(job.action_dict)
+                span.set(success=success)
+            job.marks["executed"] = time.perf_counter()
+            job.trace.set(outcome="success" if success else "failed")
         
-        except Exception as e:
+        if success:
+            self.overlay.update_status("success", auto_hide_delay=1.5)
+            elapsed = time.perf_counter() - job.marks["start"]
+            print(f"✓ Command completed in {elapsed:.2f}s\n")
+        else:
             self.overlay.update_status("error", auto_hide_delay=2)
-            print(f"❌ Error: {e}\n")
+            print("❌ Command failed\n")
+    
+    def _finish(self, job):
+        """
+        Called once a command leaves the pipeline, however it ended
         
-        finally:
-            self.is_processing = False
+        Args:
+            job: The command
+        """
+        if job.error is not None:
+            self.overlay.update_status("error", auto_hide_delay=2)
+            print(f"❌ Error: {job.error}\n")
+        
+        if job.trace:
+            if job.cancelled:
+                job.trace.set(outcome="cancelled")
+            elif job.error is not None:
+                job.trace.set(outcome="error")
+            tracer.end(job.trace)
+        
+        # A wake word followed by silence was a false trigger; a cancelled
+        # one never got the chance to hear anything
+        if job.trigger_id is not None and self.wake_word:
+            self.wake_word.resolve(job.trigger_id, heard=None if job.cancelled else job.text is not None)
+        
+        if "start" not in job.marks:
+            return
+        
+        job.timings = self.last_timings = self._stage_timings(job.marks)
+        attributes = job.trace.attributes if job.trace else {}
+        self.overlay.update_timings(job.timings, cache_hit=attributes.get("cache_hit"), source=attributes.get("source"))
+        
+        if DEBUG_MODE:
+            stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in job.timings.items())
+            print(f"⏱️  #{job.id}: {stages}\n")
+    
+    def _stage_timings(self, marks):
+        """
+        Turn pipeline marks into per-stage durations
+        
+        Args:
+            marks: Step name → time.perf_counter() when it was reached
+            
+        Returns:
+            dict: Seconds spent in each completed stage, time spent waiting
+                for a busy stage, and the total
+        """
+        stages = [
+            ("listen", "start", "recognizing"),
+            ("recognize", "recognizing", "heard"),
+            ("understand", "thinking", "understood"),
+            ("execute", "executing", "executed"),
+        ]
+        
+        timings = {}
+        for stage, begin, end in stages:
+            if begin in marks and end in marks:
+                timings[stage] = marks[end] - marks[begin]
+        
+        # Recognizers that never report "recognizing" only have a listen stage
+        if "recognizing" not in marks and "heard" in marks:
+            timings["listen"] = marks["heard"] - marks["start"]
+        
+        # Time spent queued between stages
+        waits = [marks[end] - marks[begin] for begin, end in (("heard", "thinking"), ("understood", "executing"))
+                 if begin in marks and end in marks]
+        if waits:
+            timings["wait"] = sum(waits)
+        
+        timings["total"] = time.perf_counter() - marks["start"]
+        return timings
     
     def run(self):
-        """Run Jarvis (blocking)"""
-        # Start hotkey listener
-        hotkey = HotkeyListener(self.on_hotkey_pressed)
-        hotkey.start()
+        """Run Jarvis on the shared event loop (blocking until Ctrl+C or stop())"""
+        runtime.run(self._serve())
+    
+    def stop(self):
+        """Stop Jarvis (safe from any thread)"""
+        runtime.stop()
+    
+    async def _serve(self):
+        """Listen for hotkeys until the runtime stops"""
+        runtime.on_shutdown(self._shutdown)
+        hotkey = self.start_hotkey()
+        runtime.on_shutdown(hotkey.stop)
+        
+        if ASYNC_MODE:
+            self.warm_up()
+        if WAKE_WORD_ENABLED:
+            runtime.offload(self.start_wake_word)
+        
+        await runtime.wait_stopped()
+    
+    def start_hotkey(self):
+        """
+        Start the hotkey listener, the first thing a user needs
+        
+        Returns:
+            HotkeyListener: The running listener
+        """
+        with startup_profile.measure("hotkey", "import"):
+            from hotkey_listener import HotkeyListener
+        
+        with startup_profile.measure("hotkey", "init"):
+            # Hotkeys arrive on pynput's thread; hand them to the event loop
+            hotkey = HotkeyListener(lambda: runtime.call_soon(self.on_hotkey_pressed, time.perf_counter()))
+            hotkey.start()
+        
+        startup_profile.milestone("hotkey_ready")
+        return hotkey
+    
+    def start_wake_word(self):
+        """
+        Listen for the wake word on the voice component's microphone stream
+        (builds the voice component if needed)
+        
+        Returns:
+            WakeWordListener: The running listener, or None without an
+                enrolled model
+        """
+        from wake_word import WakeWordListener
         
         try:
-            # Keep running
-            while not self.should_exit:
-                time.sleep(0.1)
+            voice = self.voice.get()
+        except Exception as e:
+            print(f"⚠️  Wake word off: {e}")
+            return None
         
-        except KeyboardInterrupt:
-            print("\n\nShutting down JARVIS...")
+        try:
+            listener = WakeWordListener(
+                voice.capture,
+                lambda at, trigger_id: runtime.call_soon(self.on_hotkey_pressed, at, "wake_word", trigger_id),
+                noise=voice.noise
+            )
+        except FileNotFoundError:
+            print("⚠️  Wake word off: enroll it with python wake_word.py --enroll take1.wav take2.wav ...")
+            return None
         
-        finally:
-            hotkey.stop()
+        listener.start()
+        self.wake_word = listener
+        startup_profile.milestone("wake_word_ready")
+        print("✓ Say \"Jarvis\" to activate")
+        return listener
+    
+    def _startup_components(self):
+        """Components to build at startup (the brain only with PRELOAD_AI)"""
+        components = [self.overlay, self.executor, self.voice]
+        if PRELOAD_AI:
+            components.append(self.brain)
+        return components
+    
+    def warm_up(self, components=None):
+        """
+        Build components on the worker pool
+        
+        Args:
+            components: Components to build (default: the startup components)
+            
+        Returns:
+            list: One future per component, resolving to whether it started
+        """
+        return [component.warm() for component in components or self._startup_components()]
+    
+    def _shutdown(self):
+        """Stop every component (runs on the event loop)"""
+        print("\n\nShutting down JARVIS...")
+        self.pipeline.shutdown()
+        if self.speculator:
+            if DEBUG_MODE:
+                print(f"Speculation: {self.speculator.stats()}")
+            self.speculator.shutdown()
+        if DEBUG_MODE:
+            print(f"Pipeline: {self.pipeline.stats()}")
+        if self.wake_word:
+            self.wake_word.stop()
+            if DEBUG_MODE:
+                print(f"Wake word: {self.wake_word.stats()}")
+        if self.voice.loaded:
+            self.voice.close()
+        if self.brain.loaded:
+            # Flush learned decisions still queued for the database
+            self.brain.response_cache.close()
+        if self.overlay.loaded:
+            if DEBUG_MODE:
+                print(f"Overlay: {self.overlay.stats()}")
             self.overlay.destroy()
-            print("✓ JARVIS stopped")
+        print("✓ JARVIS stopped")
     
     def test_components(self):
         """Test all components without hotkey"""
@@ -127,12 +431,13 @@ class Jarvis:
             "search for python tutorials",
         ]
         
-        for cmd in test_commands:
+        # Understand every command in one batch
+        action_dicts = self.brain.understand_commands(test_commands)
+        
+        for cmd, action_dict in zip(test_commands, action_dicts):
             print(f"\nTesting command: '{cmd}'")
             print("-" * 40)
             
-            # Simulate processing
-            action_dict = self.brain.understand_command(cmd)
             print(f"AI Understanding: {action_dict}")
             
             success = self.executor.execute(action_dict)
@@ -142,13 +447,51 @@ class Jarvis:
         
         print("\n✓ Component test complete\n")
 
+def profile_startup():
+    """Start up, wait for every component to be built and report the cost of each"""
+    jarvis = Jarvis()
+    hotkey = jarvis.start_hotkey()
+    
+    for future in jarvis.warm_up([jarvis.overlay, jarvis.executor, jarvis.voice, jarvis.brain]):
+        future.result()
+    startup_profile.milestone("all_ready")
+    hotkey.stop()
+    
+    print()
+    print("=" * 60)
+    print("Startup Profile")
+    print("=" * 60)
+    print(startup_profile.report())
+
 # Main entry point
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="JARVIS - Personal AI Assistant")
+    parser.add_argument("--test", action="store_true", help="test the components without the hotkey")
+    parser.add_argument("--startup-profile", action="store_true", help="report the startup cost of each component")
+    parser.add_argument("--replay", metavar="FILE", help="push recorded utterances (JSONL) through the pipeline")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="replay speed: 0 = as fast as possible, 1 = recorded timing")
+    parser.add_argument("--execute", action="store_true", help="really execute replayed actions (default: dry run)")
+    parser.add_argument("--output", metavar="FILE", help="write per-command replay results (JSONL)")
+    parser.add_argument("--classifier", metavar="FILE", help="intent model to replay with (default: none)")
+    args = parser.parse_args()
+    
+    if args.startup_profile:
+        profile_startup()
+        return
+    
+    if args.replay:
+        from replay import run_replay, print_replay_report
+        summary = run_replay(args.replay, speed=args.speed, dry_run=not args.execute, output=args.output,
+                             classifier=args.classifier)
+        print_replay_report(summary)
+        return
+    
     jarvis = Jarvis()
     
     # Check if test mode
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+    if args.test:
         jarvis.test_components()
     else:
         jarvis.run()
@@ -0,0 +1,61 @@
+"""
+Metrics Module
+Rolling latency windows for tuning and monitoring
+"""
+
+from collections import deque
+import threading
+from config import LATENCY_WINDOW_SIZE
+
+
+class LatencyWindow:
+    def __init__(self, size=LATENCY_WINDOW_SIZE):
+        """
+        Keep the most recent latency samples
+
+        Args:
+            size: Number of samples to keep
+        """
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        """Record one latency sample (seconds)"""
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p):
+        """
+        Get a percentile of the recent samples
+
+        Args:
+            p: Percentile (0-100)
+
+        Returns:
+            float: Latency in seconds, or None without samples
+        """
+        with self.lock:
+            ordered = sorted(self.samples)
+
+        if not ordered:
+            return None
+
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+        return ordered[rank]
+
+    def __len__(self):
+        return len(self.samples)
+
+    def summary(self):
+        """
+        Get the usual percentiles
+
+        Returns:
+            dict: Sample count and p50/p95/p99 in seconds
+        """
+        return {
+            "count": len(self.samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
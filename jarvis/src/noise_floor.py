@@ -0,0 +1,118 @@
+"""
+Noise Floor Module
+Tracks the background noise level from the live microphone stream, so
+speech detection keeps up when a room gets louder or quieter
+"""
+
+import threading
+import numpy as np
+from config import NOISE_WINDOW, NOISE_PERCENTILE, NOISE_SMOOTHING, VAD_FRAME_MS, VAD_ENERGY_RATIO, VAD_MIN_ENERGY
+from tracing import tracer
+
+# Audio needed before the first estimate
+MIN_SECONDS = 0.5
+
+
+class NoiseFloorTracker:
+    def __init__(self, capture, window=NOISE_WINDOW, percentile=NOISE_PERCENTILE,
+                 smoothing=NOISE_SMOOTHING, frame_ms=VAD_FRAME_MS):
+        """
+        Initialize the tracker (it reads the stream once started)
+
+        Args:
+            capture: Running AudioCapture
+            window: Seconds of recent frames the estimate is taken over
+            percentile: Percentile of frame loudness taken as the background;
+                low enough that speech in the window does not count
+            smoothing: Weight of each new estimate in the moving average
+            frame_ms: Analysis frame length
+        """
+        self.capture = capture
+        self.frame = int(capture.buffer.sample_rate * frame_ms / 1000)
+        self.energies = np.zeros(int(window * 1000 / frame_ms), dtype=np.float32)  # ring of frame RMS
+        self.min_frames = int(MIN_SECONDS * 1000 / frame_ms)
+        self.percentile = percentile
+        self.smoothing = smoothing
+
+        self.count = 0  # frames measured
+        self.floor = None  # smoothed RMS of the background
+        self.ready = threading.Event()  # set with the first estimate
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Follow the capture stream in a background thread"""
+        if self.thread:
+            return
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, name="noise-floor", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        """Tracker thread: measure every chunk as it is recorded"""
+        source = self.capture.source(preroll=0)
+        while self.running.is_set():
+            try:
+                data = source.stream.read(source.CHUNK)
+            except OSError:
+                if self.capture.buffer.closed:
+                    return
+                continue
+            self.update(data)
+
+    def update(self, data):
+        """
+        Measure new audio and refresh the estimate
+
+        Args:
+            data: 16-bit PCM bytes
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        usable = len(samples) - len(samples) % self.frame
+        if not usable:
+            return
+
+        frames = samples[:usable].reshape(-1, self.frame).astype(np.float32)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        np.put(self.energies, np.arange(self.count, self.count + len(energy)), energy, mode="wrap")
+        self.count += len(energy)
+        if self.count < self.min_frames:
+            return
+
+        estimate = float(np.percentile(self.energies[:min(self.count, len(self.energies))], self.percentile))
+        self.floor = estimate if self.floor is None else self.floor + self.smoothing * (estimate - self.floor)
+        self.ready.set()
+
+        tracer.gauge("noise_floor_rms", self.floor, "Background noise level (RMS of 16-bit samples)")
+        tracer.gauge("speech_threshold_rms", self.threshold(), "Frame loudness that counts as speech")
+
+    def threshold(self):
+        """
+        Get the loudness a frame needs to count as speech
+
+        Returns:
+            float: RMS threshold, or None before the first estimate
+        """
+        if self.floor is None:
+            return None
+        return max(self.floor * VAD_ENERGY_RATIO, VAD_MIN_ENERGY)
+
+    def stats(self):
+        """
+        Get the current estimate
+
+        Returns:
+            dict: Noise floor, speech threshold and seconds of audio measured
+        """
+        return {
+            "floor": self.floor,
+            "threshold": self.threshold(),
+            "seconds": self.count * self.frame / self.capture.buffer.sample_rate,
+        }
+
+    def stop(self):
+        """Stop following the stream"""
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
@@ -0,0 +1,259 @@
+"""
+Pipeline Module
+Runs commands through a chain of stages, one thread per stage, so that
+capturing the next utterance overlaps with understanding and executing
+the previous one
+
+Guarantees:
+    - Ordering: every stage has one thread and a FIFO queue, so commands
+      reach each stage, and actions run, in the order they were activated
+    - Back-pressure: stage queues are bounded; a full queue blocks the
+      stage before it, and a full first queue rejects new commands
+    - Cancellation: cancel() drops queued commands, and commands inside a
+      stage stop at the next stage boundary
+"""
+
+import itertools
+import queue
+import threading
+from config import COMMAND_QUEUE_SIZE, DEBUG_MODE
+
+
+class Job:
+    def __init__(self, job_id, generation, activated_at=None, trigger="hotkey", trigger_id=None):
+        """
+        One command moving through the pipeline
+
+        Args:
+            job_id: Sequence number, in activation order
+            generation: Pipeline generation when submitted (see cancel())
+            activated_at: time.perf_counter() of the hotkey press, if any
+            trigger: What activated the command ("hotkey" or "wake_word")
+            trigger_id: The trigger's own id (see WakeWordListener.resolve())
+        """
+        self.id = job_id
+        self.generation = generation
+        self.activated_at = activated_at
+        self.trigger = trigger
+        self.trigger_id = trigger_id
+
+        # Filled in by the stages
+        self.marks = {}
+        self.trace = None
+        self.text = None
+        self.speculation = None
+        self.action_dict = None
+        self.timings = {}
+
+        self.cancelled = False
+        self.error = None
+        self.done = threading.Event()
+
+
+class CommandPipeline:
+    def __init__(self, stages, on_done=None, max_pending=COMMAND_QUEUE_SIZE):
+        """
+        Initialize the pipeline (stage threads start with the first command)
+
+        Args:
+            stages: (name, function) pairs run in order; a function takes
+                the Job and returns False to stop it early
+            on_done: Called with every Job once it leaves the pipeline,
+                whether it finished, stopped early, failed or was cancelled
+            max_pending: Capacity of each stage's queue
+        """
+        self.stages = stages
+        self.on_done = on_done
+        self.queues = [queue.Queue(maxsize=max_pending) for _ in stages]
+        self.threads = []
+
+        self.generation = 0
+        self.ids = itertools.count(1)
+        self.submit_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.active = 0  # jobs submitted and not done yet
+
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def _start(self):
+        """Start one thread per stage"""
+        for index, (name, _) in enumerate(self.stages):
+            thread = threading.Thread(target=self._run_stage, args=(index,), name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, activated_at=None, block=False, trigger="hotkey", trigger_id=None):
+        """
+        Queue a command
+
+        Args:
+            activated_at: time.perf_counter() of the hotkey press, if any
+            block: Wait for room instead of rejecting when the queue is full
+            trigger: What activated the command ("hotkey" or "wake_word")
+            trigger_id: The trigger's own id, carried on the Job
+
+        Returns:
+            Job: The queued command, or None if it was rejected
+        """
+        with self.submit_lock:
+            if not self.threads:
+                self._start()
+
+            with self.lock:
+                job = Job(next(self.ids), self.generation, activated_at, trigger, trigger_id)
+                self.active += 1
+
+            try:
+                self.queues[0].put(job, block=block)
+            except queue.Full:
+                with self.lock:
+                    self.active -= 1
+                    self.rejected += 1
+                    self.idle.notify_all()
+                return None
+
+        return job
+
+    def run(self, activated_at=None):
+        """
+        Run one command through every stage in the calling thread
+
+        Args:
+            activated_at: time.perf_counter() of the hotkey press, if any
+
+        Returns:
+            Job: The finished command
+        """
+        with self.lock:
+            job = Job(next(self.ids), self.generation, activated_at)
+            self.active += 1
+
+        for name, function in self.stages:
+            if not self._call(name, function, job):
+                break
+
+        self._done(job)
+        return job
+
+    def _run_stage(self, index):
+        """Worker loop of one stage"""
+        name, function = self.stages[index]
+        inbox = self.queues[index]
+        last = index + 1 == len(self.stages)
+
+        while True:
+            job = inbox.get()
+            if job is None:
+                return
+
+            if self._call(name, function, job) and not last:
+                # Blocks while the next stage is backed up
+                self.queues[index + 1].put(job)
+            else:
+                self._done(job)
+
+    def _call(self, name, function, job):
+        """
+        Run one stage for a job
+
+        Returns:
+            bool: True if the job should continue to the next stage
+        """
+        if job.generation != self.generation:
+            job.cancelled = True
+            return False
+
+        try:
+            if function(job) is False:
+                return False
+        except Exception as e:
+            job.error = e
+            if DEBUG_MODE:
+                print(f"❌ Pipeline stage '{name}' failed: {e}")
+            return False
+
+        if job.generation != self.generation:
+            job.cancelled = True
+            return False
+        return True
+
+    def _done(self, job):
+        """Hand a job that left the pipeline to on_done"""
+        try:
+            if self.on_done:
+                self.on_done(job)
+        except Exception as e:
+            print(f"❌ Pipeline error: {e}")
+        finally:
+            job.done.set()
+            with self.lock:
+                self.active -= 1
+                if job.cancelled:
+                    self.cancelled += 1
+                elif job.error is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self.idle.notify_all()
+
+    def cancel(self):
+        """
+        Cancel every queued and running command
+
+        Returns:
+            int: Number of commands that were waiting in a queue
+        """
+        with self.lock:
+            self.generation += 1
+
+        dropped = 0
+        for inbox in self.queues:
+            while True:
+                try:
+                    job = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.cancelled = True
+                    self._done(job)
+                    dropped += 1
+        return dropped
+
+    def join(self, timeout=None):
+        """
+        Wait until every submitted command has left the pipeline
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self.idle:
+            return self.idle.wait_for(lambda: self.active == 0, timeout)
+
+    def stats(self):
+        """
+        Get pipeline metrics
+
+        Returns:
+            dict: Command counts and current queue depths
+        """
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "queued": {name: inbox.qsize() for (name, _), inbox in zip(self.stages, self.queues)},
+        }
+
+    def shutdown(self):
+        """Cancel everything and stop the stage threads"""
+        self.cancel()
+        for inbox in self.queues:
+            try:
+                inbox.put_nowait(None)
+            except queue.Full:
+                pass
@@ -0,0 +1,207 @@
+"""
+Prompt Compiler Module
+Builds compact Gemini instructions once and accounts for tokens per request
+"""
+
+import json
+import math
+from action_schema import ACTIONS, EXAMPLES, PLAN_EXAMPLES
+from config import APP_PATHS, PROMPT_TOKEN_BUDGET, DEBUG_MODE
+
+# Rough size of a token for English text (Gemini averages ~4 characters)
+CHARS_PER_TOKEN = 4
+
+# Characters a command request adds around the command text
+COMMAND_QUOTES = 'User: ""'
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of a text without a network call
+
+    Args:
+        text: Prompt or response text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+class PromptCompiler:
+    def __init__(self, budget=PROMPT_TOKEN_BUDGET):
+        """
+        Compile the instructions from the action schema
+
+        Args:
+            budget: Maximum input tokens per command request
+        """
+        self.budget = budget
+        self.command_instruction = self._compile_command_instruction()
+        self.chat_instruction = "You are JARVIS, a voice assistant. Respond briefly and helpfully."
+        self.instruction_tokens = estimate_tokens(self.command_instruction)
+
+        if self.instruction_tokens >= budget:
+            raise ValueError(
+                f"Command instruction needs ~{self.instruction_tokens} tokens, "
+                f"over PROMPT_TOKEN_BUDGET ({budget})"
+            )
+
+        # Token accounting
+        self.requests = 0
+        self.commands = 0  # a batched request carries several
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.truncated = 0
+
+        if DEBUG_MODE:
+            print(f"✓ Prompt compiled (~{self.instruction_tokens} tokens of instructions)")
+
+    def _compile_command_instruction(self):
+        """Build the system instruction for command understanding"""
+        lines = [
+            "You are JARVIS. Map the user's voice command to one action.",
+            'Reply with JSON only, confidence first: {"confidence":0-1,"action":A,"param":P}',
+            'Several commands at once: {"confidence":0-1,"steps":[{"action":A,"param":P,"after":[steps it needs first]}]}',
+            "Actions (A: P):",
+        ]
+
+        for action, spec in ACTIONS.items():
+            if action == "launch_app":
+                param = "|".join(APP_PATHS) + "|other app name"
+            elif "params" in spec:
+                param = "|".join(spec["params"])
+            else:
+                param = spec["param"]
+            lines.append(f"{action}: {param}")
+        lines.append("unknown: reason")
+
+        lines.append("Examples:")
+        for text, action, param in EXAMPLES:
+            answer = json.dumps({"action": action, "param": param}, separators=(",", ":"))
+            lines.append(f"{text} → {answer}")
+        for text, steps in PLAN_EXAMPLES:
+            plan = {"steps": [
+                {"action": action, "param": param, **({"after": after} if after else {})}
+                for action, param, after in steps
+            ]}
+            lines.append(f"{text} → {json.dumps(plan, separators=(',', ':'))}")
+
+        return "\n".join(lines)
+
+    def command_request(self, text):
+        """
+        Build the per-command request, truncating it to fit the budget
+
+        Args:
+            text: Voice command text
+
+        Returns:
+            str: Request content sent alongside the system instruction
+        """
+        return f'User: "{self._fit(text, len(COMMAND_QUOTES))}"'
+
+    def _fit(self, text, overhead):
+        """
+        Truncate a command so its request (or batch line) fits the budget
+
+        Args:
+            text: Voice command text
+            overhead: Characters the request adds around the text
+
+        Returns:
+            str: The text, shortened if it was over budget
+        """
+        available = self.budget - self.instruction_tokens
+        if estimate_tokens("x" * overhead + text) <= available:
+            return text
+
+        self.truncated += 1
+        if DEBUG_MODE:
+            print(f"⚠️  Command truncated to fit the {self.budget}-token budget")
+        return text[:available * CHARS_PER_TOKEN - overhead]
+
+    def batch_request(self, texts):
+        """
+        Build one request asking for several commands at once, each held to
+        the budget of a single command request
+
+        Args:
+            texts: Voice command texts
+
+        Returns:
+            str: Request content sent alongside the system instruction
+        """
+        lines = [
+            "Several commands follow. Reply with a JSON array only, one object per command, "
+            'in the same order, each with its number as "id":',
+        ]
+        for i, text in enumerate(texts, 1):
+            prefix = f'{i}. "'
+            lines.append(f'{prefix}{self._fit(text, len(prefix) + 1)}"')
+        return "\n".join(lines)
+
+    def chat_request(self, text):
+        """Build the request for a conversational response"""
+        return f"User says: {text}"
+
+    def record(self, request, response=None, response_text="", instruction=None, commands=1):
+        """
+        Account for the tokens of one request
+
+        Args:
+            request: Request content that was sent
+            response: Gemini response (its usage metadata is used when present)
+            response_text: Response text received, for estimating output tokens
+            instruction: System instruction used (defaults to the command instruction)
+            commands: Number of commands the request asked about
+        """
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0)
+        output_tokens = getattr(usage, "candidates_token_count", 0)
+
+        if not prompt_tokens:
+            instruction_tokens = self.instruction_tokens if instruction is None else estimate_tokens(instruction)
+            prompt_tokens = instruction_tokens + estimate_tokens(request)
+
+        self.requests += 1
+        self.commands += commands
+        self.prompt_tokens += prompt_tokens
+        self.output_tokens += output_tokens or estimate_tokens(response_text)
+
+    def usage(self):
+        """
+        Get token usage so far
+
+        Returns:
+            dict: Requests, total, per-request and per-command token counts
+        """
+        requests = self.requests or 1
+        commands = self.commands or 1
+        return {
+            "requests": self.requests,
+            "commands": self.commands,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "prompt_tokens_per_request": self.prompt_tokens / requests,
+            "output_tokens_per_request": self.output_tokens / requests,
+            "prompt_tokens_per_command": self.prompt_tokens / commands,
+            "output_tokens_per_command": self.output_tokens / commands,
+            "instruction_tokens": self.instruction_tokens,
+            "truncated": self.truncated,
+        }
+
+# Test function
+def test():
+    """Show the compiled prompt"""
+    print("=" * 60)
+    print("Prompt Compiler Test")
+    print("=" * 60)
+
+    compiler = PromptCompiler()
+    print(compiler.command_instruction)
+    print()
+    print(compiler.command_request("open edge browser"))
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,269 @@
+"""
+JARVIS Replay
+Pushes recorded utterances through the command pipeline without a
+hotkey, microphone or GUI, and reports per-command results, throughput
+and cache hit rates
+
+Usage:
+    python main.py --replay commands.jsonl [--speed 0] [--execute] [--output results.jsonl]
+                   [--classifier intent_model.npz]
+
+Each input line is {"text": ...} or {"wav": path}, optionally with a
+"timestamp" (epoch seconds or ISO 8601) and the expected "action"/"param".
+
+A replay starts from an empty learned cache and writes no trace or metrics
+files, so it neither depends on nor changes what the assistant has learned.
+"""
+
+from datetime import datetime
+import json
+import threading
+import time
+from metrics import LatencyWindow
+from config import DEBUG_MODE
+
+STAGES = ["listen", "recognize", "understand", "execute", "wait", "total"]
+
+
+def load_utterances(path):
+    """
+    Read a replay file
+
+    Args:
+        path: JSONL file of utterances
+
+    Returns:
+        list: Utterance dicts, with "timestamp" converted to epoch seconds
+    """
+    utterances = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            utterance = json.loads(line)
+            if "text" not in utterance and "wav" not in utterance:
+                raise ValueError(f"{path}:{number}: needs \"text\" or \"wav\"")
+            if isinstance(utterance.get("timestamp"), str):
+                utterance["timestamp"] = datetime.fromisoformat(utterance["timestamp"]).timestamp()
+            utterances.append(utterance)
+    return utterances
+
+
+class ReplayRecognizer:
+    def __init__(self, utterances):
+        """
+        Stand-in for VoiceRecognizer that returns recorded utterances in order
+
+        Args:
+            utterances: Utterance dicts (see load_utterances)
+        """
+        self.utterances = utterances
+        self.position = 0
+        self.lock = threading.Lock()
+        self.transcriber = None
+
+    def listen(self, callback=None, on_partial=None, since=None):
+        """Return the next recorded utterance, transcribing recordings"""
+        with self.lock:
+            utterance = self.utterances[self.position]
+            self.position += 1
+
+        if callback:
+            callback("listening")
+
+        if "text" in utterance:
+            return utterance["text"].lower()
+
+        if callback:
+            callback("recognizing")
+        return self._transcribe(utterance["wav"])
+
+    def _transcribe(self, path):
+        """Transcribe a WAV recording with the configured speech-to-text backends"""
+        import speech_recognition as sr
+        from speech_to_text import Transcriber
+
+        with self.lock:
+            if self.transcriber is None:
+                self.transcriber = Transcriber()
+
+        try:
+            with sr.AudioFile(path) as source:
+                audio = sr.Recognizer().record(source)
+            text, _ = self.transcriber.transcribe(audio)
+            return text.lower()
+        except (sr.UnknownValueError, sr.RequestError, OSError) as e:
+            if DEBUG_MODE:
+                print(f"❌ Could not transcribe {path}: {e}")
+            return None
+
+    def close(self):
+        pass
+
+
+class NullOverlay:
+    def update_status(self, status, auto_hide_delay=None):
+        pass
+
+    def update_transcript(self, text, stable=""):
+        pass
+
+    def update_timings(self, timings, cache_hit=None, source=None):
+        pass
+
+    def stats(self):
+        return {}
+
+    def destroy(self):
+        pass
+
+
+def run_replay(path, speed=0.0, dry_run=True, output=None, classifier=None):
+    """
+    Replay a file of utterances through the pipeline
+
+    Args:
+        path: JSONL file of utterances
+        speed: 0 to replay as fast as possible, 1 to keep the recorded gaps
+            between timestamps, 2 for twice as fast, ...
+        dry_run: Report actions instead of executing them
+        output: Optional file receiving one JSON result per command
+        classifier: Optional intent model file to replay with (default:
+            no classifier, whatever is in the working directory)
+
+    Returns:
+        dict: Summary (throughput, outcomes, sources, stage percentiles)
+    """
+    from main import Jarvis
+    from action_executor import ActionExecutor
+    from gemini_brain import GeminiBrain
+    from response_cache import ResponseCache
+    from tracing import tracer
+
+    utterances = load_utterances(path)
+    if classifier is not None:
+        from intent_classifier import IntentClassifier
+        model_path, classifier = classifier, IntentClassifier.load(classifier)
+        if classifier is None:
+            raise ValueError(f"Could not load intent model {model_path}")
+
+    # Keep replay spans out of the production trace and metrics files
+    sinks = tracer.trace_file, tracer.metrics_file
+    tracer.trace_file = tracer.metrics_file = None
+
+    try:
+        jarvis = Jarvis(
+            voice=ReplayRecognizer(utterances),
+            brain=GeminiBrain(response_cache=ResponseCache(path=":memory:"), classifier=classifier),
+            executor=ActionExecutor(dry_run=dry_run),
+            overlay=NullOverlay(),
+        )
+
+        # Build everything up front so startup does not count as replay time
+        for future in jarvis.warm_up([jarvis.executor, jarvis.brain]):
+            future.result()
+        jarvis.brain.response_cache.loaded.wait()
+
+        # Submit in recorded order; the pipeline keeps that order
+        jobs = []
+        started = time.perf_counter()
+        first = utterances[0].get("timestamp") if utterances else None
+        for utterance in utterances:
+            if speed > 0 and first is not None and "timestamp" in utterance:
+                delay = (utterance["timestamp"] - first) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            jobs.append(jarvis.pipeline.submit(block=True))
+        jarvis.pipeline.join()
+        elapsed = time.perf_counter() - started
+        jarvis.brain.response_cache.close()
+    finally:
+        tracer.flush()  # drop the replay's spans before the sinks come back
+        tracer.trace_file, tracer.metrics_file = sinks
+
+    results = [_result(job, utterance) for job, utterance in zip(jobs, utterances)]
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    return _summarize(results, elapsed, jarvis.brain.stats())
+
+
+def _result(job, utterance):
+    """Describe how one replayed command went"""
+    attributes = job.trace.attributes if job.trace else {}
+    action = job.action_dict or {}
+    result = {
+        "id": job.id,
+        "input": utterance.get("text") or utterance.get("wav"),
+        "text": job.text,
+        "action": action.get("action", attributes.get("action")),
+        "param": action.get("param"),
+        "confidence": action.get("confidence"),
+        "source": attributes.get("source"),
+        "outcome": attributes.get("outcome", "error" if job.error else None),
+        "timings": {stage: round(job.timings[stage], 4) for stage in STAGES if stage in job.timings},
+    }
+
+    if "action" in utterance:
+        result["expected"] = {key: utterance[key] for key in ("action", "param") if key in utterance}
+        result["match"] = (
+            result["action"] == utterance["action"]
+            and ("param" not in utterance or str(result["param"]).lower() == str(utterance["param"]).lower())
+        )
+    return result
+
+
+def _summarize(results, elapsed, brain_stats):
+    """Aggregate replay results"""
+    windows = {stage: LatencyWindow(size=max(1, len(results))) for stage in STAGES}
+    outcomes = {}
+    sources = {}
+    for result in results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+        if result["source"]:
+            sources[result["source"]] = sources.get(result["source"], 0) + 1
+        for stage, seconds in result["timings"].items():
+            windows[stage].add(seconds)
+
+    understood = sum(sources.values())
+    local = understood - sources.get("model", 0)
+    checked = [result["match"] for result in results if "match" in result]
+
+    return {
+        "commands": len(results),
+        "elapsed": elapsed,
+        "throughput": len(results) / elapsed if elapsed else 0.0,
+        "outcomes": outcomes,
+        "sources": sources,
+        "local_hit_rate": local / understood if understood else 0.0,
+        "matches": {"checked": len(checked), "matched": sum(checked)},
+        "stages": {stage: window.summary() for stage, window in windows.items()},
+        "brain": brain_stats,
+    }
+
+
+def print_replay_report(summary):
+    """Print a replay summary"""
+    print("=" * 60)
+    print(f"JARVIS Replay ({summary['commands']} commands in {summary['elapsed']:.2f}s)")
+    print("=" * 60)
+    print(f"Throughput: {summary['throughput']:.2f} commands/s")
+    print(f"Outcomes: {summary['outcomes']}")
+    print(f"Sources: {summary['sources']} (answered without Gemini: {summary['local_hit_rate']:.0%})")
+    print(f"Learned cache hit rate: {summary['brain']['response_cache']['hit_rate']:.0%}")
+
+    matches = summary["matches"]
+    if matches["checked"]:
+        print(f"Expected actions: {matches['matched']}/{matches['checked']} matched")
+
+    print()
+    print(f"{'Stage':<12}{'p50':>10}{'p95':>10}{'p99':>10}")
+    print("-" * 42)
+    for stage, stats in summary["stages"].items():
+        if not stats["count"]:
+            continue
+        cells = "".join(f"{stats[p] * 1000:>8.0f}ms" for p in ("p50", "p95", "p99"))
+        print(f"{stage:<12}{cells}")
@@ -0,0 +1,308 @@
+"""
+Response Cache Module
+Remembers validated Gemini decisions on disk across restarts
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from action_schema import ACTIONS
+from command_index import normalize_utterance
+from config import (
+    RESPONSE_CACHE_FILE, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MIN_CONFIDENCE, DEBUG_MODE,
+)
+
+# Bump when the stored row format changes; older caches are discarded
+SCHEMA_VERSION = 1
+
+
+class ResponseCache:
+    def __init__(self, path=RESPONSE_CACHE_FILE, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl=RESPONSE_CACHE_TTL):
+        """
+        Initialize the cache (nothing is read until start() is called)
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of remembered utterances
+            ttl: Seconds before an entry expires
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # key -> (action, param, confidence, created); order = least recently used first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.writes = queue.Queue()
+        self.thread = None
+        self.enabled = True
+
+        # Counters for tuning
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def start(self):
+        """Load the cache and start the writer thread in the background"""
+        if self.thread:
+            return
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        """Never load, remember or answer anything"""
+        self.enabled = False
+        self.loaded.set()
+
+    def get(self, text, count=True):
+        """
+        Look up a remembered decision
+
+        Args:
+            text: Voice command text
+            count: Record the lookup in the hit/miss counters
+
+        Returns:
+            dict: Copy of the cached action, or None on a miss
+        """
+        key = normalize_utterance(text)
+
+        now = time.time()
+        with self.lock:
+            # Never block the hot path on the initial load
+            if not key or not self.loaded.is_set() or not self.enabled:
+                self.misses += count
+                return None
+
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+
+            action, param, confidence, created = entry
+            if now - created > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += count
+                self.writes.put(("delete", key))
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += count
+
+        self.writes.put(("touch", key, now))
+        return {"action": action, "param": param, "confidence": confidence}
+
+    def put(self, text, result):
+        """
+        Remember a decision if it is valid (before the initial load finishes
+        it is kept in memory and merged in, newer than anything loaded)
+
+        Args:
+            text: Voice command text
+            result: {"action", "param", "confidence"} returned by the model
+
+        Returns:
+            bool: True if the decision was stored
+        """
+        key = normalize_utterance(text)
+        if not key or not self.enabled or not self._is_valid(result):
+            return False
+
+        now = time.time()
+        entry = (result["action"], result["param"], float(result.get("confidence", 0.0)), now)
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self.evictions += 1
+                self.writes.put(("delete", evicted))
+
+        self.writes.put(("put", key, entry, now))
+        return True
+
+    def _is_valid(self, result):
+        """Only remember well-formed, confident decisions"""
+        if not isinstance(result, dict):
+            return False
+        if result.get("action") not in ACTIONS:
+            return False
+        if not isinstance(result.get("param"), str) or not result["param"].strip():
+            return False
+        return result.get("confidence", 0.0) >= RESPONSE_CACHE_MIN_CONFIDENCE
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: Hits, misses, hit rate, size, evictions and expirations
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        if self.thread:
+            self.writes.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _run(self):
+        """Writer thread: owns the SQLite connection"""
+        try:
+            db = sqlite3.connect(self.path)
+            self._open(db)
+            self._load(db)
+        except sqlite3.Error as e:
+            print(f"⚠️  Response cache unavailable: {e}")
+            self.enabled = False
+            return
+        finally:
+            # Even a failed load must not keep callers waiting
+            self.loaded.set()
+
+        try:
+            while True:
+                op = self.writes.get()
+                if op is None:
+                    break
+
+                # Batch everything already queued into one transaction
+                ops = [op]
+                while True:
+                    try:
+                        op = self.writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if op is None:
+                        self.writes.put(None)
+                        break
+                    ops.append(op)
+
+                with db:
+                    for op in ops:
+                        self._apply(db, op)
+        except sqlite3.Error as e:
+            print(f"⚠️  Response cache write error: {e}")
+        finally:
+            db.close()
+
+    def _open(self, db):
+        """Create tables, discarding caches written by another schema version"""
+        with db:
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                db.execute("DROP TABLE IF EXISTS responses")
+                db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),)
+                )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, action TEXT, param TEXT, confidence REAL, "
+                "created REAL, last_used REAL)"
+            )
+
+    def _load(self, db):
+        """Read unexpired entries, most recently used last, behind any put() made meanwhile"""
+        cutoff = time.time() - self.ttl
+        with db:
+            expired = db.execute("DELETE FROM responses WHERE created < ?", (cutoff,)).rowcount
+
+        rows = db.execute(
+            "SELECT key, action, param, confidence, created FROM responses "
+            "ORDER BY last_used DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+
+        with self.lock:
+            self.expirations += expired
+            entries = OrderedDict(
+                (key, (action, param, confidence, created))
+                for key, action, param, confidence, created in reversed(rows)
+                if key not in self.entries
+            )
+            entries.update(self.entries)
+            while len(entries) > self.max_entries:
+                evicted, _ = entries.popitem(last=False)
+                self.evictions += 1
+                self.writes.put(("delete", evicted))
+            self.entries = entries
+
+        if DEBUG_MODE:
+            print(f"✓ Response cache loaded ({len(rows)} entries)")
+
+    def _apply(self, db, op):
+        """Apply one queued write"""
+        kind = op[0]
+        if kind == "put":
+            _, key, (action, param, confidence, created), now = op
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, action, param, confidence, created, now)
+            )
+        elif kind == "touch":
+            _, key, now = op
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        elif kind == "delete":
+            db.execute("DELETE FROM responses WHERE key = ?", (op[1],))
+
+def export_entries(path=RESPONSE_CACHE_FILE):
+    """
+    Read every remembered decision (for offline training)
+
+    Args:
+        path: SQLite database file
+
+    Returns:
+        list: (utterance, action, param) tuples, empty without a cache
+    """
+    try:
+        # Read-only, so a missing cache is not created empty
+        db = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return db.execute("SELECT key, action, param FROM responses").fetchall()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return []
+
+# Test function
+def test():
+    """Test the response cache"""
+    print("=" * 60)
+    print("Response Cache Test")
+    print("=" * 60)
+
+    cache = ResponseCache()
+    cache.start()
+    cache.loaded.wait()
+
+    cache.put("what's the weather like", {"action": "web_search", "param": "weather", "confidence": 0.9})
+    for cmd in ["What's the weather like?", "what is the weather like"]:
+        print(f"'{cmd}' → {cache.get(cmd)}")
+    print(f"Stats: {cache.stats()}")
+
+    cache.close()
+
+if __name__ == "__main__":
+    test()
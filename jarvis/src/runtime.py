@@ -0,0 +1,191 @@
+"""
+Runtime Module
+One asyncio event loop shared by every component: hotkey and audio
+callbacks are bridged onto it from their own threads, timers replace
+sleeping threads, and blocking work runs on a fixed worker pool
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from config import RUNTIME_WORKERS, DEBUG_MODE
+
+
+class Timer:
+    def __init__(self, runtime):
+        """Handle of a callback scheduled with Runtime.call_later()"""
+        self.runtime = runtime
+        self.handle = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the callback (safe from any thread)"""
+        self.cancelled = True
+        self.runtime.call_soon(self._cancel)
+
+    def _cancel(self):
+        if self.handle:
+            self.handle.cancel()
+
+
+class Runtime:
+    def __init__(self, workers=RUNTIME_WORKERS):
+        """
+        Initialize the runtime (the loop runs once run() or a component
+        needs it)
+
+        Args:
+            workers: Size of the pool for blocking work
+        """
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="runtime-worker")
+        self.loop.set_default_executor(self.executor)
+        self.lock = threading.Lock()
+        self.thread = None  # background thread running the loop, if any
+        self.owned = False  # True while run() drives the loop in its caller's thread
+        self.stopping = None  # asyncio.Event, set by stop()
+        self.shutdown_callbacks = []
+
+    def ensure_running(self):
+        """
+        Get the event loop, running it on a background thread when run()
+        is not driving it
+
+        Returns:
+            asyncio.AbstractEventLoop: The shared loop
+        """
+        with self.lock:
+            if not self.owned and self.thread is None:
+                self.thread = threading.Thread(target=self.loop.run_forever, name="jarvis-runtime", daemon=True)
+                self.thread.start()
+        return self.loop
+
+    def in_loop(self):
+        """Check whether the caller is running on the event loop"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def call_soon(self, callback, *args):
+        """Run a callback on the event loop (safe from any thread)"""
+        if self.in_loop():
+            self.loop.call_soon(callback, *args)
+        else:
+            self.ensure_running().call_soon_threadsafe(callback, *args)
+
+    def call_later(self, delay, callback, *args):
+        """
+        Run a callback on the event loop after a delay (safe from any thread)
+
+        Args:
+            delay: Seconds to wait
+            callback: Function to call
+
+        Returns:
+            Timer: Handle whose cancel() stops the callback
+        """
+        timer = Timer(self)
+
+        def _schedule():
+            if not timer.cancelled:
+                timer.handle = self.loop.call_later(delay, callback, *args)
+
+        self.call_soon(_schedule)
+        return timer
+
+    def submit(self, coroutine):
+        """
+        Run a coroutine on the event loop from another thread
+
+        Returns:
+            concurrent.futures.Future: Its result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.ensure_running())
+
+    def offload(self, function, *args):
+        """
+        Run blocking work on the worker pool
+
+        Returns:
+            concurrent.futures.Future: Its result
+        """
+        return self.executor.submit(function, *args)
+
+    def on_shutdown(self, callback):
+        """Register a callback run on the loop when the runtime stops"""
+        self.shutdown_callbacks.append(callback)
+
+    def stop(self):
+        """Ask run() to return (safe from any thread)"""
+        self.call_soon(self._stop)
+
+    def _stop(self):
+        if self.stopping:
+            self.stopping.set()
+
+    async def wait_stopped(self):
+        """Wait until stop() is called"""
+        await self.stopping.wait()
+
+    def run(self, main):
+        """
+        Drive the event loop in this thread until main finishes, stop() is
+        called or Ctrl+C is pressed, then shut down gracefully
+
+        Args:
+            main: Coroutine to run
+        """
+        with self.lock:
+            background = self.thread is not None
+            self.owned = not background
+
+        if background:
+            # Something already started the loop in the background
+            future = self.submit(self._main(main))
+            try:
+                future.result()
+            except KeyboardInterrupt:
+                future.cancel()
+                self.submit(self._shutdown()).result()
+            return
+
+        asyncio.set_event_loop(self.loop)
+        task = self.loop.create_task(self._main(main))
+        try:
+            self.loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            task.cancel()
+            self.loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+            self.loop.run_until_complete(self._shutdown())
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            with self.lock:
+                self.owned = False
+
+    async def _main(self, main):
+        """Run main alongside the stop signal"""
+        self.stopping = asyncio.Event()
+        try:
+            await main
+        finally:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        """Run the shutdown callbacks once, newest first"""
+        callbacks, self.shutdown_callbacks = self.shutdown_callbacks, []
+        for callback in reversed(callbacks):
+            try:
+                result = callback()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                if DEBUG_MODE:
+                    print(f"⚠️  Shutdown error: {e}")
+
+        # Let callbacks the shutdown scheduled (e.g. closing the overlay) run
+        await asyncio.sleep(0)
+
+# Shared runtime used by every component
+runtime = Runtime()
@@ -0,0 +1,185 @@
+"""
+Speculation Module
+Resolves intents on interim transcripts while the user is still speaking
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from command_index import normalize_utterance
+from tracing import tracer
+from config import SPECULATION_MAX_INFLIGHT, SPECULATION_MIN_STABILITY, DEBUG_MODE
+
+
+class Speculator:
+    def __init__(self, brain, max_inflight=SPECULATION_MAX_INFLIGHT, min_stability=SPECULATION_MIN_STABILITY):
+        """
+        Initialize the speculator
+
+        Args:
+            brain: GeminiBrain used to understand transcripts
+            max_inflight: Maximum number of concurrent speculative calls
+            min_stability: Stability an interim hypothesis needs before it
+                is worth understanding
+        """
+        self.brain = brain
+        self.min_stability = min_stability
+        self.pool = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="speculation")
+        self.pending = {}  # normalized transcript -> Future of (action, root span attributes)
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.speculations = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0  # discarded speculations that reached the model
+        self.cancelled = 0
+        self.unstable = 0
+
+    def speculate(self, hypothesis):
+        """
+        Start understanding an interim transcript in the background
+
+        Args:
+            hypothesis: Interim Hypothesis from VoiceRecognizer.stream()
+        """
+        if hypothesis.stability < self.min_stability:
+            with self.lock:
+                self.unstable += 1
+            return
+
+        # Never build the brain here (on the capture thread) just to guess
+        if not getattr(self.brain, "loaded", True):
+            return
+
+        partial_text = hypothesis.text
+        key = normalize_utterance(partial_text)
+        if not key:
+            return
+
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending[key] = self.pool.submit(self._understand, partial_text)
+            self.speculations += 1
+
+        if DEBUG_MODE:
+            print(f"🔮 Speculating on: '{partial_text}'")
+
+    def _understand(self, partial_text):
+        """
+        Speculation worker: understand an interim transcript in a trace of
+        its own, since the command's trace does not exist yet
+
+        Returns:
+            tuple: (action dict, attributes of the speculation's root span)
+        """
+        with tracer.trace("speculation") as root:
+            result = self.brain.understand_command(partial_text, speculative=True)
+        return result, root.attributes
+
+    def claim(self, final_text):
+        """
+        Take the speculation matching the final transcript, discarding the
+        others, so the next utterance can speculate while this one is
+        still being understood
+
+        Args:
+            final_text: Final transcript
+
+        Returns:
+            Future: The matching speculation, or None
+        """
+        key = normalize_utterance(final_text)
+
+        with self.lock:
+            future = self.pending.pop(key, None)
+            if future:
+                self.hits += 1
+            elif self.pending:
+                self.misses += 1
+
+        self.discard()
+
+        if future and DEBUG_MODE:
+            print(f"🔮 Speculation hit: '{final_text}'")
+        return future
+
+    def resolve(self, final_text):
+        """
+        Get the intent for the final transcript, committing a matching
+        speculation and discarding the others
+
+        Args:
+            final_text: Final transcript
+
+        Returns:
+            dict: {"action": "action_type", "param": "parameter", "confidence": float}
+        """
+        return self.result(final_text, self.claim(final_text))
+
+    def result(self, final_text, future):
+        """
+        Get the intent for a final transcript whose speculation was claimed
+
+        Args:
+            final_text: Final transcript
+            future: What claim(final_text) returned
+
+        Returns:
+            dict: {"action": "action_type", "param": "parameter", "confidence": float}
+        """
+        tracer.annotate(speculation_hit=future is not None)
+
+        if future:
+            result, attributes = future.result()
+            # Where the answer came from, as if it had been asked now
+            tracer.annotate(**{key: attributes[key] for key in ("source", "cache_hit") if key in attributes})
+            self.brain.confirm_speculation(final_text)
+            return result
+
+        return self.brain.understand_command(final_text)
+
+    def discard(self):
+        """Drop every outstanding speculation"""
+        with self.lock:
+            pending = list(self.pending.values())
+            self.pending.clear()
+            running = [future for future in pending if not future.cancel()]
+            self.cancelled += len(pending) - len(running)
+
+        # Outside the lock: the callback runs at once for finished futures
+        for future in running:
+            future.add_done_callback(self._count_wasted)
+
+    def _count_wasted(self, future):
+        """Count a discarded speculation once it is known to have cost a model call"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, attributes = future.result()
+        if attributes.get("source") == "model":
+            with self.lock:
+                self.wasted += 1
+
+    def stats(self):
+        """
+        Get speculation metrics
+
+        Returns:
+            dict: Speculations, hit rate and wasted calls
+        """
+        with self.lock:
+            resolved = self.hits + self.misses
+            return {
+                "speculations": self.speculations,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / resolved if resolved else 0.0,
+                "wasted_calls": self.wasted,
+                "cancelled": self.cancelled,
+                "skipped_unstable": self.unstable,
+            }
+
+    def shutdown(self):
+        """Stop the speculation workers"""
+        self.discard()
+        self.pool.shutdown(wait=False)
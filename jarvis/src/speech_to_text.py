@@ -0,0 +1,350 @@
+"""
+Speech-to-Text Module
+Interchangeable transcription backends (Google, offline Whisper on the
+CPU, an in-process fake) raced against each other with a deadline
+"""
+
+import concurrent.futures
+import contextvars
+import copy
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+from config import (
+    STT_BACKENDS, STT_DEADLINE, VOICE_LANGUAGE, WHISPER_MODEL, WHISPER_COMPUTE_TYPE, DEBUG_MODE,
+)
+from metrics import LatencyWindow
+from tracing import tracer
+
+
+class SpeechBackend:
+    """
+    A speech-to-text engine
+
+    transcribe() returns the text, raises sr.UnknownValueError when the
+    audio holds no recognizable speech and sr.RequestError when the engine
+    fails or takes longer than `timeout` seconds.
+    """
+    name = None
+
+    def transcribe(self, audio, timeout=None):
+        raise NotImplementedError
+
+
+class GoogleBackend(SpeechBackend):
+    name = "google"
+
+    def __init__(self, language=VOICE_LANGUAGE):
+        """Google Web Speech API (needs a network connection)"""
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, audio, timeout=None):
+        recognizer = self.recognizer
+        if timeout is not None:
+            recognizer = copy.copy(recognizer)  # calls may overlap with different timeouts
+            recognizer.operation_timeout = timeout
+        return recognizer.recognize_google(audio, language=self.language)
+
+
+class WhisperBackend(SpeechBackend):
+    name = "whisper"
+
+    def __init__(self, model=WHISPER_MODEL, compute_type=WHISPER_COMPUTE_TYPE, language=VOICE_LANGUAGE):
+        """
+        Offline Whisper on the CPU (needs faster-whisper)
+
+        Args:
+            model: Model size (e.g. "base.en") or path to a converted model
+            compute_type: CTranslate2 quantization ("int8" is fastest on CPU)
+            language: Spoken language (only the language code is used)
+        """
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError("The whisper backend needs faster-whisper: pip install faster-whisper")
+
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type)
+        self.language = language.split("-")[0]
+        self.lock = threading.Lock()  # one decode at a time per model
+
+    def transcribe(self, audio, timeout=None):
+        started = time.perf_counter()
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        if not self.lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise sr.RequestError("Whisper busy")
+        try:
+            segments, _ = self.model.transcribe(
+                samples.astype(np.float32) / 32768.0,
+                language=self.language,
+                beam_size=1,
+                vad_filter=False,
+            )
+            # Segments are decoded lazily: stop between them once out of time
+            texts = []
+            for segment in segments:
+                texts.append(segment.text.strip())
+                if timeout is not None and time.perf_counter() - started > timeout:
+                    raise sr.RequestError("Whisper timed out")
+            text = " ".join(texts).strip()
+        except sr.RequestError:
+            raise
+        except Exception as e:
+            raise sr.RequestError(f"Whisper failed: {e}")
+        finally:
+            self.lock.release()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class FakeBackend(SpeechBackend):
+    name = "fake"
+
+    def __init__(self, transcripts=None, latency=0.0, error=None):
+        """
+        In-process stand-in for tests
+
+        Args:
+            transcripts: Texts returned in turn (no speech once used up)
+            latency: Seconds each transcription takes
+            error: Exception raised instead of returning a transcript
+        """
+        self.transcripts = list(transcripts or [])
+        self.latency = latency
+        self.error = error
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio, timeout=None):
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise sr.RequestError("Fake backend timed out")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        with self.lock:
+            if not self.transcripts:
+                raise sr.UnknownValueError()
+            return self.transcripts.pop(0)
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, WhisperBackend, FakeBackend)}
+
+
+def make_backend(name):
+    """
+    Build a backend by name
+
+    Args:
+        name: One of BACKENDS
+
+    Returns:
+        SpeechBackend: The backend
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech-to-text backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+class Transcriber:
+    def __init__(self, backends=None, deadline=STT_DEADLINE):
+        """
+        Race several backends and keep the first transcript
+
+        Args:
+            backends: SpeechBackend instances (default: STT_BACKENDS; names
+                that cannot be built are skipped with a warning)
+            deadline: Seconds to wait for a transcript
+        """
+        if backends is None:
+            backends = []
+            for name in STT_BACKENDS:
+                try:
+                    backends.append(make_backend(name))
+                except Exception as e:
+                    print(f"⚠️  Speech-to-text backend '{name}' unavailable: {e}")
+        if not backends:
+            raise ValueError("No speech-to-text backend available")
+
+        self.backends = backends
+        self.deadline = deadline
+
+        # Own workers, so slow recognitions cannot starve the runtime's pool:
+        # room for one race, the tail of the previous one and an interim transcript
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2 * len(backends) + 1, thread_name_prefix="stt"
+        )
+
+        # Metrics per backend
+        self.latency = {backend.name: LatencyWindow() for backend in backends}
+        self.counts = {
+            backend.name: {"calls": 0, "wins": 0, "no_speech": 0, "errors": 0, "timeouts": 0}
+            for backend in backends
+        }
+        self.lock = threading.Lock()
+
+        if DEBUG_MODE:
+            print(f"✓ Speech-to-text: {', '.join(backend.name for backend in backends)}")
+
+    def transcribe(self, audio):
+        """
+        Transcribe audio with every backend at once
+
+        Args:
+            audio: sr.AudioData
+
+        Returns:
+            tuple: (text, name of the backend that produced it)
+
+        Raises:
+            sr.UnknownValueError: If no backend heard speech
+            sr.RequestError: If every backend failed or the deadline passed
+        """
+        started = time.perf_counter()
+        context = contextvars.copy_context()
+        pending = {
+            self.pool.submit(context.copy().run, self._run, backend, audio, started): backend
+            for backend in self.backends
+        }
+
+        no_speech = False
+        errors = []
+        remaining = self.deadline
+        while pending and remaining > 0:
+            done, _ = concurrent.futures.wait(pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                status, result = future.result()
+                if status == "ok":
+                    with self.lock:
+                        self.counts[backend.name]["wins"] += 1
+                    return result, backend.name
+                if status == "no_speech":
+                    no_speech = True
+                else:
+                    errors.append(f"{backend.name}: {result}")
+            remaining = self.deadline - (time.perf_counter() - started)
+
+        # Backends still running missed the deadline; their results are ignored
+        for backend in pending.values():
+            with self.lock:
+                self.counts[backend.name]["timeouts"] += 1
+            errors.append(f"{backend.name}: no answer within {self.deadline}s")
+
+        if no_speech:
+            raise sr.UnknownValueError()
+        raise sr.RequestError("; ".join(errors))
+
+    def _run(self, backend, audio, started):
+        """
+        Run one backend, recording its latency and outcome
+
+        Returns:
+            tuple: ("ok", text), ("no_speech", None) or ("error", message)
+        """
+        with self.lock:
+            self.counts[backend.name]["calls"] += 1
+
+        try:
+            outcome = ("ok", backend.transcribe(audio, timeout=self.deadline))
+        except sr.UnknownValueError:
+            outcome = ("no_speech", None)
+        except Exception as e:
+            outcome = ("error", str(e) or type(e).__name__)
+
+        seconds = time.perf_counter() - started
+        self.latency[backend.name].add(seconds)
+        if outcome[0] == "no_speech":
+            with self.lock:
+                self.counts[backend.name]["no_speech"] += 1
+        elif outcome[0] == "error":
+            with self.lock:
+                self.counts[backend.name]["errors"] += 1
+            if DEBUG_MODE:
+                print(f"⚠️  {backend.name} speech-to-text failed: {outcome[1]}")
+        tracer.record("stt_backend", seconds, engine=backend.name, status=outcome[0])
+        return outcome
+
+    def transcribe_partial(self, audio):
+        """
+        Transcribe audio with the first backend only, for interim transcripts
+
+        Args:
+            audio: sr.AudioData
+
+        Returns:
+            Future: Resolves to the text, or raises like SpeechBackend.transcribe()
+        """
+        return self.pool.submit(self.backends[0].transcribe, audio, self.deadline)
+
+    def close(self):
+        """Stop the workers (running recognitions end at their timeout)"""
+        self.pool.shutdown(wait=False)
+
+    def stats(self):
+        """
+        Get per-backend metrics
+
+        Returns:
+            dict: For each backend, call/win/no-speech/error/timeout counts
+                and latency percentiles
+        """
+        with self.lock:
+            return {
+                name: {**counts, "latency": self.latency[name].summary()}
+                for name, counts in self.counts.items()
+            }
+
+
+class Hypothesis:
+    def __init__(self, text, stability, final=False, stable=""):
+        """
+        A transcript of what has been said so far
+
+        Args:
+            text: Transcript (lowercase)
+            stability: 0-1, share of the words the previous hypothesis
+                agreed on (1 for the final transcript)
+            final: True for the transcript of the complete utterance
+            stable: Leading words unlikely to change
+        """
+        self.text = text
+        self.stability = stability
+        self.final = final
+        self.stable = stable
+
+    def __repr__(self):
+        kind = "final" if self.final else f"stability {self.stability:.2f}"
+        return f"Hypothesis({self.text!r}, {kind})"
+
+
+class StabilityTracker:
+    def __init__(self):
+        """Score successive hypotheses of one utterance by how much they agree"""
+        self.previous = []
+
+    def score(self, text, final=False):
+        """
+        Turn the next transcript into a hypothesis
+
+        Args:
+            text: Transcript of the audio so far
+            final: Whether this is the transcript of the complete utterance
+
+        Returns:
+            Hypothesis: The scored hypothesis
+        """
+        words = text.split()
+        agreed = 0
+        for word, previous in zip(words, self.previous):
+            if word != previous:
+                break
+            agreed += 1
+        self.previous = words
+
+        if final:
+            return Hypothesis(text, 1.0, final=True, stable=text)
+        stability = agreed / len(words) if words else 0.0
+        return Hypothesis(text, stability, stable=" ".join(words[:agreed]))
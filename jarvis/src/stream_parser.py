@@ -0,0 +1,135 @@
+"""
+Stream Parser Module
+Incremental JSON parsing of streamed Gemini responses
+"""
+
+import json
+
+
+class ActionStreamParser:
+    def __init__(self):
+        """
+        Parse a JSON object chunk by chunk, exposing each top-level field
+        as soon as its value is complete. Text before the opening brace
+        (such as a markdown code fence) is ignored.
+        """
+        self.fields = {}
+        self.done = False
+
+        self._depth = 0
+        self._expect = None  # "key" or "value" at the top level
+        self._key = None
+        self._in_string = False
+        self._escape = False
+        self._raw = []
+        self._token = []
+
+    def feed(self, chunk):
+        """
+        Consume the next piece of the response
+
+        Args:
+            chunk: Text of one streamed chunk
+
+        Returns:
+            bool: True once "confidence", "action" and "param" are complete
+        """
+        for c in chunk:
+            if self.done:
+                break
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._raw.append(c)
+                elif c == "\\":
+                    self._escape = True
+                    self._raw.append(c)
+                elif c == '"':
+                    self._in_string = False
+                    self._on_string(json.loads('"' + "".join(self._raw) + '"'))
+                else:
+                    self._raw.append(c)
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._expect = "key"
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._raw = []
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._flush_token()
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":":
+                    self._expect = "value"
+                elif c == ",":
+                    self._flush_token()
+                    self._expect = "key"
+                elif self._expect == "value" and not c.isspace():
+                    self._token.append(c)
+
+        return self.ready()
+
+    def ready(self):
+        """Check whether the action can be dispatched (with the model's own confidence)"""
+        return all(field in self.fields for field in ("confidence", "action", "param"))
+
+    def result(self):
+        """
+        Get the parsed fields
+
+        Returns:
+            dict: Top-level fields completed so far
+        """
+        return dict(self.fields)
+
+    def _on_string(self, value):
+        """Record a completed top-level string"""
+        if self._depth != 1:
+            return
+        if self._expect == "key":
+            self._key = value
+        elif self._expect == "value":
+            self.fields[self._key] = value
+            self._expect = None
+
+    def _flush_token(self):
+        """Record a completed top-level number or literal"""
+        if not self._token:
+            return
+        token = "".join(self._token)
+        self._token = []
+        if self._depth == 1 and self._key is not None:
+            try:
+                self.fields[self._key] = json.loads(token)
+            except json.JSONDecodeError:
+                pass
+            self._expect = None
+
+# Test function
+def test():
+    """Test the stream parser"""
+    print("=" * 60)
+    print("Stream Parser Test")
+    print("=" * 60)
+
+    response = '```json\n{"confidence": 0.97, "action": "type_text", "param": "say \\"hi\\""}\n```'
+
+    parser = ActionStreamParser()
+    for i in range(0, len(response), 5):
+        chunk = response[i:i + 5]
+        if parser.feed(chunk):
+            print(f"Ready after {i + len(chunk)}/{len(response)} chars: {parser.result()}")
+            break
+
+if __name__ == "__main__":
+    test()
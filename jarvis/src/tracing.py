@@ -0,0 +1,322 @@
+"""
+Tracing Module
+Per-stage spans for each command, recorded into histograms and exported
+as JSONL and as a Prometheus text file
+"""
+
+import atexit
+from contextlib import contextmanager
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from config import (
+    TRACING_ENABLED, TRACE_FILE, TRACE_MAX_BYTES, TRACE_FLUSH_INTERVAL, METRICS_FILE, TRACE_BUCKETS,
+)
+
+# Span attributes that become histogram labels (low cardinality only)
+LABEL_ATTRIBUTES = ("cache_hit", "source", "engine", "status")
+
+_current_trace = contextvars.ContextVar("jarvis_trace", default=None)
+
+
+class Span:
+    def __init__(self, name, trace_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.attributes = dict(attributes)
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attributes):
+        """Add attributes to the span"""
+        self.attributes.update(attributes)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+
+
+class Tracer:
+    def __init__(self, enabled=TRACING_ENABLED, trace_file=TRACE_FILE, metrics_file=METRICS_FILE,
+                 buckets=TRACE_BUCKETS, max_trace_bytes=TRACE_MAX_BYTES, flush_interval=TRACE_FLUSH_INTERVAL):
+        """
+        Initialize the tracer
+
+        Args:
+            enabled: Record nothing when False
+            trace_file: JSONL file receiving one line per finished span
+            metrics_file: Prometheus text file rewritten with each export
+            buckets: Histogram bucket upper bounds (seconds)
+            max_trace_bytes: Size at which the trace file is rotated to
+                <trace_file>.1 (replacing the previous one)
+            flush_interval: Minimum seconds between two background exports
+        """
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.buckets = buckets
+        self.max_trace_bytes = max_trace_bytes
+        self.flush_interval = flush_interval
+
+        self.histograms = {}  # (span name, labels) -> Histogram
+        self.gauges = {}  # metric name -> (help text, latest value)
+        self.pending = []  # finished spans not yet written
+        self.changed = False  # metrics changed since the last export
+        self.roots = {}  # trace id -> root span
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+        # Files are written by a background thread, never by the pipeline
+        self.flush_lock = threading.Lock()  # one export at a time
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.writer = None
+
+    def current(self):
+        """Get the trace id active in this context, if any"""
+        return _current_trace.get()
+
+    @contextmanager
+    def trace(self, name="command", **attributes):
+        """
+        Trace one command; spans opened inside belong to it
+
+        Args:
+            name: Name of the root span
+            attributes: Initial attributes of the root span
+
+        Yields:
+            Span: The root span
+        """
+        root = self.begin(name, **attributes)
+        token = _current_trace.set(root.trace_id)
+        try:
+            yield root
+        except BaseException as e:
+            root.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_trace.reset(token)
+            self.end(root)
+
+    def begin(self, name="command", **attributes):
+        """
+        Start a trace that is finished elsewhere, e.g. by a later pipeline
+        stage (continue it in each thread with activate())
+
+        Args:
+            name: Name of the root span
+            attributes: Initial attributes of the root span
+
+        Returns:
+            Span: The root span, to pass to end()
+        """
+        root = Span(name, f"{os.getpid()}-{next(self.ids)}", attributes)
+        self.roots[root.trace_id] = root
+        return root
+
+    def end(self, root):
+        """Finish a trace started with begin() and export it in the background"""
+        self.roots.pop(root.trace_id, None)
+        if self.enabled:
+            self._finish(root, time.perf_counter() - root.start)
+            self._schedule_flush()
+
+    def annotate(self, **attributes):
+        """Add attributes to the root span of the current trace"""
+        root = self.roots.get(_current_trace.get())
+        if root:
+            root.set(**attributes)
+
+    @contextmanager
+    def activate(self, trace_id):
+        """Continue a trace in another thread or task"""
+        token = _current_trace.set(trace_id)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Time a stage of the current trace
+
+        Args:
+            name: Stage name (e.g. "stt", "llm_call")
+            attributes: Span attributes such as cache_hit or action
+
+        Yields:
+            Span: The span, so attributes can be added while it runs
+        """
+        span = Span(name, _current_trace.get(), attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            if self.enabled:
+                self._finish(span, time.perf_counter() - span.start)
+
+    def record(self, name, seconds, **attributes):
+        """
+        Record a stage that was timed elsewhere
+
+        Args:
+            name: Stage name
+            seconds: Duration of the stage
+            attributes: Span attributes
+        """
+        if self.enabled:
+            span = Span(name, _current_trace.get(), attributes)
+            span.start -= seconds
+            self._finish(span, seconds)
+
+    def _finish(self, span, seconds):
+        """Record a finished span"""
+        span.duration = seconds
+        labels = tuple(
+            (key, str(span.attributes[key]).lower())
+            for key in LABEL_ATTRIBUTES if key in span.attributes
+        )
+
+        with self.lock:
+            histogram = self.histograms.get((span.name, labels))
+            if histogram is None:
+                histogram = self.histograms[(span.name, labels)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self.pending.append(span)
+            self.changed = True
+
+    def gauge(self, name, value, description=""):
+        """
+        Set a gauge exported alongside the stage histograms
+
+        Args:
+            name: Metric name (exported as jarvis_<name>)
+            value: Current value
+            description: HELP text
+        """
+        if self.enabled:
+            with self.lock:
+                self.gauges[name] = (description, value)
+                self.changed = True
+
+    def _schedule_flush(self):
+        """Wake the writer thread, starting it on first use"""
+        if self.writer is None:
+            with self.lock:
+                if self.writer is None:
+                    self.writer = threading.Thread(target=self._run_writer, name="trace-writer", daemon=True)
+                    self.writer.start()
+        self.wake.set()
+
+    def _run_writer(self):
+        """Writer thread: export when woken, at most once per flush_interval"""
+        while not self.stopped.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            self.flush()
+            # Spans of the commands finishing meanwhile go out together
+            self.stopped.wait(self.flush_interval)
+
+    def close(self):
+        """Stop the writer thread and export whatever is left"""
+        self.stopped.set()
+        self.wake.set()
+        if self.writer:
+            self.writer.join(timeout=5)
+        self.flush()
+
+    def flush(self):
+        """Write finished spans to the JSONL file and rewrite the metrics file"""
+        if not self.enabled:
+            return
+
+        with self.flush_lock:
+            with self.lock:
+                spans, self.pending = self.pending, []
+                changed, self.changed = self.changed, False
+                trace_file, metrics_file = self.trace_file, self.metrics_file
+
+            try:
+                if trace_file and spans:
+                    self._rotate(trace_file)
+                    self._write_spans(trace_file, spans)
+
+                if metrics_file and changed:
+                    temp = f"{metrics_file}.tmp"
+                    with open(temp, "w", encoding="utf-8") as f:
+                        f.write(self.prometheus())
+                    os.replace(temp, metrics_file)
+            except OSError as e:
+                print(f"⚠️  Trace export error: {e}")
+
+    def _rotate(self, path):
+        """Move a full trace file to <path>.1 so the next spans start a new one"""
+        try:
+            if os.path.getsize(path) >= self.max_trace_bytes:
+                os.replace(path, f"{path}.1")
+        except FileNotFoundError:
+            pass
+
+    def _write_spans(self, path, spans):
+        """Append spans to the JSONL file"""
+        with open(path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps({
+                    "trace": span.trace_id,
+                    "span": span.name,
+                    "timestamp": span.timestamp,
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "attributes": span.attributes,
+                }, default=str) + "\n")
+
+    def prometheus(self):
+        """
+        Render the histograms and gauges in the Prometheus text format
+
+        Returns:
+            str: Exposition text
+        """
+        lines = [
+            "# HELP jarvis_stage_seconds Time spent in each pipeline stage",
+            "# TYPE jarvis_stage_seconds histogram",
+        ]
+
+        with self.lock:
+            items = sorted(self.histograms.items())
+            for (name, labels), histogram in items:
+                base = ",".join([f'stage="{name}"'] + [f'{k}="{v}"' for k, v in labels])
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'jarvis_stage_seconds_bucket{{{base},le="{bound}"}} {count}')
+                lines.append(f'jarvis_stage_seconds_bucket{{{base},le="+Inf"}} {histogram.count}')
+                lines.append(f"jarvis_stage_seconds_sum{{{base}}} {histogram.sum:.6f}")
+                lines.append(f"jarvis_stage_seconds_count{{{base}}} {histogram.count}")
+
+            for name, (description, value) in sorted(self.gauges.items()):
+                lines.append(f"# HELP jarvis_{name} {description}")
+                lines.append(f"# TYPE jarvis_{name} gauge")
+                lines.append(f"jarvis_{name} {value:.6g}")
+
+        return "\n".join(lines) + "\n"
+
+# Shared tracer used by every component
+tracer = Tracer()
+atexit.register(tracer.close)
@@ -0,0 +1,221 @@
+"""
+Voice Activity Detection Module
+Ends an utterance as soon as speech stops, from frame energy,
+zero-crossing rate and an adaptive noise floor, instead of waiting out a
+fixed pause
+"""
+
+from collections import deque
+import wave
+import numpy as np
+from config import (
+    VAD_FRAME_MS, VAD_ENERGY_RATIO, VAD_MIN_ENERGY, VAD_UNVOICED_ZCR, VAD_MIN_SPEECH,
+    VAD_NOISE_ADAPT, VAD_HANGOVER, VAD_MIN_HANGOVER, VAD_MAX_HANGOVER, VAD_PAUSE_HISTORY,
+)
+
+# Pauses observed before the hangover adapts to the speaker
+MIN_PAUSES = 5
+
+
+class VoiceActivityDetector:
+    def __init__(self, sample_rate, frame_ms=VAD_FRAME_MS, noise=None):
+        """
+        Initialize the detector
+
+        Args:
+            sample_rate: Samples per second of the 16-bit mono audio
+            frame_ms: Length of one analysis frame
+            noise: Optional NoiseFloorTracker whose estimate each utterance
+                starts from
+        """
+        self.sample_rate = sample_rate
+        self.noise = noise
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.frame_seconds = self.frame / sample_rate
+
+        # Carried over from one utterance to the next
+        self.noise_floor = None
+        self.hangover = VAD_HANGOVER
+        self.pauses = deque(maxlen=VAD_PAUSE_HISTORY)  # seconds of silence between words
+
+        # Samples of an incomplete frame waiting for the next chunk
+        self.pending = np.zeros(self.frame, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (the noise floor and observed pauses are kept)"""
+        if self.noise is not None and self.noise.floor is not None:
+            self.noise_floor = self.noise.floor
+        self.frames = 0
+        self.pending_count = 0
+        self.speech_run = 0
+        self.silence_run = 0
+        self.start_frame = None  # first frame of speech
+        self.end_frame = None  # frame after the last frame of speech
+        self.history = []  # (energy, zcr, threshold, speech) arrays, one tuple per chunk
+
+    @property
+    def started(self):
+        """Whether speech has started"""
+        return self.start_frame is not None
+
+    @property
+    def ended(self):
+        """Whether speech has started and then stopped"""
+        return self.end_frame is not None
+
+    @property
+    def speech_start(self):
+        """Sample position where speech started, or None"""
+        return None if self.start_frame is None else self.start_frame * self.frame
+
+    @property
+    def speech_end(self):
+        """Sample position where speech ended, or None"""
+        return None if self.end_frame is None else self.end_frame * self.frame
+
+    def _features(self, data):
+        """
+        Split new audio into frames and measure them
+
+        Returns:
+            tuple: (RMS energy, zero-crossing rate) arrays, one value per
+                complete frame
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.pending_count:
+            samples = np.concatenate((self.pending[:self.pending_count], samples))
+
+        usable = len(samples) - len(samples) % self.frame
+        self.pending_count = len(samples) - usable
+        self.pending[:self.pending_count] = samples[usable:]
+
+        frames = samples[:usable].reshape(-1, self.frame).astype(np.float32)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame - 1)
+        return energy, zcr
+
+    def calibrate(self, data):
+        """
+        Measure the noise floor from audio known to be silence
+
+        Args:
+            data: 16-bit PCM bytes of background noise
+        """
+        energy, _ = self._features(data)
+        self.pending_count = 0
+        if len(energy):
+            self.noise_floor = float(np.median(energy))
+
+    def feed(self, data):
+        """
+        Classify the next chunk of audio
+
+        Args:
+            data: 16-bit PCM bytes, continuing the current utterance
+
+        Returns:
+            bool: True once the utterance has ended
+        """
+        energy, zcr = self._features(data)
+        if not len(energy):
+            return self.ended
+        if self.noise_floor is None:
+            self.noise_floor = float(np.min(energy))
+
+        # Voiced sounds are loud; unvoiced ones (s, f, th) are quieter but noisy
+        threshold = max(self.noise_floor * VAD_ENERGY_RATIO, VAD_MIN_ENERGY)
+        speech = (energy > threshold) | ((energy > threshold / 2) & (zcr > VAD_UNVOICED_ZCR))
+        self.history.append((energy, zcr, np.full(len(energy), threshold, dtype=np.float32), speech))
+
+        # The floor follows the frames that are not speech (one EMA step each)
+        quiet = energy[~speech]
+        if len(quiet):
+            weight = 1.0 - (1.0 - VAD_NOISE_ADAPT) ** len(quiet)
+            self.noise_floor += weight * (float(quiet.mean()) - self.noise_floor)
+
+        for is_speech in speech.tolist():
+            self.frames += 1
+            if self.ended:
+                continue
+
+            if is_speech:
+                if self.started and self.silence_run:
+                    self.pauses.append(self.silence_run * self.frame_seconds)
+                self.silence_run = 0
+                self.speech_run += 1
+                if not self.started and self.speech_run >= VAD_MIN_SPEECH:
+                    self.start_frame = self.frames - self.speech_run
+            else:
+                self.speech_run = 0
+                if self.started:
+                    self.silence_run += 1
+                    if self.silence_run * self.frame_seconds >= self.hangover:
+                        self.end_frame = self.frames - self.silence_run
+                        self._adapt_hangover()
+
+        return self.ended
+
+    def _adapt_hangover(self):
+        """Wait just longer than the speaker's usual pause between words"""
+        if len(self.pauses) >= MIN_PAUSES:
+            usual = float(np.percentile(np.array(self.pauses), 90))
+            self.hangover = min(VAD_MAX_HANGOVER, max(VAD_MIN_HANGOVER, usual * 1.25 + self.frame_seconds))
+
+    def decisions(self):
+        """
+        Get every frame decision of the current utterance, for tuning
+
+        Returns:
+            dict: Arrays "time" (seconds), "energy", "zcr", "threshold" and
+                "speech", one value per frame
+        """
+        if not self.history:
+            empty = np.zeros(0, dtype=np.float32)
+            return {"time": empty, "energy": empty, "zcr": empty, "threshold": empty,
+                    "speech": np.zeros(0, dtype=bool)}
+
+        energy, zcr, threshold, speech = (np.concatenate(column) for column in zip(*self.history))
+        return {
+            "time": np.arange(len(energy)) * self.frame_seconds,
+            "energy": energy,
+            "zcr": zcr,
+            "threshold": threshold,
+            "speech": speech,
+        }
+
+    def summary(self):
+        """
+        Describe the current utterance and the adapted settings
+
+        Returns:
+            dict: Speech start/end (seconds), hangover, noise floor and
+                number of observed pauses
+        """
+        return {
+            "speech_start": None if self.start_frame is None else self.start_frame * self.frame_seconds,
+            "speech_end": None if self.end_frame is None else self.end_frame * self.frame_seconds,
+            "hangover": self.hangover,
+            "noise_floor": self.noise_floor,
+            "pauses": len(self.pauses),
+        }
+
+
+def read_wav(path):
+    """
+    Read a WAV recording as 16-bit mono
+
+    Args:
+        path: WAV file
+
+    Returns:
+        tuple: (PCM bytes, sample rate)
+    """
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: needs 16-bit samples")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        if f.getnchannels() > 1:
+            samples = samples.reshape(-1, f.getnchannels()).mean(axis=1).astype(np.int16)
+        return samples.tobytes(), f.getframerate()
@@ -1,52 +1,95 @@
 """
 Voice Recognition Module
-Handles speech-to-text conversion using Google Speech Recognition
+Captures commands from the microphone and converts them to text with the
+configured speech-to-text backends
 """
 
 import speech_recognition as sr
-from config import VOICE_LANGUAGE, VOICE_TIMEOUT, VOICE_PHRASE_LIMIT, DEBUG_MODE
-import threading
+from config import AUDIO_PREROLL, VOICE_TIMEOUT, VOICE_PHRASE_LIMIT, SPECULATION_INTERVAL, VAD_PADDING, DEBUG_MODE
+from audio_capture import AudioCapture
+from speech_to_text import StabilityTracker, Transcriber
+from noise_floor import NoiseFloorTracker
+from vad import VoiceActivityDetector
+from tracing import tracer
+from runtime import runtime
 import queue
+import threading
+import time
 
 class VoiceRecognizer:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
         
-        # Optimize for speed
-        self.recognizer.energy_threshold = 4000  # Adjust for ambient noise
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8  # Faster response
+        # Keep the microphone open so commands start without opening the device
+        self.capture = AudioCapture(self.microphone)
+        self.capture.start()
+        
+        # Background noise level, followed for as long as the stream runs
+        self.noise = NoiseFloorTracker(self.capture)
+        self.noise.start()
         
-        # Calibrate microphone on init
+        # Utterances end as soon as the detector hears speech stop
+        self.vad = VoiceActivityDetector(self.microphone.SAMPLE_RATE, noise=self.noise)
+        
+        # Speech-to-text engines from STT_BACKENDS
+        self.transcriber = Transcriber()
+        
+        # Wait for the first noise estimate
         self._calibrate_microphone()
         
         print("✓ Voice Recognition initialized")
     
     def _calibrate_microphone(self):
-        """Calibrate microphone for ambient noise"""
-        try:
-            with self.microphone as source:
-                if DEBUG_MODE:
-                    print("🎤 Calibrating microphone for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                if DEBUG_MODE:
-                    print("✓ Microphone calibrated")
-        except Exception as e:
-            print(f"⚠️  Microphone calibration warning: {e}")
+        """Wait until the noise tracker has measured the ambient noise"""
+        if DEBUG_MODE:
+            print("🎤 Calibrating microphone for ambient noise...")
+        if not self.noise.ready.wait(timeout=2.0):
+            print("⚠️  Microphone calibration warning: no audio from the microphone yet")
+        elif DEBUG_MODE:
+            print(f"✓ Microphone calibrated (noise floor {self.noise.floor:.0f}, kept up to date while running)")
     
-    def listen(self, callback=None):
+    def listen(self, callback=None, on_partial=None, since=None):
         """
         Listen for voice input and return transcribed text
         
         Args:
             callback: Optional callback function to call when listening starts
+            on_partial: Optional callback receiving each interim Hypothesis
+                while the user is still speaking
+            since: time.perf_counter() the command's audio starts at, e.g.
+                just before the hotkey press or right after the wake word
+                (default: AUDIO_PREROLL seconds ago)
             
         Returns:
             str: Transcribed text, or None if error/timeout
         """
+        for hypothesis in self.stream(since, callback, partials=bool(on_partial)):
+            if hypothesis.final:
+                return hypothesis.text
+            on_partial(hypothesis)
+        return None
+    
+    def stream(self, since=None, callback=None, partials=True):
+        """
+        Listen for one command, yielding transcripts as they form
+        
+        Args:
+            since: time.perf_counter() the command's audio starts at
+                (default: AUDIO_PREROLL seconds ago)
+            callback: Optional callback receiving "listening" and "recognizing"
+            partials: Transcribe what was said so far while the user speaks
+            
+        Yields:
+            Hypothesis: Interim hypotheses with stability scores, then a
+                final one (lowercase); nothing final if no speech was
+                recognized
+        """
+        if since is None:
+            since = time.perf_counter() - AUDIO_PREROLL
+        stability = StabilityTracker()
+        
         try:
-            with self.microphone as source:
+            with self.capture.source(since, preroll=0) as source:
                 if callback:
                     callback("listening")
                 
@@ -54,11 +97,8 @@ class VoiceRecognizer:
                     print("🎤 Listening...")
                 
                 # Listen for audio
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=VOICE_TIMEOUT,
-                    phrase_time_limit=VOICE_PHRASE_LIMIT
-                )
+                with tracer.span("audio_capture", speculative=partials, hangover=round(self.vad.hangover, 3)):
+                    audio = yield from self._record_phrase(source, stability if partials else None)
                 
                 if callback:
                     callback("recognizing")
@@ -67,57 +107,151 @@ class VoiceRecognizer:
                     print("🔄 Recognizing speech...")
                 
                 # Convert speech to text
-                text = self.recognizer.recognize_google(audio, language=VOICE_LANGUAGE)
+                with tracer.span("stt") as span:
+                    text, engine = self.transcriber.transcribe(audio)
+                    span.set(engine=engine)
                 
                 if DEBUG_MODE:
-                    print(f"✓ Recognized: '{text}'")
+                    print(f"✓ Recognized ({engine}): '{text}'")
                 
-                return text.lower()  # Return lowercase for easier processing
+                final = stability.score(text.lower(), final=True)  # Lowercase for easier processing
                 
         except sr.WaitTimeoutError:
             if DEBUG_MODE:
                 print("⏱️  Timeout: No speech detected")
-            return None
+            return
             
         except sr.UnknownValueError:
             if DEBUG_MODE:
                 print("❓ Could not understand audio")
-            return None
+            return
             
         except sr.RequestError as e:
             print(f"❌ Speech recognition error: {e}")
-            return None
+            return
             
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
-            return None
+            return
+        
+        yield final
+    
+    def _record_phrase(self, source, stability=None):
+        """
+        Capture one phrase, ending it as soon as the voice activity
+        detector hears speech stop
+        
+        Args:
+            source: Audio source to read from
+            stability: StabilityTracker scoring interim transcripts, or None
+                for no interim transcripts
+            
+        Yields:
+            Hypothesis: Interim hypotheses, as they are recognized
+            
+        Returns:
+            sr.AudioData: The phrase, with VAD_PADDING of audio around the speech
+            
+        Raises:
+            sr.WaitTimeoutError: If no speech started within VOICE_TIMEOUT
+        """
+        rate = source.SAMPLE_RATE
+        width = source.SAMPLE_WIDTH
+        timeout = int(VOICE_TIMEOUT * rate)
+        limit = int(VOICE_PHRASE_LIMIT * rate)
+        interval = int(SPECULATION_INTERVAL * rate)
+        next_partial = interval
+        frames = []
+        size = 0  # samples read
+        in_flight = threading.Event()
+        recognized = queue.SimpleQueue()
+        self.vad.reset()
+        
+        # Interim transcripts only use the first backend
+        def _recognized(future):
+            try:
+                recognized.put(future.result().lower())
+            except (sr.UnknownValueError, sr.RequestError):
+                pass
+            except Exception as e:
+                print(f"❌ Unexpected interim recognition error: {e}")
+            finally:
+                in_flight.clear()
+        
+        while True:
+            data = source.stream.read(source.CHUNK)
+            frames.append(data)
+            size += len(data) // width
+            
+            # Hand over interim transcripts that came back since the last chunk
+            while not recognized.empty():
+                yield stability.score(recognized.get())
+            
+            if self.vad.feed(data):
+                break
+            if not self.vad.started:
+                if size >= timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+            
+            spoken = size - self.vad.speech_start
+            if spoken >= limit:
+                break
+            
+            # Only one interim recognition at a time
+            if stability and spoken >= next_partial and not in_flight.is_set():
+                next_partial = spoken + interval
+                in_flight.set()
+                self.transcriber.transcribe_partial(self._phrase_audio(frames, rate, width)).add_done_callback(_recognized)
+        
+        return self._phrase_audio(frames, rate, width, self.vad.speech_end)
+    
+    def _phrase_audio(self, frames, rate, width, end=None):
+        """
+        Cut the detected speech out of the captured audio
+        
+        Args:
+            frames: Audio chunks read since the phrase began
+            rate: Sample rate
+            width: Bytes per sample
+            end: Sample position where speech ended (None while still speaking)
+            
+        Returns:
+            sr.AudioData: The speech, with VAD_PADDING of audio around it
+        """
+        data = b"".join(frames)
+        padding = int(VAD_PADDING * rate)
+        start = max(0, self.vad.speech_start - padding) * width
+        stop = len(data) if end is None else min(len(data), (end + padding) * width)
+        return sr.AudioData(data[start:stop], rate, width)
     
     def listen_async(self, callback):
         """
-        Listen asynchronously in a separate thread
+        Listen asynchronously on the runtime's worker pool
         
         Args:
             callback: Function to call with result (text or None)
         """
-        def _listen_thread():
+        def _listen_worker():
             text = self.listen()
             callback(text)
         
-        thread = threading.Thread(target=_listen_thread, daemon=True)
-        thread.start()
+        runtime.offload(_listen_worker)
     
     def test_microphone(self):
         """Test if microphone is working"""
-        try:
-            with self.microphone as source:
-                print("🎤 Testing microphone... Say something!")
-                audio = self.recognizer.listen(source, timeout=3, phrase_time_limit=5)
-                text = self.recognizer.recognize_google(audio, language=VOICE_LANGUAGE)
-                print(f"✓ Microphone test successful! You said: '{text}'")
-                return True
-        except Exception as e:
-            print(f"❌ Microphone test failed: {e}")
-            return False
+        print("🎤 Testing microphone... Say something!")
+        for hypothesis in self.stream(since=time.perf_counter(), partials=False):
+            print(f"✓ Microphone test successful! You said: '{hypothesis.text}'")
+            return True
+        print("❌ Microphone test failed: nothing was recognized")
+        return False
+    
+    def close(self):
+        """Stop recording and release the microphone"""
+        self.noise.stop()
+        self.capture.stop()
+        self.transcriber.close()
 
 # Quick test function
 def test():
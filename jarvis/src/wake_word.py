@@ -0,0 +1,478 @@
+"""
+Wake Word Module
+Always-on spotting of "Jarvis" in the microphone stream: a NumPy MFCC
+front end matched against a few enrolled recordings of the wake word
+with streaming dynamic time warping
+
+Enroll once (one WAV per take, a second or two each):
+    python wake_word.py --enroll take1.wav take2.wav take3.wav
+Check it on a recording:
+    python wake_word.py --test session.wav
+"""
+
+import argparse
+from collections import OrderedDict
+import threading
+import time
+import numpy as np
+from config import WAKE_WORD_MODEL, WAKE_WORD_SENSITIVITY, WAKE_WORD_COOLDOWN, DEBUG_MODE
+from tracing import tracer
+
+# MFCC front end
+FRAME_MS = 25
+HOP_MS = 10
+MEL_BANDS = 26
+CEPSTRA = 13  # the first (overall loudness) is dropped when matching
+MAX_FREQ = 4000  # same band at any sample rate, so models work across microphones
+PRE_EMPHASIS = 0.97
+
+# Quiet chunks in a row after which matching stops until sound returns
+QUIET_CHUNKS = 4
+
+# Triggers kept waiting for resolve() (older ones are forgotten)
+MAX_PENDING = 20
+
+
+def mel_filterbank(sample_rate, n_fft, bands=MEL_BANDS, max_freq=MAX_FREQ):
+    """
+    Build triangular mel filters
+
+    Returns:
+        np.ndarray: Matrix of shape (bands, n_fft // 2 + 1)
+    """
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    max_freq = min(max_freq, sample_rate / 2)
+    edges = to_hz(np.linspace(to_mel(0.0), to_mel(max_freq), bands + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+
+    filters = np.zeros((bands, len(bins)), dtype=np.float32)
+    for i in range(bands):
+        low, center, high = edges[i:i + 3]
+        rising = (bins - low) / (center - low)
+        falling = (high - bins) / (high - center)
+        filters[i] = np.maximum(0.0, np.minimum(rising, falling))
+    return filters
+
+
+def dct_matrix(bands=MEL_BANDS, cepstra=CEPSTRA):
+    """
+    Build an orthonormal DCT-II matrix
+
+    Returns:
+        np.ndarray: Matrix of shape (cepstra, bands)
+    """
+    n = np.arange(bands)
+    k = np.arange(cepstra)[:, None]
+    matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * bands)) * np.sqrt(2.0 / bands)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+class MFCC:
+    def __init__(self, sample_rate):
+        """
+        Streaming MFCC extractor
+
+        Args:
+            sample_rate: Samples per second of the 16-bit mono audio
+        """
+        self.frame = int(sample_rate * FRAME_MS / 1000)
+        self.hop = int(sample_rate * HOP_MS / 1000)
+        self.n_fft = 1 << (self.frame - 1).bit_length()
+        self.window = np.hamming(self.frame).astype(np.float32)
+        self.filters = mel_filterbank(sample_rate, self.n_fft)
+        self.dct = dct_matrix()
+        self.reset()
+
+    def reset(self):
+        """Forget audio carried over between chunks"""
+        self.leftover = np.zeros(0, dtype=np.float32)
+        self.last_sample = 0.0
+
+    def feed(self, samples):
+        """
+        Extract features from the next audio
+
+        Args:
+            samples: int16 samples continuing the stream
+
+        Returns:
+            np.ndarray: One unit-length cepstral vector per complete frame,
+                shape (frames, CEPSTRA - 1)
+        """
+        samples = samples.astype(np.float32)
+        emphasized = np.empty_like(samples)
+        if len(samples):
+            emphasized[0] = samples[0] - PRE_EMPHASIS * self.last_sample
+            emphasized[1:] = samples[1:] - PRE_EMPHASIS * samples[:-1]
+            self.last_sample = samples[-1]
+
+        signal = np.concatenate((self.leftover, emphasized))
+        if len(signal) < self.frame:
+            self.leftover = signal
+            return np.zeros((0, CEPSTRA - 1), dtype=np.float32)
+
+        count = 1 + (len(signal) - self.frame) // self.hop
+        frames = np.lib.stride_tricks.sliding_window_view(signal, self.frame)[::self.hop][:count]
+        self.leftover = signal[count * self.hop:]
+
+        power = np.abs(np.fft.rfft(frames * self.window, self.n_fft)) ** 2
+        log_mel = np.log(power @ self.filters.T + 1e-6)
+        cepstra = (log_mel @ self.dct.T)[:, 1:]
+        return cepstra / (np.linalg.norm(cepstra, axis=1, keepdims=True) + 1e-9)
+
+
+def features(samples, sample_rate):
+    """
+    Extract the features of a whole recording
+
+    Args:
+        samples: int16 samples
+        sample_rate: Samples per second
+
+    Returns:
+        np.ndarray: Unit-length cepstral vectors, one per 10ms
+    """
+    return MFCC(sample_rate).feed(samples)
+
+
+class TemplateSpotter:
+    def __init__(self, templates, threshold):
+        """
+        Streaming subsequence DTW against several templates at once
+
+        Each step advances every template path by one input frame; a path
+        may stay on a template frame, move on by one, or skip one, so
+        the wake word can be spoken at half to twice the enrolled speed.
+
+        Args:
+            templates: Feature sequences of the enrolled takes
+            threshold: Mean frame distance (cosine) below which the wake
+                word counts as heard
+        """
+        self.threshold = threshold
+        self.lengths = np.array([len(t) for t in templates])
+        width = self.lengths.max()
+
+        # Templates padded to one matrix; padding never matches
+        self.frames = np.zeros((len(templates), width, templates[0].shape[1]), dtype=np.float32)
+        self.padding = np.ones((len(templates), width), dtype=bool)
+        for i, template in enumerate(templates):
+            self.frames[i, :len(template)] = template
+            self.padding[i, :len(template)] = False
+        self.flat = self.frames.reshape(-1, self.frames.shape[2])
+        self.rows = np.arange(len(templates))
+        self.reset()
+
+    def reset(self):
+        """Drop every partial match"""
+        shape = self.padding.shape
+        self.cost = np.full(shape, np.inf, dtype=np.float32)  # accumulated distance of the best path
+        self.steps = np.zeros(shape, dtype=np.float32)  # frames on that path
+
+    def step(self, feats):
+        """
+        Match new input frames
+
+        Args:
+            feats: Feature vectors of the new frames
+
+        Returns:
+            float: Best mean distance of a complete match that ended in
+                these frames (inf if none)
+        """
+        if not len(feats):
+            return np.inf
+
+        # Cosine distance of every input frame to every template frame
+        distances = 1.0 - (feats @ self.flat.T).reshape(len(feats), *self.padding.shape)
+        distances[:, self.padding] = np.inf
+
+        best = np.inf
+        for distance in distances:
+            stay = self.cost, self.steps
+            advance = self._shift(self.cost, 1, 0.0), self._shift(self.steps, 1, 0.0)
+            skip = self._shift(self.cost, 2, np.inf), self._shift(self.steps, 2, 0.0)
+
+            # Pick the predecessor with the lowest mean distance after this frame
+            costs = np.stack([stay[0], advance[0], skip[0]]) + distance
+            steps = np.stack([stay[1], advance[1], skip[1]]) + 1.0
+            choice = np.argmin(costs / steps, axis=0)[None]
+            self.cost = np.take_along_axis(costs, choice, axis=0)[0]
+            self.steps = np.take_along_axis(steps, choice, axis=0)[0]
+
+            # Paths longer than twice a template are not that word
+            self.cost[self.steps > 2 * self.lengths[:, None]] = np.inf
+
+            last = self.lengths - 1
+            scores = self.cost[self.rows, last] / self.steps[self.rows, last]
+            best = min(best, float(scores.min()))
+        return best
+
+    @staticmethod
+    def _shift(values, by, fill):
+        """Move values `by` template frames later (the start fills in)"""
+        shifted = np.empty_like(values)
+        shifted[:, :by] = fill
+        shifted[:, by:] = values[:, :-by]
+        return shifted
+
+
+def trim_silence(samples, sample_rate, ratio=0.1):
+    """Cut a take down to where it is louder than `ratio` of its peak"""
+    hop = int(sample_rate * HOP_MS / 1000)
+    usable = len(samples) - len(samples) % hop
+    energy = np.sqrt(np.mean(samples[:usable].reshape(-1, hop).astype(np.float32) ** 2, axis=1))
+    loud = np.flatnonzero(energy > energy.max() * ratio)
+    if not len(loud):
+        return samples
+    return samples[loud[0] * hop:(loud[-1] + 1) * hop]
+
+
+def enroll(paths, output=WAKE_WORD_MODEL):
+    """
+    Build a wake word model from recordings of the wake word
+
+    Args:
+        paths: WAV files, one take each (at least two)
+        output: Model file to write
+
+    Returns:
+        float: Distance between the takes, which the detection threshold
+            is based on
+    """
+    from vad import read_wav
+
+    if len(paths) < 2:
+        raise ValueError("Enroll at least two takes of the wake word")
+
+    templates = []
+    for path in paths:
+        data, rate = read_wav(path)
+        samples = trim_silence(np.frombuffer(data, dtype=np.int16), rate)
+        templates.append(features(samples, rate))
+
+    # How far each take is from the others: the spread a real utterance has
+    distances = []
+    for i, template in enumerate(templates):
+        others = TemplateSpotter(templates[:i] + templates[i + 1:], threshold=0.0)
+        distances.append(others.step(template))
+    distance = float(max(distances))
+
+    lengths = np.array([len(t) for t in templates])
+    np.savez_compressed(output, templates=np.concatenate(templates), lengths=lengths, distance=distance)
+    return distance
+
+
+def load_model(path=WAKE_WORD_MODEL):
+    """
+    Load an enrolled wake word model
+
+    Returns:
+        tuple: (list of template feature sequences, distance between takes)
+
+    Raises:
+        FileNotFoundError: If nothing was enrolled
+    """
+    with np.load(path) as data:
+        templates = np.split(data["templates"], np.cumsum(data["lengths"])[:-1])
+        return templates, float(data["distance"])
+
+
+class WakeWordListener:
+    def __init__(self, capture, callback, noise=None, model_path=WAKE_WORD_MODEL,
+                 sensitivity=WAKE_WORD_SENSITIVITY, cooldown=WAKE_WORD_COOLDOWN):
+        """
+        Initialize the listener (it reads the stream once started)
+
+        Args:
+            capture: Running AudioCapture
+            callback: Called with the time.perf_counter() at which the wake
+                word ended and the trigger id to resolve() later, from the
+                listener's thread
+            noise: Optional NoiseFloorTracker; matching pauses while the
+                room is quiet
+            model_path: Enrolled model (see enroll())
+            sensitivity: Threshold relative to the distance between the
+                enrolled takes (higher triggers more easily)
+            cooldown: Seconds after a trigger before the next one
+
+        Raises:
+            FileNotFoundError: If no model was enrolled
+        """
+        templates, distance = load_model(model_path)
+        self.capture = capture
+        self.callback = callback
+        self.noise = noise
+        self.cooldown = cooldown
+        self.mfcc = MFCC(capture.buffer.sample_rate)
+        self.spotter = TemplateSpotter(templates, distance * sensitivity)
+
+        self.quiet = 0
+        self.last_trigger = -np.inf
+        self.pending = OrderedDict()  # trigger id -> time, not resolved yet
+        self.pending_lock = threading.Lock()
+        self.running = threading.Event()
+        self.thread = None
+
+        # Metrics
+        self.chunks = 0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.triggers = 0
+        self.false_triggers = 0
+
+    def start(self):
+        """Follow the capture stream in a background thread"""
+        if self.thread:
+            return
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        """Listener thread: check every chunk as it is recorded"""
+        source = self.capture.source(preroll=0)
+        while self.running.is_set():
+            try:
+                data = source.stream.read(source.CHUNK)
+            except OSError:
+                if self.capture.buffer.closed:
+                    return
+                continue
+
+            if self.process(np.frombuffer(data, dtype=np.int16)):
+                at = self.capture.buffer.time_at(source.stream.position)
+                if DEBUG_MODE:
+                    print("👂 Wake word")
+                self.callback(at, self.triggers)
+
+    def process(self, samples):
+        """
+        Look for the wake word in the next audio
+
+        Args:
+            samples: int16 samples continuing the stream
+
+        Returns:
+            bool: True if the wake word just ended
+        """
+        started = time.perf_counter()
+        heard = False
+
+        threshold = self.noise.threshold() if self.noise is not None else None
+        if threshold is not None and np.sqrt(np.mean(samples.astype(np.float32) ** 2)) < threshold:
+            self.quiet += 1
+        else:
+            self.quiet = 0
+
+        if self.quiet > QUIET_CHUNKS:
+            if self.quiet == QUIET_CHUNKS + 1:
+                self.mfcc.reset()
+                self.spotter.reset()
+        else:
+            score = self.spotter.step(self.mfcc.feed(samples))
+            if score < self.spotter.threshold and started - self.last_trigger >= self.cooldown:
+                heard = True
+                self.last_trigger = started
+                self.triggers += 1
+                with self.pending_lock:
+                    self.pending[self.triggers] = started
+                    while len(self.pending) > MAX_PENDING:
+                        self.pending.popitem(last=False)
+                self.spotter.reset()
+
+        self.busy_seconds += time.perf_counter() - started
+        self.audio_seconds += len(samples) / self.capture.buffer.sample_rate
+        self.chunks += 1
+        if heard or self.chunks % 100 == 0:
+            tracer.gauge("wake_word_duty_cycle", self.duty_cycle(), "Share of one core spent spotting the wake word")
+        return heard
+
+    def duty_cycle(self):
+        """Share of one core spent on the wake word so far"""
+        return self.busy_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def resolve(self, trigger_id, heard):
+        """
+        Say whether a trigger was followed by a command
+
+        Args:
+            trigger_id: Id passed to the callback with the trigger
+            heard: False if nothing was said after the wake word (a false
+                trigger), None if the command never listened (rejected or
+                cancelled), which counts neither way
+        """
+        with self.pending_lock:
+            if self.pending.pop(trigger_id, None) is None:
+                return
+            if heard is False:
+                self.false_triggers += 1
+        if heard is False:
+            tracer.gauge("wake_word_false_triggers", self.false_triggers, "Wake word triggers with no command after them")
+
+    def stats(self):
+        """
+        Get wake word metrics
+
+        Returns:
+            dict: Triggers, false triggers, duty cycle and audio seconds heard
+        """
+        return {
+            "triggers": self.triggers,
+            "false_triggers": self.false_triggers,
+            "false_trigger_rate": self.false_triggers / self.triggers if self.triggers else 0.0,
+            "duty_cycle": self.duty_cycle(),
+            "audio_seconds": self.audio_seconds,
+        }
+
+    def stop(self):
+        """Stop following the stream"""
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JARVIS wake word enrollment")
+    parser.add_argument("--enroll", nargs="+", metavar="WAV", help="recordings of the wake word, one take each")
+    parser.add_argument("--test", metavar="WAV", help="report where the wake word is heard in a recording")
+    parser.add_argument("--model", default=WAKE_WORD_MODEL)
+    args = parser.parse_args()
+
+    if args.enroll:
+        distance = enroll(args.enroll, args.model)
+        print(f"✓ Enrolled {len(args.enroll)} takes in {args.model} (distance between takes {distance:.3f})")
+
+    if args.test:
+        from vad import read_wav
+
+        data, rate = read_wav(args.test)
+        samples = np.frombuffer(data, dtype=np.int16)
+        templates, distance = load_model(args.model)
+        mfcc = MFCC(rate)
+        spotter = TemplateSpotter(templates, distance * WAKE_WORD_SENSITIVITY)
+        chunk = 1024
+        last = -np.inf
+        started = time.perf_counter()
+        for offset in range(0, len(samples), chunk):
+            score = spotter.step(mfcc.feed(samples[offset:offset + chunk]))
+            at = (offset + chunk) / rate
+            if score < spotter.threshold and at - last >= WAKE_WORD_COOLDOWN:
+                print(f"👂 Wake word at {at:.2f}s (distance {score:.3f}, threshold {spotter.threshold:.3f})")
+                last = at
+                spotter.reset()
+        busy = time.perf_counter() - started
+        print(f"Duty cycle: {busy / (len(samples) / rate):.2%} of one core")
+
+    if not args.enroll and not args.test:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Shared test setup: the modules in src/ import each other by name, as when
+JARVIS runs from that directory
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,74 @@
+"""Tests for multi-step plans"""
+
+import pytest
+from action_plan import dependencies, make_plan, parse_plan, split_utterance
+from config import PLAN_MAX_STEPS
+
+
+def test_split_utterance_on_conjunctions_and_commas():
+    assert split_utterance("open chrome and then search for cats, type hello") == [
+        "open chrome", "search for cats", "type hello",
+    ]
+    assert split_utterance("Open Chrome THEN go to youtube") == ["Open Chrome", "go to youtube"]
+
+
+def test_split_utterance_single_or_too_many_commands():
+    assert split_utterance("open chrome") is None
+    assert split_utterance(" and ".join(["volume up"] * (PLAN_MAX_STEPS + 1))) is None
+
+
+def test_make_plan_summarizes_the_steps():
+    steps = [{"action": "launch_app", "param": "notepad", "after": []},
+             {"action": "type_text", "param": "hi", "after": [0]}]
+    plan = make_plan(steps, 0.7)
+    assert plan["action"] == "plan"
+    assert plan["param"] == "launch_app: notepad; type_text: hi"
+    assert plan["confidence"] == 0.7
+    assert plan["steps"] is steps
+
+
+def test_parse_plan_converts_step_numbers_and_drops_forward_references():
+    plan = parse_plan({"steps": [
+        {"action": "launch_app", "param": "notepad", "after": [2]},
+        {"action": "type_text", "param": "hi", "after": [1, 1, 7, "x"]},
+    ], "confidence": 0.9})
+    assert [step["after"] for step in plan["steps"]] == [[], [0, 0]]
+    assert plan["confidence"] == 0.9
+
+
+def test_parse_plan_with_one_step_is_a_plain_action():
+    assert parse_plan({"steps": [{"action": "system_control", "param": "volume_up"}]}) == {
+        "action": "system_control", "param": "volume_up", "confidence": 0.8,
+    }
+
+
+@pytest.mark.parametrize("answer", [
+    {},
+    {"steps": []},
+    {"steps": [{"action": "fly", "param": "moon"}]},
+    {"steps": [{"action": "type_text", "param": 3}]},
+    {"steps": [{"action": "type_text", "param": "x"}] * (PLAN_MAX_STEPS + 1)},
+])
+def test_parse_plan_rejects_malformed_plans(answer):
+    with pytest.raises(ValueError):
+        parse_plan(answer)
+
+
+def test_dependencies_serialize_non_concurrent_steps():
+    steps = [
+        {"action": "launch_app", "param": "notepad", "after": []},
+        {"action": "web_search", "param": "cats", "after": []},
+        {"action": "type_text", "param": "hi", "after": []},
+        {"action": "open_website", "param": "example.org", "after": []},
+    ]
+    # Launch and search run together; typing waits for both; the website
+    # waits for the typing only
+    assert dependencies(steps) == [[], [], [0, 1], [2]]
+
+
+def test_dependencies_keep_the_plans_own_hints():
+    steps = [
+        {"action": "launch_app", "param": "a", "after": []},
+        {"action": "launch_app", "param": "b", "after": [0]},
+    ]
+    assert dependencies(steps) == [[], [0]]
@@ -0,0 +1,64 @@
+"""Tests for the normalized, fuzzy command index"""
+
+import pytest
+from command_index import CommandIndex, normalize_command, normalize_utterance
+
+COMMANDS = {
+    "open edge": {"action": "launch_app", "param": "edge"},
+    "open chrome": {"action": "launch_app", "param": "chrome"},
+    "close window": {"action": "system_control", "param": "close_window"},
+}
+
+
+@pytest.fixture
+def index():
+    return CommandIndex(commands=COMMANDS, app_paths={})
+
+
+def test_normalize_utterance_keeps_every_word():
+    assert normalize_utterance("  What's  UP?! ") == "what s up"
+    assert normalize_utterance("") == ""
+    assert normalize_utterance(None) == ""
+
+
+def test_normalize_command_drops_fillers_and_maps_verbs():
+    assert normalize_command("Please launch the Edge browser") == "open edge"
+    assert normalize_command("shut the window") == "close window"
+
+
+@pytest.mark.parametrize("text", ["open edge", "Open Edge.", "please open the edge browser", "start edge"])
+def test_exact_match_after_normalization(index, text):
+    assert index.lookup(text) == {"action": "launch_app", "param": "edge", "confidence": 1.0}
+
+
+def test_fuzzy_match_scores_below_one(index):
+    result = index.lookup("launch crome")
+    assert result["param"] == "chrome"
+    assert index.threshold <= result["confidence"] < 1.0
+
+
+def test_fuzzy_match_needs_the_same_verb_and_length(index):
+    assert index.lookup("type open chrome") is None
+    assert index.lookup("open chrome now please") == {"action": "launch_app", "param": "chrome", "confidence": 1.0}
+    assert index.lookup("search for chrome") is None
+
+
+def test_no_match_for_empty_or_unrelated_text(index):
+    assert index.lookup("") is None
+    assert index.lookup("please") is None
+    assert index.lookup("what is the weather") is None
+
+
+def test_configured_apps_are_indexed_and_explicit_commands_win():
+    index = CommandIndex(
+        commands={"open notes": {"action": "launch_app", "param": "notepad"}},
+        app_paths={"notes": "notes.exe", "paint": "mspaint.exe"},
+    )
+    assert len(index) == 2
+    assert index.lookup("open paint")["param"] == "paint"
+    assert index.lookup("open notes")["param"] == "notepad"
+
+
+def test_lookup_returns_a_copy(index):
+    index.lookup("open edge")["param"] = "changed"
+    assert index.lookup("open edge")["param"] == "edge"
@@ -0,0 +1,111 @@
+"""Tests for hotkey parsing and the held-key bitmask"""
+
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("pynput")
+from hotkey_listener import HotkeyListener, key_name, parse_hotkey  # noqa: E402
+
+
+def special(name):
+    return SimpleNamespace(name=name)
+
+
+def char(c):
+    return SimpleNamespace(name=None, char=c, vk=None)
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def listener(fired):
+    return HotkeyListener(lambda: fired.append(True), hotkeys=["ctrl+shift+j", "<cmd>+h"],
+                          debounce=0.0, stuck_timeout=10.0)
+
+
+def press(listener, *keys):
+    for key in keys:
+        listener.on_press(key)
+
+
+def release(listener, *keys):
+    for key in keys:
+        listener.on_release(key)
+
+
+def test_parse_hotkey_accepts_aliases_and_sides():
+    assert parse_hotkey("<cmd>+h") == frozenset({"cmd", "h"})
+    assert parse_hotkey("Control + Shift_R + J") == frozenset({"ctrl", "shift", "j"})
+    assert parse_hotkey("win+h") == parse_hotkey("<cmd>+h")
+    with pytest.raises(ValueError):
+        parse_hotkey("ctrl+hyper")
+
+
+def test_key_name():
+    assert key_name(special("ctrl_r")) == "ctrl"
+    assert key_name(special("ctrl_r"), sided=True) == "ctrl_r"
+    assert key_name(char("\x0a")) == "j"  # Ctrl+J as a control character
+    assert key_name(SimpleNamespace(name=None, char=None, vk=72)) == "h"
+    assert key_name(SimpleNamespace(name=None, char=None, vk=None)) is None
+
+
+def test_fires_on_the_press_edge_only(listener, fired):
+    press(listener, special("ctrl_l"), special("shift_l"), char("j"))
+    press(listener, char("j"), char("j"))  # auto-repeat
+    assert len(fired) == 1
+    assert listener.stats()["repeats_ignored"] == 2
+
+
+def test_keys_of_another_hotkey_break_the_match(listener, fired):
+    press(listener, special("cmd"), special("ctrl_l"), special("shift_l"), char("j"))
+    assert fired == []
+
+
+def test_keys_outside_every_hotkey_are_ignored(listener, fired):
+    press(listener, special("ctrl_l"), special("alt_l"), special("shift_l"), char("j"))
+    assert len(fired) == 1
+
+
+def test_releasing_one_side_keeps_the_modifier_held(listener, fired):
+    press(listener, special("ctrl_l"), special("ctrl_r"))
+    release(listener, special("ctrl_r"))
+    press(listener, special("shift_r"), char("j"))
+    assert len(fired) == 1
+
+    release(listener, char("j"), special("ctrl_l"))
+    press(listener, char("j"))
+    assert len(fired) == 1  # no ctrl any more
+
+    release(listener, char("j"), special("shift_r"))
+    assert listener.state == 0 and listener.current_keys == {}
+
+
+def test_debounce(fired):
+    listener = HotkeyListener(lambda: fired.append(True), hotkeys=["<cmd>+h"], debounce=60.0)
+    for _ in range(2):
+        press(listener, special("cmd"), char("h"))
+        release(listener, char("h"), special("cmd"))
+    assert len(fired) == 1
+    assert listener.stats()["debounced"] == 1
+
+
+def test_keys_are_released_after_keyboard_silence(listener, fired):
+    press(listener, special("cmd_l"))
+    listener.last_event -= 11  # its release was swallowed
+    press(listener, char("h"))
+    assert fired == []
+    assert listener.stats()["stuck_released"] == 1
+
+
+def test_a_modifier_held_while_typing_is_kept(listener, fired):
+    press(listener, special("cmd_l"))
+    for _ in range(30):
+        listener.last_event -= 1
+        listener.current_keys["cmd_l"] -= 1
+        press(listener, char("x"))
+        release(listener, char("x"))
+    press(listener, char("h"))
+    assert len(fired) == 1
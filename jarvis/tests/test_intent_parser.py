@@ -0,0 +1,44 @@
+"""Tests for the rule-based local intent parser"""
+
+import pytest
+from intent_parser import IntentParser
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return IntentParser()
+
+
+@pytest.mark.parametrize("text, action, param", [
+    ("open edge browser", "launch_app", "edge"),
+    ("please open vs code", "launch_app", "vscode"),
+    ("search for pizza near me", "web_search", "pizza near me"),
+    ("close this window", "system_control", "close_window"),
+    ("volume up", "system_control", "volume_up"),
+    ("open downloads folder", "file_operation", "open_downloads"),
+    ("go to youtube", "open_website", "youtube.com"),
+    ("go to example.org", "open_website", "example.org"),
+])
+def test_common_commands(parser, text, action, param):
+    result = parser.parse(text)
+    assert (result["action"], result["param"]) == (action, param)
+    assert result["confidence"] >= 0.9
+
+
+def test_typed_text_keeps_its_punctuation(parser):
+    assert parser.parse("type hello world.")["param"] == "hello world."
+
+
+def test_unknown_app_parses_below_the_acceptance_threshold(parser):
+    result = parser.parse("open photoshop")
+    assert result["action"] == "launch_app"
+    assert result["confidence"] < 0.9
+
+
+@pytest.mark.parametrize("text", ["", None, "whats the weather like"])
+def test_no_rule_matches(parser, text):
+    assert parser.parse(text) is None
+
+
+def test_whitespace_is_collapsed(parser):
+    assert parser.parse("  open   edge ")["param"] == "edge"
@@ -0,0 +1,90 @@
+"""Tests for the pipelined command queue"""
+
+import threading
+from pipeline import CommandPipeline
+
+
+def make_pipeline(stages, **kwargs):
+    done = []
+    pipeline = CommandPipeline(stages, on_done=done.append, **kwargs)
+    return pipeline, done
+
+
+def test_jobs_pass_every_stage_in_submission_order():
+    seen = {"a": [], "b": []}
+    pipeline, done = make_pipeline([
+        ("a", lambda job: seen["a"].append(job.id)),
+        ("b", lambda job: seen["b"].append(job.id)),
+    ])
+    jobs = [pipeline.submit(block=True, trigger="wake_word", trigger_id=i) for i in range(5)]
+    assert pipeline.join(timeout=5)
+    assert seen["a"] == seen["b"] == [job.id for job in jobs]
+    assert [job.trigger_id for job in done] == list(range(5))
+    assert pipeline.stats()["completed"] == 5
+    pipeline.shutdown()
+
+
+def test_a_stage_returning_false_or_raising_stops_the_job():
+    reached = []
+    pipeline, done = make_pipeline([
+        ("check", lambda job: job.id != 1),
+        ("fail", lambda job: 1 / (job.id - 2)),
+        ("last", lambda job: reached.append(job.id)),
+    ])
+    for _ in range(3):
+        pipeline.submit()
+    pipeline.join(timeout=5)
+    assert reached == [3]
+    assert isinstance(done[1].error, ZeroDivisionError)
+    assert pipeline.stats()["failed"] == 1
+    assert len(done) == 3
+    pipeline.shutdown()
+
+
+def test_run_processes_one_job_in_the_calling_thread():
+    threads = []
+    pipeline, done = make_pipeline([("only", lambda job: threads.append(threading.current_thread()))])
+    job = pipeline.run(activated_at=1.0)
+    assert threads == [threading.current_thread()]
+    assert done == [job] and job.done.is_set() and job.activated_at == 1.0
+
+
+def test_full_queue_rejects_without_blocking():
+    release = threading.Event()
+    pipeline, _ = make_pipeline([("slow", lambda job: release.wait(5))], max_pending=1)
+    jobs = [pipeline.submit() for _ in range(4)]
+    # One job running, one queued, the rest rejected
+    assert jobs[-1] is None
+    assert pipeline.stats()["rejected"] >= 1
+    release.set()
+    assert pipeline.join(timeout=5)
+    pipeline.shutdown()
+
+
+def test_cancel_drops_queued_jobs_and_stops_the_running_one():
+    started = threading.Event()
+    release = threading.Event()
+    reached = []
+
+    def first(job):
+        started.set()
+        release.wait(5)
+
+    pipeline, done = make_pipeline([("first", first), ("second", lambda job: reached.append(job.id))])
+    running = pipeline.submit()
+    started.wait(5)
+    queued = [pipeline.submit(), pipeline.submit()]
+
+    assert pipeline.cancel() == 2
+    release.set()
+    assert pipeline.join(timeout=5)
+    assert reached == []
+    assert all(job.cancelled for job in [running] + queued)
+    assert len(done) == 3
+    assert pipeline.stats()["cancelled"] == 3
+
+    # Jobs submitted after the cancel run normally
+    pipeline.submit()
+    pipeline.join(timeout=5)
+    assert len(reached) == 1
+    pipeline.shutdown()
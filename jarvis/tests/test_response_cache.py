@@ -0,0 +1,102 @@
+"""Tests for the learned response cache (TTL, LRU and persistence)"""
+
+import time
+import pytest
+from response_cache import ResponseCache, export_entries
+
+GOOD = {"action": "launch_app", "param": "calculator", "confidence": 0.9}
+
+
+def make_cache(path=":memory:", **kwargs):
+    cache = ResponseCache(path=str(path), **kwargs)
+    cache.start()
+    cache.loaded.wait(5)
+    return cache
+
+
+@pytest.fixture
+def cache():
+    cache = make_cache()
+    yield cache
+    cache.close()
+
+
+def test_put_then_get_by_normalized_utterance(cache):
+    assert cache.put("Open the calculator!", GOOD)
+    assert cache.get("open the calculator") == GOOD
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("result", [
+    None,
+    {"action": "fly", "param": "x", "confidence": 0.9},
+    {"action": "launch_app", "param": " ", "confidence": 0.9},
+    {"action": "launch_app", "param": "calculator", "confidence": 0.1},
+])
+def test_invalid_or_unsure_decisions_are_not_stored(cache, result):
+    assert not cache.put("open calculator", result)
+    assert cache.get("open calculator") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    cache.put("one", GOOD)
+    cache.put("two", GOOD)
+    cache.get("one")
+    cache.put("three", GOOD)
+    assert cache.get("two") is None
+    assert cache.get("one") and cache.get("three")
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_expired_entries_miss():
+    cache = make_cache(ttl=0.05)
+    cache.put("open calculator", GOOD)
+    time.sleep(0.1)
+    assert cache.get("open calculator") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["misses"], stats["entries"]) == (1, 1, 0)
+    cache.close()
+
+
+def test_uncounted_lookups_leave_the_hit_rate_alone(cache):
+    cache.put("open calculator", GOOD)
+    cache.get("open calculator", count=False)
+    cache.get("nothing", count=False)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 0)
+
+
+def test_disabled_cache_remembers_nothing():
+    cache = ResponseCache(path=":memory:")
+    cache.disable()
+    assert not cache.put("open calculator", GOOD)
+    assert cache.get("open calculator") is None
+
+
+def test_entries_persist_and_early_puts_survive_the_load(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = make_cache(path)
+    cache.put("open calculator", GOOD)
+    cache.put("open notepad", {**GOOD, "param": "notepad"})
+    cache.close()
+
+    # A put made while the load is still running is kept and wins
+    cache = ResponseCache(path=str(path))
+    cache.put("open notepad", {**GOOD, "param": "notepad++"})
+    cache.start()
+    cache.loaded.wait(5)
+    assert cache.get("open calculator") == GOOD
+    assert cache.get("open notepad")["param"] == "notepad++"
+    cache.close()
+
+    assert sorted(export_entries(str(path))) == [
+        ("open calculator", "launch_app", "calculator"),
+        ("open notepad", "launch_app", "notepad++"),
+    ]
+
+
+def test_export_without_a_cache_creates_nothing(tmp_path):
+    path = tmp_path / "missing.db"
+    assert export_entries(str(path)) == []
+    assert not path.exists()
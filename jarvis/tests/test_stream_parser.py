@@ -0,0 +1,45 @@
+"""Tests for incremental parsing of streamed model answers"""
+
+from stream_parser import ActionStreamParser
+
+
+def feed_in_chunks(text, size):
+    """Feed text in fixed-size chunks; return the parser and the chars consumed when ready"""
+    parser = ActionStreamParser()
+    for i in range(0, len(text), size):
+        if parser.feed(text[i:i + size]):
+            return parser, i + size
+    return parser, None
+
+
+def test_ready_once_confidence_action_and_param_are_complete():
+    text = '{"confidence": 0.42, "action": "type_text", "param": "hi"} trailing tokens'
+    parser, consumed = feed_in_chunks(text, 3)
+    assert parser.result() == {"confidence": 0.42, "action": "type_text", "param": "hi"}
+    assert consumed < len(text)
+
+
+def test_waits_for_a_confidence_sent_last():
+    parser = ActionStreamParser()
+    assert not parser.feed('{"action": "launch_app", "param": "gimp", ')
+    assert parser.feed('"confidence": 0.3}')
+    assert parser.result()["confidence"] == 0.3
+
+
+def test_code_fence_and_escapes():
+    parser, _ = feed_in_chunks('```json\n{"confidence": 1, "action": "type_text", "param": "say \\"hi\\""}\n```', 5)
+    assert parser.result()["param"] == 'say "hi"'
+
+
+def test_nested_values_are_skipped():
+    parser = ActionStreamParser()
+    parser.feed('{"steps": [{"action": "x", "param": "y"}], "confidence": 0.9}')
+    assert parser.done
+    assert not parser.ready()
+    assert parser.result() == {"confidence": 0.9}
+
+
+def test_literals_and_stop_after_the_object():
+    parser = ActionStreamParser()
+    parser.feed('{"confidence": 0.5, "flag": true, "action": "a", "param": "b"} {"action": "ignored"}')
+    assert parser.result() == {"confidence": 0.5, "flag": True, "action": "a", "param": "b"}
@@ -0,0 +1,88 @@
+"""Tests for voice activity detection"""
+
+import numpy as np
+import pytest
+from config import VAD_MIN_SPEECH
+from vad import VoiceActivityDetector
+
+RATE = 16000
+FRAME = RATE * 20 // 1000  # VAD_FRAME_MS samples
+
+
+def noise(seconds, level=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * RATE)) * level).astype(np.int16).tobytes()
+
+
+def tone(seconds, level=5000, freq=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * freq * t) * level).astype(np.int16).tobytes()
+
+
+def feed_all(vad, data, chunk=1024):
+    for offset in range(0, len(data), chunk * 2):
+        if vad.feed(data[offset:offset + chunk * 2]):
+            return True
+    return False
+
+
+@pytest.fixture
+def vad():
+    detector = VoiceActivityDetector(RATE)
+    detector.calibrate(noise(0.5))
+    return detector
+
+
+def test_silence_never_starts_speech(vad):
+    assert not feed_all(vad, noise(2.0, seed=1))
+    assert not vad.started and vad.speech_start is None
+
+
+def test_speech_start_and_end_are_found(vad):
+    ended = feed_all(vad, noise(0.5, seed=1) + tone(1.0) + noise(1.5, seed=2))
+    assert ended and vad.started
+    assert vad.speech_start == pytest.approx(0.5 * RATE, abs=FRAME)
+    assert vad.speech_end == pytest.approx(1.5 * RATE, abs=FRAME)
+    assert vad.summary()["speech_end"] == pytest.approx(1.5, abs=0.02)
+
+
+def test_utterance_ends_one_hangover_after_speech(vad):
+    data = noise(0.3, seed=1) + tone(0.5) + noise(2.0, seed=2)
+    chunk = FRAME
+    for offset in range(0, len(data), chunk * 2):
+        if vad.feed(data[offset:offset + chunk * 2]):
+            break
+    ended_at = (offset + chunk * 2) / 2 / RATE
+    assert ended_at == pytest.approx(0.8 + vad.hangover, abs=0.05)
+
+
+def test_short_clicks_do_not_start_speech(vad):
+    click = tone(0.02 * (VAD_MIN_SPEECH - 1))
+    assert not feed_all(vad, noise(0.2, seed=1) + click + noise(1.0, seed=2))
+    assert not vad.started
+
+
+def test_chunks_that_split_frames_give_the_same_decisions():
+    data = noise(0.3, seed=1) + tone(0.4) + noise(1.0, seed=2)
+    results = []
+    for chunk in (FRAME, 1000, 333):
+        detector = VoiceActivityDetector(RATE)
+        detector.calibrate(noise(0.5))
+        feed_all(detector, data, chunk=chunk)
+        results.append((detector.speech_start, detector.speech_end))
+    assert results[0] == results[1] == results[2]
+
+
+def test_reset_keeps_the_noise_floor(vad):
+    feed_all(vad, tone(0.5) + noise(1.0, seed=2))
+    floor = vad.noise_floor
+    vad.reset()
+    assert not vad.started and vad.noise_floor == floor
+    assert len(vad.decisions()["speech"]) == 0
+
+
+def test_decisions_line_up_with_frames(vad):
+    feed_all(vad, noise(0.2, seed=1) + tone(0.3))
+    decisions = vad.decisions()
+    assert len(decisions["time"]) == len(decisions["speech"]) == vad.frames
+    assert decisions["speech"][-5:].all() and not decisions["speech"][:5].any()